@@ -0,0 +1,43 @@
+import importlib
+
+# Headless analytics core behind the Streamlit dashboards.
+#
+# Nothing in this package imports streamlit or plotly, so batch workers, tests and benchmarks
+# can use the same code as the apps. Submodules are imported on first attribute access, so
+# `from analytics import bond_valuation` only loads bond_engine (and numpy/pandas).
+
+_EXPORTS = {
+    'bond_engine': [
+        'bond_analytics', 'bond_valuation', 'calculate_ytm', 'current_yield', 'macaulay_duration',
+        'modified_duration', 'price_portfolio', 'solve_ytm',
+    ],
+    'rate_scenarios': ['risk_summary', 'simulate_pnl'],
+    'risk_models': [
+        'calculate_combined_risk', 'calculate_custom_risk_score', 'calculate_cvss_score',
+        'calculate_mttc', 'calculate_mtti',
+    ],
+    'cvss31': ['score_vector', 'score_vectors'],
+    'risk_batch': ['load_findings', 'rank_findings', 'score_findings'],
+    'risk_simulation': ['simulate_risk', 'summarize'],
+    'columnar_cache': ['optimize_dtypes'],
+    'incremental_loader': ['IncrementalCSV'],
+    'datasets': ['open_hr_dataset', 'open_influencer_dataset'],
+    'instrumentation': ['RECORDER', 'Recorder'],
+    'shared_cache': ['SHARED', 'SharedCache'],
+}
+
+_MODULES = {name: module for module, names in _EXPORTS.items() for name in names}
+
+__all__ = sorted(_MODULES)
+
+
+def __getattr__(name):
+    if name in _MODULES:
+        value = getattr(importlib.import_module(f'.{_MODULES[name]}', __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,297 @@
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# Vectorized bond analytics shared by bond.py and batch jobs.
+#
+# Every input may be a scalar or an array; inputs are broadcast against each other so a
+# whole portfolio is priced in one call. Prices use the closed-form annuity factor
+#   A(y, n) = (1 - (1 + y) ** -n) / y
+# and durations/convexity use its analytic derivatives, so the cost per bond does not
+# grow with maturity.
+
+# Below this value of n * y the closed form loses precision, so a Taylor expansion is used
+SMALL_RATE_THRESHOLD = 1e-4
+
+# Discount terms for one maturity/frequency and up to this many rates are served from the
+# shared cache; larger rate arrays (whole portfolios, scenario sets) are computed directly
+CACHED_RATE_GRID_SIZE = 1024
+DISCOUNT_CACHE_SIZE = 4096
+SCHEDULE_CACHE_SIZE = 1024
+
+
+# Function to broadcast the portfolio inputs to float arrays of a common shape
+def _broadcast_inputs(principal, coupon_rate, years_to_maturity, discount_rate, frequency):
+    return np.broadcast_arrays(
+        np.asarray(principal, dtype=float),
+        np.asarray(coupon_rate, dtype=float),
+        np.asarray(years_to_maturity, dtype=float),
+        np.asarray(discount_rate, dtype=float),
+        np.asarray(frequency, dtype=float),
+    )
+
+
+# Function to calculate the annuity factor and its first two derivatives with respect to
+# the per-period rate y, together with the final discount factor (1 + y) ** -n
+def annuity_terms(y, n):
+    y = np.asarray(y, dtype=float)
+    n = np.asarray(n, dtype=float)
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        log_growth = np.log1p(y)
+        final_discount = np.exp(-n * log_growth)
+        annuity = -np.expm1(-n * log_growth) / y
+        # From y * A = 1 - v^n, differentiating once and twice
+        annuity_d1 = (n * final_discount / (1 + y) - annuity) / y
+        annuity_d2 = (-n * (n + 1) * final_discount / (1 + y) ** 2 - 2 * annuity_d1) / y
+
+    # First-order Taylor expansion around y = 0, using sum_{t=1}^{n} t(t+1)..(t+k-1) = n(n+1)..(n+k)/(k+1)
+    small = np.abs(n * y) < SMALL_RATE_THRESHOLD
+    if np.any(small):
+        s1 = n * (n + 1) / 2
+        s2 = n * (n + 1) * (n + 2) / 3
+        s3 = n * (n + 1) * (n + 2) * (n + 3) / 4
+        annuity = np.where(small, n - s1 * y, annuity)
+        annuity_d1 = np.where(small, -s1 + s2 * y, annuity_d1)
+        annuity_d2 = np.where(small, s2 - s3 * y, annuity_d2)
+
+    return final_discount, annuity, annuity_d1, annuity_d2
+
+
+# Function to calculate the discount terms for a (rate, maturity, frequency) key, memoised in a
+# process-wide LRU cache so every bond function and every Streamlit session shares the results.
+# The rate is passed as raw bytes so a whole grid of rates can be one hashable key.
+@lru_cache(maxsize=DISCOUNT_CACHE_SIZE)
+def _cached_discount_terms(rate_bytes, years_to_maturity, frequency):
+    rate = np.frombuffer(rate_bytes, dtype=float)
+    terms = annuity_terms(rate / frequency, np.rint(years_to_maturity * frequency))
+    for term in terms:
+        term.flags.writeable = False
+    return terms
+
+
+# Function to look up the discount terms (final discount factor, annuity factor and its two
+# derivatives) for a scalar rate or a grid of rates at one maturity and frequency
+def discount_terms(discount_rate, years_to_maturity, frequency=1):
+    rate = np.asarray(discount_rate, dtype=float)
+    terms = _cached_discount_terms(rate.tobytes(), float(years_to_maturity), float(frequency))
+    return tuple(term.reshape(rate.shape) for term in terms)
+
+
+# Function to build the cash-flow schedule of a bond per unit of principal: payment times in
+# years and amounts, with the principal repaid alongside the final coupon
+@lru_cache(maxsize=SCHEDULE_CACHE_SIZE)
+def _cached_cash_flow_schedule(coupon_rate, years_to_maturity, frequency):
+    periods = int(round(years_to_maturity * frequency))
+    times = np.arange(1, periods + 1) / frequency
+    amounts = np.full(periods, coupon_rate / frequency)
+    if periods:
+        amounts[-1] += 1.0
+    times.flags.writeable = False
+    amounts.flags.writeable = False
+    return times, amounts
+
+
+# Function to get the cached cash-flow schedule of a bond, scaled to its principal
+def cash_flow_schedule(principal, coupon_rate, years_to_maturity, frequency=1):
+    times, amounts = _cached_cash_flow_schedule(float(coupon_rate), float(years_to_maturity), float(frequency))
+    return times, principal * amounts
+
+
+# Function to report hit/miss counters of the discount-term and cash-flow schedule caches
+def cache_stats():
+    stats = {}
+    for name, cached in (('discount_terms', _cached_discount_terms), ('cash_flow_schedule', _cached_cash_flow_schedule)):
+        info = cached.cache_info()
+        lookups = info.hits + info.misses
+        stats[name] = {
+            'hits': info.hits,
+            'misses': info.misses,
+            'hit_rate': info.hits / lookups if lookups else 0.0,
+            'size': info.currsize,
+            'max_size': info.maxsize,
+        }
+    return stats
+
+
+# Function to empty the discount-term and cash-flow schedule caches
+def clear_caches():
+    _cached_discount_terms.cache_clear()
+    _cached_cash_flow_schedule.cache_clear()
+
+
+# Function to calculate price, Macaulay/modified duration and convexity for a whole portfolio
+def bond_analytics(principal, coupon_rate, years_to_maturity, discount_rate, frequency=1):
+    use_cache = (
+        np.ndim(years_to_maturity) == 0
+        and np.ndim(frequency) == 0
+        and np.ndim(discount_rate) <= 1
+        and np.size(discount_rate) <= CACHED_RATE_GRID_SIZE
+    )
+    if use_cache:
+        terms = discount_terms(discount_rate, years_to_maturity, frequency)
+
+    principal, coupon_rate, years_to_maturity, discount_rate, frequency = _broadcast_inputs(
+        principal, coupon_rate, years_to_maturity, discount_rate, frequency
+    )
+
+    periods = np.rint(years_to_maturity * frequency)
+    y = discount_rate / frequency
+    coupon_payment = principal * coupon_rate / frequency
+
+    if not use_cache:
+        terms = annuity_terms(y, periods)
+    final_discount, annuity, annuity_d1, annuity_d2 = terms
+
+    price = coupon_payment * annuity + principal * final_discount
+    price_d1 = coupon_payment * annuity_d1 - periods * principal * final_discount / (1 + y)
+    price_d2 = coupon_payment * annuity_d2 + periods * (periods + 1) * principal * final_discount / (1 + y) ** 2
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        modified = -price_d1 / price / frequency
+        macaulay = modified * (1 + y)
+        convexity = price_d2 / price / frequency ** 2
+
+    return {
+        'price': price,
+        'macaulay_duration': macaulay,
+        'modified_duration': modified,
+        'convexity': convexity,
+    }
+
+
+# Function to price a portfolio and return the analytics as a DataFrame, one row per bond
+def price_portfolio(principal, coupon_rate, years_to_maturity, discount_rate, frequency=1):
+    results = bond_analytics(principal, coupon_rate, years_to_maturity, discount_rate, frequency)
+    return pd.DataFrame({name: np.ravel(values) for name, values in results.items()})
+
+
+# Function to calculate bond valuation
+def bond_valuation(principal, coupon_rate, years_to_maturity, discount_rate, frequency=1):
+    return float(bond_analytics(principal, coupon_rate, years_to_maturity, discount_rate, frequency)['price'])
+
+
+# Function to calculate modified duration
+def modified_duration(principal, coupon_rate, years_to_maturity, discount_rate, frequency=1):
+    results = bond_analytics(principal, coupon_rate, years_to_maturity, discount_rate, frequency)
+
+    if results['price'] == 0:
+        return None  # Avoid division by zero
+
+    return float(results['modified_duration'])
+
+
+# Function to calculate current yield
+def current_yield(principal, coupon_rate, bond_price):
+    if np.ndim(bond_price) == 0 and bond_price == 0:
+        return None  # Avoid division by zero
+
+    coupon_payment = np.multiply(principal, coupon_rate)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.divide(coupon_payment, bond_price) * 100
+
+
+# Function to calculate Macaulay duration
+def macaulay_duration(principal, coupon_rate, years_to_maturity, discount_rate, frequency=1):
+    results = bond_analytics(principal, coupon_rate, years_to_maturity, discount_rate, frequency)
+
+    if results['price'] == 0:
+        return None  # Avoid division by zero
+
+    return float(results['macaulay_duration'])
+
+
+# Function to calculate the price of each bond and its slope dP/dy at a per-period yield y
+def _price_and_slope(principal, coupon_payment, periods, y):
+    final_discount, annuity, annuity_d1, _ = annuity_terms(y, periods)
+    with np.errstate(over='ignore', invalid='ignore'):
+        price = coupon_payment * annuity + principal * final_discount
+        slope = coupon_payment * annuity_d1 - periods * principal * final_discount / (1 + y)
+    return price, slope
+
+
+# Function to solve yield to maturity for an array of quoted prices at once.
+# Uses Newton's method with the analytic price derivative, falling back to bisection
+# whenever a Newton step leaves the bracket, so every solvable quote converges.
+def solve_ytm(principal, coupon_rate, years_to_maturity, bond_price, frequency=1, tolerance=1e-10, max_iterations=100):
+    principal, coupon_rate, years_to_maturity, bond_price, frequency = _broadcast_inputs(
+        principal, coupon_rate, years_to_maturity, bond_price, frequency
+    )
+    shape = principal.shape
+    principal, coupon_rate, years_to_maturity, bond_price, frequency = (
+        a.ravel() for a in (principal, coupon_rate, years_to_maturity, bond_price, frequency)
+    )
+
+    periods = np.rint(years_to_maturity * frequency)
+    coupon_payment = principal * coupon_rate / frequency
+    target_tolerance = tolerance * np.maximum(bond_price, 1.0)
+
+    # Price is strictly decreasing in y, so a positive price has exactly one yield above -1
+    solvable = (bond_price > 0) & (periods > 0) & (principal > 0) & (coupon_payment >= 0)
+
+    # Per-period bracket [lo, hi]; grow hi until the bond is cheaper there than quoted
+    lo = np.full(principal.shape, -0.99)
+    hi = np.ones(principal.shape)
+    for _ in range(60):
+        price_hi, _ = _price_and_slope(principal, coupon_payment, periods, hi)
+        too_low = solvable & (price_hi > bond_price)
+        if not np.any(too_low):
+            break
+        lo = np.where(too_low, hi, lo)
+        hi = np.where(too_low, hi * 2, hi)
+    price_lo, _ = _price_and_slope(principal, coupon_payment, periods, lo)
+    solvable &= price_lo >= bond_price
+
+    # Start from the textbook approximation (coupon + amortised discount) / average price
+    with np.errstate(divide='ignore', invalid='ignore'):
+        guess = (coupon_payment + (principal - bond_price) / periods) / ((principal + bond_price) / 2)
+    guess = np.where(np.isfinite(guess), guess, 0.05)
+    y = np.clip(guess, lo, hi)
+
+    iterations = np.zeros(principal.shape, dtype=int)
+    converged = np.zeros(principal.shape, dtype=bool)
+    active = solvable.copy()
+
+    for _ in range(max_iterations):
+        if not np.any(active):
+            break
+        idx = np.flatnonzero(active)
+        price, slope = _price_and_slope(principal[idx], coupon_payment[idx], periods[idx], y[idx])
+        error = price - bond_price[idx]
+        iterations[idx] += 1
+
+        done = np.abs(error) < target_tolerance[idx]
+        converged[idx[done]] = True
+
+        # Tighten the bracket around the root
+        lo[idx] = np.where(error > 0, y[idx], lo[idx])
+        hi[idx] = np.where(error > 0, hi[idx], y[idx])
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            newton = y[idx] - error / slope
+        midpoint = (lo[idx] + hi[idx]) / 2
+        inside = np.isfinite(newton) & (newton > lo[idx]) & (newton < hi[idx])
+        y[idx] = np.where(done, y[idx], np.where(inside, newton, midpoint))
+
+        # A collapsed bracket is as precise as floating point allows
+        collapsed = hi[idx] - lo[idx] <= 4 * np.finfo(float).eps * np.maximum(np.abs(y[idx]), 1.0)
+        converged[idx[collapsed]] = True
+        active[idx[done | collapsed]] = False
+
+    ytm = np.where(converged, y * frequency, np.nan)
+    return {
+        'ytm': ytm.reshape(shape),
+        'iterations': iterations.reshape(shape),
+        'converged': converged.reshape(shape),
+    }
+
+
+# Function to calculate yield to maturity (YTM) using Newton's method with a bisection fallback
+def calculate_ytm(principal, coupon_rate, years_to_maturity, bond_price, frequency=1):
+    result = solve_ytm(principal, coupon_rate, years_to_maturity, bond_price, frequency)
+
+    if not result['converged']:
+        return None
+
+    return float(result['ytm'])
@@ -0,0 +1,228 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+# Typed columnar storage for the CSV datasets loaded by the dashboards.
+#
+# A freshly parsed CSV has its repeated strings converted to categoricals and its integers
+# downcast. FrameBuffer keeps those columns in numpy arrays with spare capacity, so rows appended
+# to the source are written into the spare space and the frame is rebuilt as views over the
+# arrays without copying the rows already loaded. Snapshots of a parsed prefix are stored as
+# Parquet in .data_cache/ next to the source, tied to the source by its fingerprint (mtime and
+# size) and a hash of the bytes they cover. Without pyarrow the cache falls back to pickle files.
+
+CACHE_DIR_NAME = '.data_cache'
+
+# Object columns with at most this share of distinct values become categoricals
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+
+
+# Function to check whether Parquet support is available
+def _parquet_available():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+# Function to shrink a freshly parsed frame: categoricals for repeated strings, smallest integer types
+def optimize_dtypes(data):
+    data = data.copy()
+    for column in data.columns:
+        series = data[column]
+        if pd.api.types.is_integer_dtype(series):
+            data[column] = pd.to_numeric(series, downcast='integer')
+        elif pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series):
+            if len(series) and series.nunique() <= CATEGORY_MAX_UNIQUE_RATIO * len(series):
+                data[column] = series.astype('category')
+    return data
+
+
+# Function to compute the fingerprint that ties a cache file to one version of its source
+def source_fingerprint(path, validate='mtime'):
+    stat = os.stat(path)
+    digest = hashlib.sha1(os.path.abspath(path).encode())
+    if validate == 'hash':
+        with open(path, 'rb') as source:
+            for block in iter(lambda: source.read(1 << 20), b''):
+                digest.update(block)
+    elif validate == 'mtime':
+        digest.update(f"{stat.st_mtime_ns}:{stat.st_size}".encode())
+    else:
+        raise ValueError(f"validate must be 'mtime' or 'hash', not {validate!r}")
+    return digest.hexdigest()[:16]
+
+
+# Function to write a frame to the cache atomically
+def _write_cache(data, target):
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    temporary = f"{target}.{os.getpid()}.tmp"
+    if target.endswith('.parquet'):
+        data.to_parquet(temporary, index=False)
+    else:
+        data.to_pickle(temporary)
+    os.replace(temporary, target)
+
+
+# Function to append new rows to a frame without losing its compact dtypes: categoricals are
+# widened to the union of categories and integers keep their width while the values fit
+def append_rows(data, new_rows):
+    new_rows = new_rows[data.columns].copy()
+    widened = {}
+    for column in data.columns:
+        dtype = data[column].dtype
+        if isinstance(dtype, pd.CategoricalDtype):
+            missing = pd.Index(new_rows[column].dropna().unique()).difference(dtype.categories)
+            if len(missing):
+                widened[column] = data[column].cat.add_categories(missing)
+                dtype = widened[column].dtype
+            new_rows[column] = pd.Categorical(new_rows[column], dtype=dtype)
+        elif pd.api.types.is_integer_dtype(dtype) and pd.api.types.is_integer_dtype(new_rows[column]):
+            info = np.iinfo(dtype)
+            values = new_rows[column]
+            if len(values) == 0 or (values.min() >= info.min and values.max() <= info.max):
+                new_rows[column] = values.astype(dtype)
+
+    if widened:
+        data = data.assign(**widened)
+    return pd.concat([data, new_rows], ignore_index=True)
+
+
+# Function to pick the integer type pandas uses for the codes of a categorical with n categories
+def _codes_dtype(n):
+    for dtype in (np.int8, np.int16, np.int32):
+        if n < np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+# One-dimensional numpy array that grows by doubling its capacity, so appends are amortized O(new values)
+class GrowingArray:
+    # The initial values are used as they are; the first append moves them to a larger array
+    def __init__(self, values):
+        self.values = np.asarray(values)
+        self.size = len(self.values)
+
+    @property
+    def dtype(self):
+        return self.values.dtype
+
+    # Function to change the element type, keeping the stored values
+    def astype(self, dtype):
+        if dtype != self.values.dtype:
+            self.values = self.values.astype(dtype)
+
+    # Function to append values; integers keep the current width while they fit, other types are promoted
+    def extend(self, values):
+        values = np.asarray(values)
+        if len(values) == 0:
+            return
+        if values.dtype != self.dtype:
+            if self.dtype.kind in 'iu' and values.dtype.kind in 'iub' and (
+                values.min() >= np.iinfo(self.dtype).min and values.max() <= np.iinfo(self.dtype).max
+            ):
+                values = values.astype(self.dtype)
+            else:
+                self.astype(np.result_type(self.dtype, values.dtype))
+        end = self.size + len(values)
+        if end > len(self.values):
+            grown = np.empty(max(2 * len(self.values), end, 1024), dtype=self.dtype)
+            grown[:self.size] = self.values[:self.size]
+            self.values = grown
+        self.values[self.size:end] = values
+        self.size = end
+
+    # Function to get the filled part of the array, without copying
+    def view(self):
+        return self.values[:self.size]
+
+
+# Columns of an append-only frame kept in growable arrays. Categoricals are stored as codes
+# with their categories, other strings as object arrays and everything else in its numpy type.
+class FrameBuffer:
+    def __init__(self, data):
+        self.columns = list(data.columns)
+        self.arrays = {}
+        self.categories = {}
+        for column in self.columns:
+            series = data[column]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                self.categories[column] = series.dtype
+                self.arrays[column] = GrowingArray(series.cat.codes.to_numpy())
+            elif isinstance(series.dtype, np.dtype):
+                self.arrays[column] = GrowingArray(series.to_numpy())
+            else:
+                self.arrays[column] = GrowingArray(series.to_numpy(dtype=object))
+        self.rows = len(data)
+
+    # Function to get the read_csv dtypes that parse appended rows into the stored types
+    def read_dtypes(self):
+        return {column: str for column in self.columns if column in self.categories or self.arrays[column].dtype == object}
+
+    # Function to append rows with the same columns; new category values are added to the categories
+    def append(self, new_rows):
+        for column in self.columns:
+            values = new_rows[column]
+            if column in self.categories:
+                dtype = self.categories[column]
+                codes = dtype.categories.get_indexer(values)
+                missing = pd.unique(values[(codes == -1) & values.notna().to_numpy()])
+                if len(missing):
+                    dtype = pd.CategoricalDtype(dtype.categories.append(pd.Index(missing)), dtype.ordered)
+                    self.categories[column] = dtype
+                    codes = dtype.categories.get_indexer(values)
+                    self.arrays[column].astype(_codes_dtype(len(dtype.categories)))
+                self.arrays[column].extend(codes.astype(self.arrays[column].dtype))
+            elif self.arrays[column].dtype == object:
+                self.arrays[column].extend(values.to_numpy(dtype=object))
+            else:
+                self.arrays[column].extend(values.to_numpy())
+        self.rows += len(new_rows)
+
+    # Function to get the stored rows as a DataFrame whose columns are views of the arrays
+    def frame(self):
+        columns = {}
+        for column in self.columns:
+            values = self.arrays[column].view()
+            if column in self.categories:
+                columns[column] = pd.Series(
+                    pd.Categorical.from_codes(values, dtype=self.categories[column], validate=False), copy=False
+                )
+            else:
+                columns[column] = pd.Series(values, dtype=values.dtype, copy=False)
+        return pd.DataFrame(columns, columns=self.columns, copy=False)
+
+
+# Function to get the snapshot paths (frame and metadata) used by incremental loaders
+def snapshot_paths(path, cache_dir=None):
+    cache_dir = cache_dir or os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIR_NAME)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    extension = '.parquet' if _parquet_available() else '.pkl'
+    return os.path.join(cache_dir, f"{stem}.snapshot{extension}"), os.path.join(cache_dir, f"{stem}.snapshot.json")
+
+
+# Function to store a parsed prefix of an append-only CSV with the byte offset it covers
+def save_snapshot(path, data, metadata, cache_dir=None):
+    frame_path, metadata_path = snapshot_paths(path, cache_dir)
+    _write_cache(data, frame_path)
+    temporary = f"{metadata_path}.{os.getpid()}.tmp"
+    with open(temporary, 'w') as handle:
+        json.dump(metadata, handle)
+    os.replace(temporary, metadata_path)
+
+
+# Function to load the snapshot of a CSV, or None when there is no usable snapshot
+def load_snapshot(path, cache_dir=None):
+    frame_path, metadata_path = snapshot_paths(path, cache_dir)
+    if not (os.path.exists(frame_path) and os.path.exists(metadata_path)):
+        return None
+    with open(metadata_path) as handle:
+        metadata = json.load(handle)
+    data = pd.read_parquet(frame_path) if frame_path.endswith('.parquet') else pd.read_pickle(frame_path)
+    if len(data) != metadata.get('rows'):
+        return None
+    return data, metadata
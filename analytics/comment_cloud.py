@@ -0,0 +1,73 @@
+import hashlib
+import io
+import re
+from collections import Counter
+
+# Word-cloud stage for free-text comments.
+#
+# Token frequencies are counted incrementally as comments arrive, together with a running hash
+# of the text, so a cached rendering can be keyed by that hash. The wordcloud package (and the
+# image stack it pulls in) is imported on first use rather than when the app starts.
+
+TOKEN_PATTERN = re.compile(r"[a-z][a-z']+")
+MAX_WORDS = 200
+
+_STOPWORDS = None
+
+
+# Function to get the wordcloud stopword list, importing wordcloud on first use only
+def _stopwords():
+    global _STOPWORDS
+    if _STOPWORDS is None:
+        from wordcloud import STOPWORDS
+
+        _STOPWORDS = frozenset(STOPWORDS)
+    return _STOPWORDS
+
+
+# Running token counts and text hash over a stream of comments
+class TokenCounter:
+    def __init__(self, column=None):
+        self.column = column
+        self.reset()
+
+    def reset(self):
+        self.counts = Counter()
+        self.documents = 0
+        self._hash = hashlib.sha1()
+
+    # Function to add comment texts to the counts
+    def add_texts(self, texts):
+        stopwords = _stopwords()
+        for text in texts:
+            if not isinstance(text, str):
+                continue
+            self._hash.update(text.encode())
+            self._hash.update(b'\x1f')
+            self.counts.update(token for token in TOKEN_PATTERN.findall(text.lower()) if token not in stopwords)
+            self.documents += 1
+
+    # Function to add the comment column of new rows; usable as an IncrementalCSV subscriber
+    def update(self, new_rows, reset=False):
+        if reset:
+            self.reset()
+        if self.column is not None and self.column in new_rows.columns:
+            self.add_texts(new_rows[self.column].dropna())
+
+    @property
+    def digest(self):
+        return self._hash.hexdigest()
+
+    def most_common(self, limit=MAX_WORDS):
+        return dict(self.counts.most_common(limit))
+
+
+# Function to render word frequencies to PNG bytes
+def render_word_cloud_png(frequencies, width=800, height=400, background_color='white'):
+    from wordcloud import WordCloud
+
+    cloud = WordCloud(width=width, height=height, background_color=background_color, max_words=MAX_WORDS)
+    image = cloud.generate_from_frequencies(frequencies).to_image()
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG')
+    return buffer.getvalue()
@@ -0,0 +1,197 @@
+import itertools
+import math
+
+import numpy as np
+import pandas as pd
+
+# CVSS v3.1 scoring following the FIRST specification (https://www.first.org/cvss/v3.1/specification-document).
+#
+# The base metric space is finite (4 x 2 x 3 x 2 x 2 x 3 x 3 x 3 = 2592 vectors), so every base
+# score is computed once at import into BASE_SCORES, indexed by the mixed-radix code of the
+# metric values. Scoring a vector is then a parse plus a table lookup; temporal and environmental
+# scores are derived from it with the spec formulas. Whole columns of vector strings are scored
+# by parsing each distinct vector once.
+
+BASE_METRICS = {
+    'AV': {'N': 0.85, 'A': 0.62, 'L': 0.55, 'P': 0.2},
+    'AC': {'L': 0.77, 'H': 0.44},
+    'PR': {'N': 0.85, 'L': 0.62, 'H': 0.27},
+    'UI': {'N': 0.85, 'R': 0.62},
+    'S': {'U': 'U', 'C': 'C'},
+    'C': {'H': 0.56, 'L': 0.22, 'N': 0.0},
+    'I': {'H': 0.56, 'L': 0.22, 'N': 0.0},
+    'A': {'H': 0.56, 'L': 0.22, 'N': 0.0},
+}
+
+# Privileges Required weights when the scope is changed
+PR_SCOPE_CHANGED = {'N': 0.85, 'L': 0.68, 'H': 0.5}
+
+TEMPORAL_METRICS = {
+    'E': {'X': 1.0, 'H': 1.0, 'F': 0.97, 'P': 0.94, 'U': 0.91},
+    'RL': {'X': 1.0, 'U': 1.0, 'W': 0.97, 'T': 0.96, 'O': 0.95},
+    'RC': {'X': 1.0, 'C': 1.0, 'R': 0.96, 'U': 0.92},
+}
+
+REQUIREMENT_METRICS = {
+    'CR': {'X': 1.0, 'H': 1.5, 'M': 1.0, 'L': 0.5},
+    'IR': {'X': 1.0, 'H': 1.5, 'M': 1.0, 'L': 0.5},
+    'AR': {'X': 1.0, 'H': 1.5, 'M': 1.0, 'L': 0.5},
+}
+
+# Modified base metrics; 'X' (not defined) falls back to the base metric value
+MODIFIED_METRICS = {f'M{metric}': dict(values, X=None) for metric, values in BASE_METRICS.items()}
+
+ALL_METRICS = {**BASE_METRICS, **TEMPORAL_METRICS, **REQUIREMENT_METRICS, **MODIFIED_METRICS}
+
+SEVERITY_BINS = [(0.0, 'None'), (0.1, 'Low'), (4.0, 'Medium'), (7.0, 'High'), (9.0, 'Critical')]
+
+
+# Function to round up to one decimal as defined in CVSS v3.1 Appendix A, avoiding float artefacts
+def roundup(value):
+    int_input = round(value * 100000)
+    if int_input % 10000 == 0:
+        return int_input / 100000.0
+    return (math.floor(int_input / 10000) + 1) / 10.0
+
+
+# Function to calculate impact and exploitability sub-scores and combine them into a score
+def _combined_score(av, ac, pr, ui, scope, c, i, a, modified=False):
+    pr_weight = (PR_SCOPE_CHANGED if scope == 'C' else BASE_METRICS['PR'])[pr]
+    exploitability = 8.22 * BASE_METRICS['AV'][av] * BASE_METRICS['AC'][ac] * pr_weight * BASE_METRICS['UI'][ui]
+
+    if modified:
+        iss = min(1 - (1 - c) * (1 - i) * (1 - a), 0.915)
+    else:
+        iss = 1 - (1 - c) * (1 - i) * (1 - a)
+
+    if scope == 'U':
+        impact = 6.42 * iss
+    elif modified:
+        impact = 7.52 * (iss - 0.029) - 3.25 * (iss * 0.9731 - 0.02) ** 13
+    else:
+        impact = 7.52 * (iss - 0.029) - 3.25 * (iss - 0.02) ** 15
+
+    if impact <= 0:
+        return None
+    if scope == 'U':
+        return min(impact + exploitability, 10)
+    return min(1.08 * (impact + exploitability), 10)
+
+
+# Function to calculate the base score of one combination of base metric values
+def _base_score(av, ac, pr, ui, scope, c, i, a):
+    score = _combined_score(
+        av, ac, pr, ui, scope, BASE_METRICS['C'][c], BASE_METRICS['I'][i], BASE_METRICS['A'][a]
+    )
+    return 0.0 if score is None else roundup(score)
+
+
+# Function to compute the mixed-radix position of a base vector in BASE_SCORES
+def base_code(metrics):
+    code = 0
+    for name, values in BASE_METRICS.items():
+        code = code * len(values) + list(values).index(metrics[name])
+    return code
+
+
+# Every base score, computed once at import
+BASE_SCORES = np.array(
+    [_base_score(*combination) for combination in itertools.product(*(list(values) for values in BASE_METRICS.values()))]
+)
+
+
+# Function to parse a CVSS v3.x vector string into a metric -> value dict
+def parse_vector(vector):
+    parts = vector.strip().split('/')
+    if parts and parts[0].startswith('CVSS:'):
+        if parts[0] not in ('CVSS:3.0', 'CVSS:3.1'):
+            raise ValueError(f"Unsupported CVSS version in {vector!r}")
+        parts = parts[1:]
+
+    metrics = {}
+    for part in parts:
+        name, _, value = part.partition(':')
+        if name not in ALL_METRICS or value not in ALL_METRICS[name]:
+            raise ValueError(f"Invalid CVSS metric {part!r} in {vector!r}")
+        if name in metrics:
+            raise ValueError(f"Duplicate CVSS metric {name!r} in {vector!r}")
+        metrics[name] = value
+
+    missing = [name for name in BASE_METRICS if name not in metrics]
+    if missing:
+        raise ValueError(f"CVSS vector {vector!r} is missing base metrics: {', '.join(missing)}")
+    return metrics
+
+
+# Function to map a score to its qualitative severity rating
+def severity(score):
+    label = 'None'
+    for threshold, name in SEVERITY_BINS:
+        if score >= threshold:
+            label = name
+    return label
+
+
+# Function to calculate base, temporal and environmental scores of one vector string
+def score_vector(vector):
+    metrics = parse_vector(vector)
+    base = float(BASE_SCORES[base_code(metrics)])
+
+    temporal_factor = 1.0
+    for name, values in TEMPORAL_METRICS.items():
+        temporal_factor *= values[metrics.get(name, 'X')]
+    temporal = roundup(base * temporal_factor)
+
+    # Modified metrics default to the base values; requirements weight the CIA impacts
+    modified = {
+        name: metrics[name] if metrics.get(f'M{name}', 'X') == 'X' else metrics[f'M{name}']
+        for name in BASE_METRICS
+    }
+    weighted = [
+        REQUIREMENT_METRICS[f'{name}R'][metrics.get(f'{name}R', 'X')] * BASE_METRICS[name][modified[name]]
+        for name in ('C', 'I', 'A')
+    ]
+    environmental = _combined_score(
+        modified['AV'], modified['AC'], modified['PR'], modified['UI'], modified['S'], *weighted, modified=True
+    )
+    environmental = 0.0 if environmental is None else roundup(roundup(environmental) * temporal_factor)
+
+    # The severity rating follows the most specific metric group present in the vector
+    if any(name in REQUIREMENT_METRICS or name in MODIFIED_METRICS for name in metrics):
+        overall = environmental
+    elif any(name in TEMPORAL_METRICS for name in metrics):
+        overall = temporal
+    else:
+        overall = base
+
+    return {
+        'base_score': base,
+        'temporal_score': temporal,
+        'environmental_score': environmental,
+        'severity': severity(overall),
+    }
+
+
+# Function to calculate the base score of one vector string by table lookup
+def base_score(vector):
+    return float(BASE_SCORES[base_code(parse_vector(vector))])
+
+
+# Function to score a whole column of vector strings; each distinct vector is parsed once.
+# Invalid vectors get NaN scores and a None severity.
+def score_vectors(vectors):
+    vectors = pd.Series(vectors)
+    codes, uniques = pd.factorize(vectors)
+
+    results = []
+    for vector in uniques:
+        try:
+            results.append(score_vector(vector))
+        except (ValueError, AttributeError):
+            results.append({'base_score': np.nan, 'temporal_score': np.nan, 'environmental_score': np.nan, 'severity': None})
+
+    table = pd.DataFrame(results, columns=['base_score', 'temporal_score', 'environmental_score', 'severity'])
+    missing = pd.DataFrame([{'base_score': np.nan, 'temporal_score': np.nan, 'environmental_score': np.nan, 'severity': None}])
+    table = pd.concat([table, missing], ignore_index=True)
+    # factorize marks missing values with -1, which indexes the trailing all-missing row
+    return table.iloc[codes].set_index(vectors.index)
@@ -0,0 +1,37 @@
+from .comment_cloud import TokenCounter
+from .entity_index import EntityIndex
+from .hr_index import FilterIndex
+from .incremental_loader import IncrementalCSV
+from .stream_metrics import StreamingMetrics
+from .ts_rollup import TimeRollup
+
+# Dataset loaders shared by the dashboards, batch jobs and benchmarks.
+#
+# Each function opens an incrementally refreshed CSV and attaches the derived structures the
+# matching dashboard reads from, so the same loading path is used with or without the UI.
+# Call loader.refresh() to pick up rows appended to the file.
+
+HR_COMMENT_COLUMN = 'comments'
+
+
+# Function to open the employee satisfaction dataset: returns (loader, filter_index, comment_counter)
+def open_hr_dataset(path, comment_column=HR_COMMENT_COLUMN, **loader_options):
+    loader = IncrementalCSV(path, **loader_options)
+    filter_index = FilterIndex(loader.data, source=lambda: loader.data)
+    comment_counter = TokenCounter(comment_column)
+    comment_counter.update(loader.data, reset=True)
+    loader.subscribe(filter_index.update)
+    loader.subscribe(comment_counter.update)
+    return loader, filter_index, comment_counter
+
+
+# Function to open the influencer dataset: returns (loader, rollup, entity_index, metrics)
+def open_influencer_dataset(path, **loader_options):
+    loader = IncrementalCSV(path, **loader_options)
+    rollup = TimeRollup(loader.data)
+    entity_index = EntityIndex(loader.data)
+    metrics = StreamingMetrics(loader.data)
+    loader.subscribe(rollup.update)
+    loader.subscribe(entity_index.update)
+    loader.subscribe(metrics.update)
+    return loader, rollup, entity_index, metrics
@@ -0,0 +1,135 @@
+import numpy as np
+import pandas as pd
+
+# Inverted index of influencers and hashtags for the influencer tracker.
+#
+# For each entity the index keeps the positions of its rows in the loaded frame, so one
+# entity's slice is a take of those positions instead of a boolean scan of the whole table.
+# Positions are appended per chunk as rows arrive and consolidated on first use. The index also
+# keeps the influencer x hashtag co-occurrence (posts and engagement per pair), stored per
+# entity in the same way: each append adds the pair sums of its rows to the entities they
+# mention, and an entity's chunks are added up when it is next read.
+
+ENTITY_COLUMNS = ['Influencer', 'Hashtag']
+PAIR_COLUMNS = ['Likes', 'Comments', 'Shares']
+# Entities returned by a name search
+SEARCH_LIMIT = 50
+
+
+# Function to group row positions by value: returns {value: sorted positions}
+def group_positions(values, offset=0):
+    codes, uniques = pd.factorize(values)
+    order = np.argsort(codes, kind='stable')
+    counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+    # factorize gives missing values code -1; they sort first and are skipped
+    start = len(codes) - counts.sum()
+    groups = {}
+    for value, count in zip(uniques, counts):
+        groups[value] = order[start:start + count] + offset
+        start += count
+    return groups
+
+
+# Function to count posts and sum engagement per (influencer, hashtag) pair
+def pair_table(rows):
+    grouped = rows.groupby(ENTITY_COLUMNS, observed=True, sort=False)
+    # Engagement columns may be downcast to small integers by the loader, so sum in int64
+    table = grouped[PAIR_COLUMNS].sum().astype('int64')
+    table.insert(0, 'Posts', grouped.size())
+    return table
+
+
+class EntityIndex:
+    def __init__(self, data=None):
+        self.update(data if data is not None else pd.DataFrame(columns=ENTITY_COLUMNS), reset=True)
+
+    # Function to index new rows; usable as an IncrementalCSV subscriber
+    def update(self, new_rows, reset=False):
+        if reset:
+            self.size = 0
+            self.chunks = {column: {} for column in ENTITY_COLUMNS}
+            # {column: {entity: [(other entities, [posts, likes, comments, shares] per pair), ...]}}
+            self.pairs = {column: {} for column in ENTITY_COLUMNS}
+        self._directory = None
+        if new_rows.empty:
+            return
+
+        for column in ENTITY_COLUMNS:
+            chunks = self.chunks[column]
+            for value, positions in group_positions(new_rows[column], self.size).items():
+                chunks.setdefault(value, []).append(positions)
+
+        new_pairs = pair_table(new_rows)
+        sums = new_pairs.to_numpy(dtype=np.int64)
+        for level, column in enumerate(ENTITY_COLUMNS):
+            others = np.asarray(new_pairs.index.get_level_values(1 - level), dtype=object)
+            pairs = self.pairs[column]
+            for value, rows in group_positions(new_pairs.index.get_level_values(level)).items():
+                pairs.setdefault(value, []).append((others[rows], sums[rows]))
+        self.size += len(new_rows)
+
+    # Function to tell which column an entity belongs to ('Influencer', 'Hashtag' or None)
+    def kind(self, entity):
+        for column in ENTITY_COLUMNS:
+            if entity in self.chunks[column]:
+                return column
+        return None
+
+    def names(self, column):
+        return sorted(self.chunks[column])
+
+    # Function to list every entity with its column and number of posts, most posts first
+    def directory(self):
+        if self._directory is None:
+            frames = [
+                pd.DataFrame({
+                    'name': pd.Series(list(chunks), dtype=object), 'kind': column,
+                    'posts': [sum(len(positions) for positions in entity_chunks) for entity_chunks in chunks.values()],
+                })
+                for column, chunks in self.chunks.items()
+            ]
+            self._directory = pd.concat(frames, ignore_index=True).sort_values(
+                ['posts', 'name'], ascending=[False, True], kind='stable', ignore_index=True
+            )
+        return self._directory
+
+    # Function to find the entities whose name contains text (ignoring case), most posts first
+    def search(self, text='', limit=SEARCH_LIMIT):
+        directory = self.directory()
+        if text:
+            directory = directory[directory['name'].astype(str).str.contains(text, case=False, regex=False)]
+        return directory['name'].head(limit).tolist()
+
+    # Function to get the sorted row positions of one entity
+    def positions(self, entity, column=None):
+        column = column or self.kind(entity)
+        chunks = self.chunks[column].get(entity) if column else None
+        if not chunks:
+            return np.empty(0, dtype=np.intp)
+        if len(chunks) > 1:
+            # Consolidate once, so later lookups are a single array
+            chunks[:] = [np.concatenate(chunks)]
+        return chunks[0]
+
+    # Function to get one entity's rows from the frame the index was built on
+    def rows(self, data, entity, column=None):
+        return data.iloc[self.positions(entity, column)]
+
+    # Function to get the co-occurrence of one entity with the other column, busiest first
+    def co_occurrence(self, entity, column=None, limit=None):
+        column = column or self.kind(entity)
+        chunks = self.pairs[column].get(entity) if column else None
+        if not chunks:
+            return pd.DataFrame(columns=['Posts', *PAIR_COLUMNS])
+        if len(chunks) > 1:
+            # Add the chunks up once per append, so later lookups read a single table
+            others = np.concatenate([other for other, _ in chunks])
+            codes, uniques = pd.factorize(others)
+            sums = np.zeros((len(uniques), len(PAIR_COLUMNS) + 1), dtype=np.int64)
+            np.add.at(sums, codes, np.concatenate([values for _, values in chunks]))
+            chunks[:] = [(np.asarray(uniques, dtype=object), sums)]
+        others, sums = chunks[0]
+        other_column = ENTITY_COLUMNS[1 - ENTITY_COLUMNS.index(column)]
+        table = pd.DataFrame(sums, index=pd.Index(others, name=other_column), columns=['Posts', *PAIR_COLUMNS])
+        table = table.sort_index().sort_values('Posts', ascending=False, kind='stable')
+        return table if limit is None else table.head(limit)
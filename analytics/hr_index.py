@@ -0,0 +1,171 @@
+import numpy as np
+import pandas as pd
+
+from .columnar_cache import append_rows
+
+# Precomputed filter index and aggregate cube for the HR satisfaction dashboard.
+#
+# The sidebar filters on (Dept, education, job_level). Instead of masking every row on each
+# rerun, the index maps every filter combination to its row positions once at load time, and
+# the cube holds the per-combination aggregates each chart needs, so charts are drawn from a
+# handful of precomputed rows. The index reads the rows from the loader's frame rather than
+# keeping a copy. When rows are appended, update() adds their positions to the touched
+# combinations and their counts to the cube; salary box statistics, which need every row of a
+# combination, are recomputed when a touched combination is next read.
+
+FILTER_COLUMNS = ['Dept', 'education', 'job_level']
+SALARY_QUANTILES = [0.25, 0.5, 0.75]
+AGE_BIN_WIDTH = 5
+
+
+# Function to count rows per filter combination and one or more extra columns
+def _group_counts(data, columns):
+    return data.groupby(FILTER_COLUMNS + columns, observed=True, sort=True).size().rename('count')
+
+
+# Function to calculate box-plot statistics of salary per filter combination and satisfaction,
+# with whiskers at the furthest points within 1.5 IQR as plotly draws them
+def salary_box_stats(data):
+    keys = FILTER_COLUMNS + ['satisfied']
+    grouped = data.groupby(keys, observed=True, sort=True)['salary']
+    stats = grouped.quantile(SALARY_QUANTILES).unstack()
+    stats.columns = ['q1', 'median', 'q3']
+    stats['mean'] = grouped.mean()
+
+    iqr = stats['q3'] - stats['q1']
+    limits = pd.DataFrame({'low': stats['q1'] - 1.5 * iqr, 'high': stats['q3'] + 1.5 * iqr})
+    limits = data[keys + ['salary']].join(limits, on=keys)
+    stats['lowerfence'] = limits['salary'].where(limits['salary'] >= limits['low']).groupby(
+        [limits[key] for key in keys], observed=True).min()
+    stats['upperfence'] = limits['salary'].where(limits['salary'] <= limits['high']).groupby(
+        [limits[key] for key in keys], observed=True).max()
+    return stats
+
+
+# Function to build the aggregate cube: one table per chart, indexed by the filter combination
+def build_cube(data, age_edges):
+    age_bins = pd.Series(
+        np.clip(np.searchsorted(age_edges, data['age'], side='right') - 1, 0, len(age_edges) - 2),
+        index=data.index, name='age_bin',
+    )
+    return {
+        'satisfaction': _group_counts(data, ['satisfied']),
+        'salary_box': salary_box_stats(data),
+        'rating_awards': _group_counts(data, ['rating', 'awards', 'satisfied']),
+        'age_histogram': _group_counts(data.assign(age_bin=age_bins), ['age_bin']),
+        'education': _group_counts(data, ['education']),
+        'location': _group_counts(data, ['location']),
+    }
+
+
+# Function to pick fixed age bin edges covering the whole dataset, so every group shares them
+def age_bin_edges(ages, width=AGE_BIN_WIDTH):
+    low = int(np.floor(ages.min() / width) * width)
+    high = int(np.floor(ages.max() / width) * width) + width
+    return np.arange(low, high + width, width)
+
+
+# Index from each (Dept, education, job_level) combination to its rows and aggregates.
+# source is a function returning the current frame, such as the loader's data, when the rows
+# are owned by someone else; the index then expects appended rows to already be in that frame.
+class FilterIndex:
+    def __init__(self, data, source=None):
+        self.source = source
+        self.build(data)
+
+    @property
+    def data(self):
+        return self.source() if self.source is not None else self._data
+
+    # Function to (re)build the index and cube from a full frame
+    def build(self, data):
+        data = data.reset_index(drop=True)
+        if self.source is None:
+            self._data = data
+        self.age_edges = age_bin_edges(data['age'])
+        # Positions of every combination, as a list of chunks that is joined when first read
+        self.positions = {
+            key: [rows] for key, rows in data.groupby(FILTER_COLUMNS, observed=True, sort=False).indices.items()
+        }
+        self.cube = build_cube(data, self.age_edges)
+        self.stale_boxes = set()
+        self._options = {}
+
+    # Function to merge appended rows into the index and cube; usable as an IncrementalCSV subscriber
+    def update(self, new_rows, reset=False):
+        if reset:
+            self.build(new_rows)
+            return
+        if new_rows.empty:
+            return
+
+        if self.source is None:
+            self._data = append_rows(self._data, new_rows)
+        start = len(self.data) - len(new_rows)
+        added = new_rows.reset_index(drop=True)
+        if added['age'].min() < self.age_edges[0] or added['age'].max() >= self.age_edges[-1]:
+            self.build(self.data)
+            return
+
+        touched = added.groupby(FILTER_COLUMNS, observed=True, sort=False).indices
+        for key, rows in touched.items():
+            self.positions.setdefault(key, []).append(rows + start)
+
+        # Counts are additive; box statistics of the touched combinations are marked for recomputation
+        for name, table in build_cube(added, self.age_edges).items():
+            if name != 'salary_box':
+                self.cube[name] = self.cube[name].add(table, fill_value=0).astype(int)
+        self.stale_boxes.update(touched)
+        self._options = {}
+
+    # Function to list the values offered by a filter, in order of first appearance like Series.unique.
+    # Read from the combinations' first row positions, so the frame is not scanned; rows with a
+    # missing filter value belong to no combination and are left out.
+    def options(self, column):
+        if column not in self._options:
+            level = FILTER_COLUMNS.index(column)
+            first = {}
+            for key, chunks in self.positions.items():
+                first[key[level]] = min(first.get(key[level], chunks[0][0]), chunks[0][0])
+            self._options[column] = sorted(first, key=first.get)
+        return self._options[column]
+
+    # Function to get the row positions of one filter combination without scanning the frame
+    def rows(self, dept, education, job_level):
+        chunks = self.positions.get((dept, education, job_level))
+        if not chunks:
+            return np.empty(0, dtype=np.intp)
+        if len(chunks) > 1:
+            # Consolidate once, so later lookups are a single array
+            chunks[:] = [np.concatenate(chunks)]
+        return chunks[0]
+
+    # Function to get the rows of one filter combination as a DataFrame
+    def select(self, dept, education, job_level):
+        return self.data.iloc[self.rows(dept, education, job_level)]
+
+    # Function to recompute the salary box statistics of a combination that received new rows
+    def _refresh_box(self, key):
+        self.stale_boxes.discard(key)
+        salary_box = self.cube['salary_box']
+        fresh = salary_box_stats(self.data.iloc[self.rows(*key)])
+        untouched = ~salary_box.index.droplevel('satisfied').isin([key])
+        self.cube['salary_box'] = pd.concat([salary_box[untouched], fresh]).sort_index()
+
+    # Function to read one cube table for a filter combination, with the filter levels dropped
+    def aggregate(self, name, dept, education, job_level):
+        key = (dept, education, job_level)
+        if name == 'salary_box' and key in self.stale_boxes:
+            self._refresh_box(key)
+        table = self.cube[name]
+        try:
+            result = table.loc[key]
+        except KeyError:
+            result = table.iloc[:0].droplevel(list(range(len(FILTER_COLUMNS))))
+        return result.reset_index()
+
+    # Function to get the age histogram of a filter combination as bin centres and counts
+    def age_histogram(self, dept, education, job_level):
+        counts = self.aggregate('age_histogram', dept, education, job_level)
+        centres = (self.age_edges[:-1] + self.age_edges[1:]) / 2
+        return pd.DataFrame({'age': centres[counts['age_bin']], 'count': counts['count'].to_numpy()})
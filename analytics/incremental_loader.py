@@ -0,0 +1,253 @@
+import hashlib
+import io
+import os
+import threading
+
+import pandas as pd
+
+from .columnar_cache import FrameBuffer, load_snapshot, optimize_dtypes, save_snapshot, source_fingerprint
+
+# Append-aware CSV loader for files that only grow, such as influencer_data.csv.
+#
+# The loader remembers how many bytes and rows it has already ingested. Each refresh() parses
+# only the bytes appended since the last call, writes them into the loader's column buffers
+# (see columnar_cache.FrameBuffer, so the rows already loaded are not copied) and hands them to
+# subscribers so derived aggregates can be updated from the new rows alone. A full load reads
+# up to the end of the file; a refresh holds back an unterminated last row while the file is
+# still growing, and reloads if a row it already parsed turns out to have been continued.
+# If the file shrinks, is rewritten in place, or its header or the bytes just before the
+# ingested offset change, the loader starts over.
+#
+# The parsed prefix is also kept as a columnar snapshot, so a cold start loads the snapshot
+# and parses only the tail written since. The snapshot records the source's fingerprint and a
+# SHA-1 of the bytes it covers; when the fingerprint differs and the hash no longer matches,
+# the file was edited and is loaded in full. A snapshot whose last row was unterminated and has
+# since been continued is not used either.
+
+# Number of bytes before the ingested offset used to check the file was not rewritten
+CHECK_WINDOW = 4096
+
+# Re-snapshot once the rows parsed since the last snapshot reach this share of the total
+SNAPSHOT_GROWTH_RATIO = 0.1
+
+
+# Raw reader over the byte range [start, end) of a file, so pandas can parse a slice in place
+class _ByteRange(io.RawIOBase):
+    def __init__(self, handle, start, end):
+        self.handle = handle
+        self.handle.seek(start)
+        self.remaining = end - start
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = min(len(buffer), self.remaining)
+        if size <= 0:
+            return 0
+        data = self.handle.read(size)
+        buffer[:len(data)] = data
+        self.remaining -= len(data)
+        return len(data)
+
+
+# Function to find the end of the last complete line at or before size
+def _complete_end(handle, start, size):
+    position = size
+    while position > start:
+        step = min(1 << 16, position - start)
+        handle.seek(position - step)
+        block = handle.read(step)
+        newline = block.rfind(b'\n')
+        if newline != -1:
+            return position - step + newline + 1
+        position -= step
+    return start
+
+
+# Function to hash the bytes just before an offset, used to detect rewritten files between refreshes
+def _check_digest(handle, offset):
+    start = max(0, offset - CHECK_WINDOW)
+    handle.seek(start)
+    return hashlib.sha1(handle.read(offset - start)).hexdigest()
+
+
+# Function to hash the first `offset` bytes of a file, used to validate snapshots
+def _prefix_digest(handle, offset):
+    digest = hashlib.sha1()
+    handle.seek(0)
+    remaining = offset
+    while remaining > 0:
+        block = handle.read(min(1 << 20, remaining))
+        if not block:
+            break
+        digest.update(block)
+        remaining -= len(block)
+    return digest.hexdigest()
+
+
+# Function to tell whether the byte before an offset ends a line
+def _ends_line(handle, offset, start):
+    if offset <= start:
+        return True
+    handle.seek(offset - 1)
+    return handle.read(1) == b'\n'
+
+
+# Function to tell whether an unterminated last row read up to offset was continued by later
+# writes, so the row already parsed is incomplete
+def _continued(handle, offset, size, terminated):
+    if terminated or size <= offset:
+        return False
+    handle.seek(offset)
+    return handle.read(1) not in (b'\n', b'\r')
+
+
+class IncrementalCSV:
+    def __init__(self, path, columns=None, snapshot=True, cache_dir=None):
+        self.path = path
+        self.columns = list(columns) if columns is not None else None
+        self.snapshot = snapshot
+        self.cache_dir = cache_dir
+        self.lock = threading.RLock()
+        self.subscribers = []
+        self.buffer = None
+        self.data = None
+        self.offset = 0
+        self.header = b''
+        self.file_columns = []
+        self.check = None
+        # Size and mtime of the file at the last look, to tell growth from in-place rewrites
+        self.size = 0
+        self.mtime = None
+        # Whether the ingested bytes end with a newline (a full load can end on an unterminated row)
+        self.terminated = True
+        self.snapshot_rows = 0
+        # Bumped whenever data changes, so results derived from it can be cached per version
+        self.version = 0
+        self.load()
+
+    # Function to register a callback(new_rows, reset) that keeps a derived aggregate in sync.
+    # It is called with only the appended rows (the last rows of data), or with the whole frame
+    # and reset=True on a full reload.
+    def subscribe(self, callback):
+        with self.lock:
+            self.subscribers.append(callback)
+
+    @property
+    def rows(self):
+        return len(self.data)
+
+    # Function to do a full load, starting from the snapshot when it still matches the file
+    def load(self):
+        with self.lock:
+            restored = self.snapshot and self._restore_snapshot()
+            if not restored:
+                stat = os.stat(self.path)
+                with open(self.path, 'rb') as handle:
+                    self.header = handle.readline()
+                    end = stat.st_size
+                    handle.seek(0)
+                    data = optimize_dtypes(pd.read_csv(io.BufferedReader(_ByteRange(handle, 0, end)), usecols=self.columns))
+                    self.file_columns = list(pd.read_csv(io.BytesIO(self.header), nrows=0).columns)
+                    self.terminated = _ends_line(handle, end, len(self.header))
+                    self.check = _check_digest(handle, end)
+                self.buffer = FrameBuffer(data)
+                self.data = self.buffer.frame()
+                self.offset, self.size, self.mtime = end, stat.st_size, stat.st_mtime_ns
+                self._save_snapshot()
+            self.version += 1
+            for callback in self.subscribers:
+                callback(self.data, True)
+            if restored:
+                self.refresh()
+
+    # Function to parse rows appended since the last call; returns the new rows
+    def refresh(self):
+        with self.lock:
+            stat = os.stat(self.path)
+            size = stat.st_size
+            with open(self.path, 'rb') as handle:
+                rewritten = size < self.offset or (size == self.size and stat.st_mtime_ns != self.mtime)
+                if rewritten or handle.readline() != self.header or not self._unchanged(handle):
+                    self.load()
+                    return self.data.iloc[:0]
+                if _continued(handle, self.offset, size, self.terminated):
+                    # The last row of the previous read was cut short; it has to be parsed again
+                    self.load()
+                    return self.data.iloc[:0]
+
+                end = _complete_end(handle, self.offset, size)
+                if end < size and size == self.size:
+                    # The unterminated tail did not grow since the last look, so it is a whole row
+                    end = size
+                self.size, self.mtime = size, stat.st_mtime_ns
+                if end <= self.offset:
+                    return self.data.iloc[:0]
+                new_rows = pd.read_csv(
+                    io.BufferedReader(_ByteRange(handle, self.offset, end)), header=None, names=self.file_columns,
+                    usecols=self.columns, dtype=self.buffer.read_dtypes(),
+                )
+                self.terminated = _ends_line(handle, end, self.offset)
+                self.check = _check_digest(handle, end)
+
+            start = self.rows
+            self.offset = end
+            if new_rows.empty:
+                return self.data.iloc[:0]
+            self.buffer.append(new_rows)
+            self.data = self.buffer.frame()
+            self.version += 1
+            new_rows = self.data.iloc[start:]
+            for callback in self.subscribers:
+                callback(new_rows, False)
+            if self.rows - self.snapshot_rows >= SNAPSHOT_GROWTH_RATIO * self.rows:
+                self._save_snapshot()
+            return new_rows
+
+    # Function to check that the bytes just before the ingested offset have not been rewritten
+    def _unchanged(self, handle):
+        return _check_digest(handle, self.offset) == self.check
+
+    # Function to restore the snapshot if the file is unchanged since it was taken (same
+    # fingerprint) or has only been appended to (the bytes it covers still hash the same)
+    def _restore_snapshot(self):
+        snapshot = load_snapshot(self.path, self.cache_dir)
+        if snapshot is None:
+            return False
+        data, metadata = snapshot
+        stat = os.stat(self.path)
+        offset = metadata['offset']
+        with open(self.path, 'rb') as handle:
+            header = handle.readline()
+            if (header.decode(errors='replace') != metadata['header'] or metadata.get('columns') != self.columns
+                    or stat.st_size < offset):
+                return False
+            if (source_fingerprint(self.path) != metadata.get('fingerprint')
+                    and _prefix_digest(handle, offset) != metadata.get('sha1')):
+                return False
+            # A snapshot ending in an unterminated row that has since been continued holds a cut row
+            self.terminated = _ends_line(handle, offset, len(header))
+            if _continued(handle, offset, stat.st_size, self.terminated):
+                return False
+            self.check = _check_digest(handle, offset)
+        self.buffer = FrameBuffer(data)
+        self.data = self.buffer.frame()
+        self.offset, self.header = offset, header
+        # The tail written since the snapshot is read like a full load, up to the end of the file
+        self.size, self.mtime = stat.st_size, stat.st_mtime_ns
+        self.file_columns = list(pd.read_csv(io.BytesIO(header), nrows=0).columns)
+        self.snapshot_rows = len(data)
+        return True
+
+    def _save_snapshot(self):
+        self.snapshot_rows = self.rows
+        if self.snapshot:
+            with open(self.path, 'rb') as handle:
+                sha1 = _prefix_digest(handle, self.offset)
+            metadata = {
+                'offset': self.offset, 'rows': self.rows, 'columns': self.columns,
+                'header': self.header.decode(errors='replace'), 'sha1': sha1,
+                'fingerprint': source_fingerprint(self.path),
+            }
+            save_snapshot(self.path, self.data, metadata, self.cache_dir)
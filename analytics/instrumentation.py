@@ -0,0 +1,167 @@
+import functools
+import json
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+# Per-rerun timing and cache instrumentation for the dashboards.
+#
+# A rerun is opened with start_rerun(page, session); inside it, named stages are timed with the
+# stage() context manager or the timed() decorator, and calls through a counted_cache() wrapper
+# are recorded as cache hits or misses. Records are kept in a bounded in-memory buffer shared by
+# all sessions of the process (Streamlit runs each session in its own thread, so the current
+# rerun is thread-local) and can be summarised, binned for latency histograms or written out as
+# JSON lines for aggregation across sessions.
+
+MAX_RECORDS = 20_000
+LATENCY_PERCENTILES = [50, 95, 99]
+
+
+class Recorder:
+    def __init__(self, max_records=MAX_RECORDS):
+        self.records = deque(maxlen=max_records)
+        self.lock = threading.Lock()
+        self._local = threading.local()
+
+    # Function to begin a rerun; later records carry its page, session and rerun id
+    def start_rerun(self, page, session=None):
+        self._local.context = {'page': page, 'session': session or uuid.uuid4().hex, 'rerun': uuid.uuid4().hex}
+
+    def _context(self):
+        return getattr(self._local, 'context', {'page': None, 'session': None, 'rerun': None})
+
+    def _add(self, record):
+        record = {'time': time.time(), **self._context(), **record}
+        with self.lock:
+            self.records.append(record)
+        return record
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._add({'kind': 'stage', 'stage': name, 'seconds': time.perf_counter() - start})
+
+    # Function to time every call of a function as a stage
+    def timed(self, name=None):
+        def decorate(func):
+            @functools.wraps(func)
+            def call(*args, **kwargs):
+                with self.stage(name or func.__name__):
+                    return func(*args, **kwargs)
+            return call
+        return decorate
+
+    def cache_event(self, name, hit, seconds):
+        self._add({'kind': 'cache', 'stage': name, 'hit': bool(hit), 'seconds': seconds})
+
+    # Function to wrap a caching decorator (such as st.cache_data or st.cache_resource) so each
+    # call is timed and counted as a hit or a miss. The wrapped body only runs on a miss, which
+    # is how misses are told apart; the cache still sees the original function's name,
+    # signature and source through functools.wraps. Each call pushes its own flag on a
+    # per-thread stack, so a counted call made inside another one's body does not overwrite
+    # the outer call's outcome.
+    def counted_cache(self, cache, name=None):
+        def decorate(func):
+            label = name or func.__name__
+
+            @functools.wraps(func)
+            def compute(*args, **kwargs):
+                self._local.misses[-1] = True
+                return func(*args, **kwargs)
+
+            cached = cache(compute)
+
+            @functools.wraps(func)
+            def call(*args, **kwargs):
+                misses = getattr(self._local, 'misses', None)
+                if misses is None:
+                    misses = self._local.misses = []
+                misses.append(False)
+                start = time.perf_counter()
+                try:
+                    result = cached(*args, **kwargs)
+                finally:
+                    missed = misses.pop()
+                self.cache_event(label, not missed, time.perf_counter() - start)
+                return result
+
+            call.clear = getattr(cached, 'clear', None)
+            return call
+        return decorate
+
+    # Function to get a snapshot of the records as a DataFrame, optionally for one page
+    def frame(self, page=None):
+        with self.lock:
+            records = list(self.records)
+        frame = pd.DataFrame(records, columns=['time', 'page', 'session', 'rerun', 'kind', 'stage', 'seconds', 'hit'])
+        return frame if page is None else frame[frame['page'] == page]
+
+    # Function to get the records of the rerun running in this thread
+    def current_rerun(self):
+        rerun = self._context()['rerun']
+        with self.lock:
+            return [record for record in self.records if record['rerun'] == rerun]
+
+    # Function to summarise stage latencies: calls, mean, percentiles and max in milliseconds
+    def stage_summary(self, page=None):
+        stages = self.frame(page)
+        stages = stages[stages['kind'] == 'stage']
+        milliseconds = stages['seconds'] * 1000
+        grouped = milliseconds.groupby(stages['stage'], sort=False)
+        summary = grouped.agg(['count', 'mean', 'max'])
+        for percentile in LATENCY_PERCENTILES:
+            summary[f'p{percentile}'] = grouped.quantile(percentile / 100)
+        return summary[['count', 'mean'] + [f'p{percentile}' for percentile in LATENCY_PERCENTILES] + ['max']]
+
+    # Function to summarise cache calls: hits, misses, hit rate and mean latency per cached function
+    def cache_summary(self, page=None):
+        events = self.frame(page)
+        events = events[events['kind'] == 'cache']
+        hits = events['hit'].astype(bool)
+        grouped = events.assign(hits=hits, misses=~hits, ms=events['seconds'] * 1000).groupby('stage', sort=False)
+        summary = grouped.agg(hits=('hits', 'sum'), misses=('misses', 'sum'), mean_ms=('ms', 'mean'))
+        summary['hit_rate'] = summary['hits'] / (summary['hits'] + summary['misses'])
+        return summary
+
+    # Function to bin one stage's latencies in milliseconds on log-spaced edges for a histogram
+    def latency_histogram(self, stage, page=None, bins=30):
+        stages = self.frame(page)
+        values = stages.loc[(stages['kind'] == 'stage') & (stages['stage'] == stage), 'seconds'].to_numpy() * 1000
+        if len(values) == 0:
+            return pd.DataFrame(columns=['ms', 'count'])
+        low, high = max(values.min(), 1e-3), max(values.max(), 1e-3)
+        edges = np.geomspace(low, high * 1.0001, bins + 1) if high > low else np.array([low * 0.9, high * 1.1])
+        counts, edges = np.histogram(values, bins=edges)
+        return pd.DataFrame({'ms': np.sqrt(edges[:-1] * edges[1:]), 'count': counts})
+
+    # Function to serialise records as JSON lines
+    def to_jsonl(self, records=None):
+        if records is None:
+            with self.lock:
+                records = list(self.records)
+        return ''.join(json.dumps(record) + '\n' for record in records)
+
+    # Function to append this thread's current rerun to a JSON-lines file
+    def export_rerun(self, path):
+        text = self.to_jsonl(self.current_rerun())
+        with self.lock, open(path, 'a') as handle:
+            handle.write(text)
+
+
+# Function to load JSON-lines exports (one or several files) into one DataFrame
+def load_jsonl(paths):
+    if isinstance(paths, str):
+        paths = [paths]
+    return pd.concat([pd.read_json(path, lines=True) for path in paths], ignore_index=True)
+
+
+# Process-wide recorder shared by the dashboards
+RECORDER = Recorder()
@@ -0,0 +1,106 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .bond_engine import bond_analytics, cash_flow_schedule
+
+# Monte Carlo interest-rate scenarios for bond price risk.
+#
+# Two models are supported:
+#   'parallel'  an instantaneous parallel shift of the flat discount rate, normally distributed
+#   'vasicek'   a Vasicek short rate dr = a(b - r)dt + sigma dW simulated exactly to the horizon;
+#               the remaining cash flows are discounted with Vasicek zero-coupon bond prices
+# Scenarios are generated in fixed-size chunks, each with its own child seed spawned from one
+# root seed, so results are reproducible no matter how many worker processes run the chunks.
+
+DEFAULT_CHUNK_SIZE = 250_000
+
+
+# Function to calculate Vasicek zero-coupon bond prices P(tau) for an array of short rates
+def vasicek_discount_factors(short_rate, tau, mean_reversion, long_term_rate, volatility):
+    short_rate = np.asarray(short_rate, dtype=float)[:, None]
+    tau = np.asarray(tau, dtype=float)[None, :]
+
+    b = -np.expm1(-mean_reversion * tau) / mean_reversion
+    log_a = (long_term_rate - volatility ** 2 / (2 * mean_reversion ** 2)) * (b - tau) - volatility ** 2 * b ** 2 / (4 * mean_reversion)
+    return np.exp(log_a - b * short_rate)
+
+
+# Function to sample the Vasicek short rate at the horizon using its exact Gaussian transition
+def sample_vasicek_rates(rng, size, initial_rate, mean_reversion, long_term_rate, volatility, horizon):
+    decay = np.exp(-mean_reversion * horizon)
+    mean = long_term_rate + (initial_rate - long_term_rate) * decay
+    std = volatility * np.sqrt(-np.expm1(-2 * mean_reversion * horizon) / (2 * mean_reversion))
+    return mean + std * rng.standard_normal(size)
+
+
+# Function to compute scenario P&L for one chunk; runs inside worker processes
+def _scenario_chunk(task):
+    model, size, seed, bond, params = task
+    rng = np.random.default_rng(seed)
+    principal, coupon_rate, years_to_maturity, discount_rate, frequency = bond
+
+    if model == 'parallel':
+        base_price = bond_analytics(principal, coupon_rate, years_to_maturity, discount_rate, frequency)['price']
+        shifts = params['shift_volatility'] * rng.standard_normal(size)
+        prices = bond_analytics(principal, coupon_rate, years_to_maturity, discount_rate + shifts, frequency)['price']
+        return prices - base_price
+
+    if model == 'vasicek':
+        horizon = params['horizon']
+        short_rate = sample_vasicek_rates(
+            rng, size, discount_rate, params['mean_reversion'], params['long_term_rate'], params['volatility'], horizon
+        )
+        times, amounts = cash_flow_schedule(principal, coupon_rate, years_to_maturity, frequency)
+        remaining = times > horizon
+        discount = vasicek_discount_factors(
+            short_rate, times[remaining] - horizon, params['mean_reversion'], params['long_term_rate'], params['volatility']
+        )
+        horizon_value = discount @ amounts[remaining] + amounts[~remaining].sum()
+        # Price today off the same model so the P&L carries no model basis
+        base_price = vasicek_discount_factors(
+            [discount_rate], times, params['mean_reversion'], params['long_term_rate'], params['volatility']
+        ) @ amounts
+        return horizon_value - base_price
+
+    raise ValueError(f"Unknown scenario model: {model!r}")
+
+
+# Function to simulate P&L across many rate scenarios, chunked across worker processes
+def simulate_pnl(principal, coupon_rate, years_to_maturity, discount_rate, frequency=1, model='parallel',
+                 n_scenarios=100_000, seed=0, workers=None, chunk_size=DEFAULT_CHUNK_SIZE, **params):
+    sizes = [min(chunk_size, n_scenarios - start) for start in range(0, n_scenarios, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    bond = (float(principal), float(coupon_rate), float(years_to_maturity), float(discount_rate), float(frequency))
+    tasks = [(model, size, child, bond, params) for size, child in zip(sizes, seeds)]
+
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    if workers <= 1:
+        chunks = [_scenario_chunk(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunks = list(pool.map(_scenario_chunk, tasks))
+
+    return np.concatenate(chunks) if chunks else np.empty(0)
+
+
+# Function to summarise a P&L distribution as Value at Risk and Expected Shortfall (as positive losses)
+def risk_summary(pnl, levels=(0.95, 0.99)):
+    rows = []
+    for level in levels:
+        cutoff = np.quantile(pnl, 1 - level)
+        tail = pnl[pnl <= cutoff]
+        rows.append({
+            'Confidence': f"{level:.0%}",
+            'VaR ($)': -cutoff,
+            'Expected Shortfall ($)': -tail.mean() if tail.size else -cutoff,
+        })
+    return pd.DataFrame(rows)
+
+
+# Function to bin a P&L distribution so only a summary histogram is sent to the browser
+def pnl_histogram(pnl, bins=60):
+    counts, edges = np.histogram(pnl, bins=bins)
+    return pd.DataFrame({'P&L ($)': (edges[:-1] + edges[1:]) / 2, 'Scenarios': counts})
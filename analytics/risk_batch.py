@@ -0,0 +1,92 @@
+import io
+
+import numpy as np
+import pandas as pd
+
+from .cvss31 import score_vectors
+from .risk_models import (
+    calculate_combined_risk,
+    calculate_custom_risk_score,
+    calculate_cvss_score,
+    calculate_mttc,
+    calculate_mtti,
+)
+
+# Batch scoring of scanner findings with the risk_app.py models.
+#
+# A findings file (CSV or JSON lines) has one row per vulnerability with the same inputs as
+# the risk_app.py sliders. All five scores are computed as whole-column operations and the
+# findings can then be ranked and paged. Findings that carry a CVSS v3.1 vector in a
+# 'cvss_vector' column get spec-accurate CVSS scores from it instead of the slider formula.
+
+FINDING_COLUMNS = [
+    'impact', 'exploitability', 'complexity', 'likelihood', 'threat', 'vulnerability',
+    'recovery_time', 'detection_probability', 'containment_probability',
+]
+
+SCORE_COLUMNS = {
+    'cvss_score': 'CVSS',
+    'custom_risk_score': 'Custom',
+    'mtti': 'MTTI',
+    'mttc': 'MTTC',
+    'combined_risk_score': 'Combined',
+}
+
+
+# Function to read a findings file from a path or an uploaded file's bytes
+def load_findings(source, name=None):
+    name = name or (source if isinstance(source, str) else '')
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    if name.endswith(('.jsonl', '.ndjson', '.json')):
+        return pd.read_json(source, lines=True)
+    return pd.read_csv(source)
+
+
+# Function to compute all five risk scores for every finding in one pass over the columns
+def score_findings(findings):
+    missing = [column for column in FINDING_COLUMNS if column not in findings.columns]
+    if missing:
+        raise ValueError(f"Findings are missing required columns: {', '.join(missing)}")
+
+    columns = {column: findings[column].to_numpy(dtype=float) for column in FINDING_COLUMNS}
+    with np.errstate(divide='ignore'):
+        scores = {
+            'cvss_score': calculate_cvss_score(columns['impact'], columns['exploitability'], columns['complexity']),
+            'custom_risk_score': calculate_custom_risk_score(columns['likelihood'], columns['impact']),
+            'mtti': calculate_mtti(columns['recovery_time'], columns['detection_probability']),
+            'mttc': calculate_mttc(columns['recovery_time'], columns['containment_probability']),
+            'combined_risk_score': calculate_combined_risk(
+                columns['likelihood'], columns['impact'], columns['threat'], columns['vulnerability']
+            ),
+        }
+
+    if 'cvss_vector' in findings.columns:
+        cvss = score_vectors(findings['cvss_vector'])
+        scores['cvss_score'] = np.where(cvss['base_score'].notna(), cvss['base_score'], scores['cvss_score'])
+        scores['cvss_temporal_score'] = cvss['temporal_score']
+        scores['cvss_environmental_score'] = cvss['environmental_score']
+        scores['cvss_severity'] = cvss['severity']
+    return findings.assign(**scores)
+
+
+# Function to order scored findings by one score, highest first, and number them
+def rank_findings(scored, by='combined_risk_score'):
+    order = np.argsort(-scored[by].to_numpy(), kind='stable')
+    ranked = scored.iloc[order].reset_index(drop=True)
+    ranked.insert(0, 'rank', np.arange(1, len(ranked) + 1))
+    return ranked
+
+
+# Function to return one page of a ranked frame (pages numbered from 1)
+def page(frame, number, page_size):
+    start = (number - 1) * page_size
+    return frame.iloc[start:start + page_size]
+
+
+# Function to bin one score column for a distribution chart; infinite values are left out
+def score_histogram(scored, column, bins=50):
+    values = scored[column].to_numpy(dtype=float)
+    values = values[np.isfinite(values)]
+    counts, edges = np.histogram(values, bins=bins)
+    return pd.DataFrame({'score': (edges[:-1] + edges[1:]) / 2, 'findings': counts})
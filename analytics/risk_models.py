@@ -0,0 +1,37 @@
+import numpy as np
+
+# Risk scoring models used by risk_app.py.
+#
+# Every function works on scalars as well as NumPy arrays or pandas Series of equal length,
+# so the same formulas score one slider setting or a whole findings file.
+
+# Function to calculate CVSS score
+def calculate_cvss_score(impact, exploitability, complexity):
+    # Formula for CVSS Base Score
+    base_score = np.round(np.multiply(np.multiply(impact, exploitability), complexity), 2)
+    return base_score
+
+# Function to calculate a basic risk assessment score using a custom formula
+def calculate_custom_risk_score(likelihood, impact):
+    # Custom formula for risk score
+    risk_score = likelihood * impact
+    return risk_score
+
+# Function to calculate Mean Time to Identify (MTTI) based on input parameters
+def calculate_mtti(recovery_time, detection_probability):
+    # A detection probability of 1 gives an unbounded MTTI instead of a ZeroDivisionError
+    with np.errstate(divide='ignore'):
+        mtti = np.divide(recovery_time, np.subtract(1, detection_probability))
+    return mtti
+
+# Function to calculate Mean Time to Contain (MTTC) based on input parameters
+def calculate_mttc(recovery_time, containment_probability):
+    # A containment probability of 1 gives an unbounded MTTC instead of a ZeroDivisionError
+    with np.errstate(divide='ignore'):
+        mttc = np.divide(recovery_time, np.subtract(1, containment_probability))
+    return mttc
+
+# Function to calculate risk using the formula Risk = Likelihood * Impact + Threat * Vulnerability
+def calculate_combined_risk(likelihood, impact, threat, vulnerability):
+    risk_score = likelihood * impact + threat * vulnerability
+    return risk_score
@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+
+from .risk_models import calculate_combined_risk, calculate_mttc, calculate_mtti
+
+# Monte Carlo simulation of the combined risk, MTTI and MTTC models.
+#
+# Each model input is described by a distribution instead of a point estimate:
+#   {'dist': 'beta', 'alpha': 2, 'beta': 5, 'low': 0, 'high': 1}    beta scaled to [low, high]
+#   {'dist': 'triangular', 'low': 0, 'mode': 0.3, 'high': 1}
+#   {'dist': 'fixed', 'value': 12}
+# Samples are drawn in fixed-size batches from one seeded generator, so a run is reproducible
+# and memory per batch stays bounded.
+
+SIMULATION_INPUTS = [
+    'likelihood', 'impact', 'threat', 'vulnerability',
+    'recovery_time', 'detection_probability', 'containment_probability',
+]
+
+# Detection/containment probabilities are capped here so MTTI/MTTC stay finite
+PROBABILITY_CEILING = 0.999
+
+DEFAULT_PERCENTILES = [5, 25, 50, 75, 95, 99]
+DEFAULT_BATCH_SIZE = 500_000
+
+
+# Function to describe a beta distribution scaled to [low, high]
+def beta(alpha, beta, low=0.0, high=1.0):
+    return {'dist': 'beta', 'alpha': alpha, 'beta': beta, 'low': low, 'high': high}
+
+
+# Function to describe a triangular distribution
+def triangular(low, mode, high):
+    return {'dist': 'triangular', 'low': low, 'mode': mode, 'high': high}
+
+
+# Function to describe a constant input
+def fixed(value):
+    return {'dist': 'fixed', 'value': value}
+
+
+# Function to build a beta distribution on [low, high] with the given mean and concentration
+# (alpha + beta); higher concentration means less uncertainty around the mean
+def beta_from_mean(mean, concentration, low=0.0, high=1.0):
+    share = np.clip((mean - low) / (high - low), 1e-3, 1 - 1e-3)
+    return beta(share * concentration, (1 - share) * concentration, low, high)
+
+
+# Function to draw samples from one distribution spec
+def sample(spec, rng, size):
+    dist = spec['dist']
+    if dist == 'beta':
+        return spec['low'] + (spec['high'] - spec['low']) * rng.beta(spec['alpha'], spec['beta'], size)
+    if dist == 'triangular':
+        if spec['low'] == spec['high']:
+            return np.full(size, float(spec['low']))
+        return rng.triangular(spec['low'], spec['mode'], spec['high'], size)
+    if dist == 'fixed':
+        return np.full(size, float(spec['value']))
+    raise ValueError(f"Unknown distribution: {dist!r}")
+
+
+# Function to simulate the combined risk, MTTI and MTTC models over n_samples draws of the inputs
+def simulate_risk(inputs, n_samples=1_000_000, seed=0, batch_size=DEFAULT_BATCH_SIZE):
+    missing = [name for name in SIMULATION_INPUTS if name not in inputs]
+    if missing:
+        raise ValueError(f"Simulation is missing input distributions: {', '.join(missing)}")
+
+    rng = np.random.default_rng(seed)
+    results = {name: np.empty(n_samples) for name in ('combined_risk', 'mtti', 'mttc')}
+
+    for start in range(0, n_samples, batch_size):
+        size = min(batch_size, n_samples - start)
+        draws = {name: sample(inputs[name], rng, size) for name in SIMULATION_INPUTS}
+        detection = np.minimum(draws['detection_probability'], PROBABILITY_CEILING)
+        containment = np.minimum(draws['containment_probability'], PROBABILITY_CEILING)
+
+        batch = slice(start, start + size)
+        results['combined_risk'][batch] = calculate_combined_risk(
+            draws['likelihood'], draws['impact'], draws['threat'], draws['vulnerability']
+        )
+        results['mtti'][batch] = calculate_mtti(draws['recovery_time'], detection)
+        results['mttc'][batch] = calculate_mttc(draws['recovery_time'], containment)
+
+    return results
+
+
+# Function to summarise simulated outputs as mean and percentiles, one row per model
+def summarize(results, percentiles=DEFAULT_PERCENTILES):
+    rows = {}
+    for name, values in results.items():
+        row = {'mean': values.mean()}
+        row.update({f'p{p}': value for p, value in zip(percentiles, np.percentile(values, percentiles))})
+        rows[name] = row
+    return pd.DataFrame.from_dict(rows, orient='index')
+
+
+# Function to compute an exceedance curve P(X > x) on an evenly spaced grid of x values, from the
+# minimum up to the given upper quantile so a long tail does not flatten the curve
+def exceedance_curve(values, points=100, upper_quantile=0.999):
+    ordered = np.sort(values)
+    grid = np.linspace(ordered[0], ordered[int(upper_quantile * (len(ordered) - 1))], points)
+    probability = 1 - np.searchsorted(ordered, grid, side='right') / len(ordered)
+    return pd.DataFrame({'value': grid, 'exceedance_probability': probability})
@@ -0,0 +1,204 @@
+import numpy as np
+import pandas as pd
+
+# Satisfaction model and driver analysis for the HR dashboard.
+#
+# A logistic regression of `satisfied` on the employee attributes is fitted on the whole dataset
+# with Newton's method (a handful of vectorized iterations over a small design matrix). Numeric
+# factors are standardized and categorical factors one-hot encoded, and each factor's share of
+# the model is the spread of its contribution to the log-odds across employees. The fitted model
+# keeps only its coefficients, the scaling of the numeric factors and a few whole-workforce
+# statistics, so its size does not grow with the data; describing a filtered group (actual vs
+# predicted rate, which factors lift or lower it) computes the contributions of that group's
+# rows on demand.
+
+TARGET = 'satisfied'
+NUMERIC_FACTORS = ['age', 'job_level', 'rating', 'onsite', 'awards', 'certifications', 'salary']
+CATEGORICAL_FACTORS = ['Dept', 'location', 'education', 'recruitment_type']
+L2_PENALTY = 1.0
+MAX_ITERATIONS = 25
+TOLERANCE = 1e-8
+# Groups smaller than this are described without a predicted-vs-actual comparison
+MIN_GROUP_ROWS = 10
+
+
+# Function to get the position of each value in levels (-1 for missing or unknown values).
+# Categorical columns only look up their categories, not every row.
+def level_codes(values, levels):
+    levels = pd.Index(levels)
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        lookup = np.append(levels.get_indexer(values.cat.categories.astype(str)), -1)
+        return lookup[values.cat.codes.to_numpy()]
+    return pd.Categorical(values.astype(str), categories=levels).codes
+
+
+# Function to compute the logistic function without overflow for large log-odds
+def sigmoid(z):
+    return 0.5 * (1.0 + np.tanh(0.5 * z))
+
+
+# Function to fit a logistic regression with an L2 penalty by Newton's method.
+# The first column of X is the intercept, which is not penalized.
+def fit_logistic(X, y, l2=L2_PENALTY, max_iterations=MAX_ITERATIONS, tolerance=TOLERANCE):
+    penalty = np.full(X.shape[1], float(l2))
+    penalty[0] = 0.0
+    beta = np.zeros(X.shape[1])
+    for _ in range(max_iterations):
+        p = sigmoid(X @ beta)
+        gradient = X.T @ (y - p) - penalty * beta
+        hessian = (X * (p * (1 - p))[:, None]).T @ X + np.diag(penalty)
+        step = np.linalg.solve(hessian + 1e-9 * np.eye(len(beta)), gradient)
+        beta += step
+        if np.max(np.abs(step)) < tolerance:
+            break
+    return beta
+
+
+class SatisfactionModel:
+    def __init__(self, data, numeric=NUMERIC_FACTORS, categorical=CATEGORICAL_FACTORS, l2=L2_PENALTY):
+        self.numeric = [column for column in numeric if column in data.columns]
+        self.categorical = [column for column in categorical if column in data.columns]
+        self.means = data[self.numeric].mean()
+        self.scales = data[self.numeric].std(ddof=0).replace(0, 1).fillna(1)
+        self.levels = {
+            column: list(pd.unique(data[column].dropna().astype(str))) for column in self.categorical
+        }
+
+        X, self.factor_columns = self.design(data)
+        y = data[TARGET].to_numpy(dtype=np.float64)
+        self.coefficients = fit_logistic(X, y, l2)
+
+        # Mean and spread of every factor's contribution to the log-odds across all rows
+        contributions = self._contributions(X)
+        self.baseline = contributions.mean(axis=0)
+        self.spread = contributions.std(axis=0)
+        self.rows = len(y)
+        self.overall_rate = y.mean() if len(y) else np.nan
+
+    @property
+    def factors(self):
+        return self.numeric + self.categorical
+
+    # Function to build the design matrix: intercept, standardized numeric factors, then one
+    # indicator column per category level. Also returns the columns belonging to each factor.
+    def design(self, data):
+        blocks = [np.ones((len(data), 1))]
+        factor_columns = []
+        numeric = ((data[self.numeric] - self.means) / self.scales).fillna(0).to_numpy(dtype=np.float64)
+        for i in range(len(self.numeric)):
+            factor_columns.append([1 + i])
+        blocks.append(numeric)
+
+        offset = 1 + len(self.numeric)
+        for column in self.categorical:
+            levels = self.levels[column]
+            codes = level_codes(data[column], levels)
+            indicators = np.zeros((len(data), len(levels)))
+            present = codes >= 0
+            indicators[np.nonzero(present)[0], codes[present]] = 1.0
+            blocks.append(indicators)
+            factor_columns.append(list(range(offset, offset + len(levels))))
+            offset += len(levels)
+        return np.hstack(blocks), factor_columns
+
+    def _contributions(self, X):
+        return np.column_stack([X[:, columns] @ self.coefficients[columns] for columns in self.factor_columns])
+
+    # Function to compute every factor's contribution to the log-odds of the given rows directly,
+    # without the design matrix: a standardized value times its coefficient for numeric factors,
+    # the coefficient of the row's level for categorical factors
+    def contributions(self, data):
+        contributions = np.zeros((len(data), len(self.factors)))
+        numeric = (data[self.numeric].to_numpy(dtype=np.float64) - self.means.to_numpy()) / self.scales.to_numpy()
+        contributions[:, :len(self.numeric)] = np.nan_to_num(numeric) * self.coefficients[1:1 + len(self.numeric)]
+        for i, column in enumerate(self.categorical, start=len(self.numeric)):
+            effects = np.append(self.coefficients[self.factor_columns[i]], 0.0)
+            contributions[:, i] = effects[level_codes(data[column], self.levels[column])]
+        return contributions
+
+    # Function to score new rows: probability of being satisfied for each row
+    def predict(self, data):
+        X, _ = self.design(data)
+        return sigmoid(X @ self.coefficients)
+
+    # Function to rank the factors by their share of the model, with the direction of each effect.
+    # Numeric factors report the change in log-odds per standard deviation; categorical factors
+    # report the level with the highest and lowest effect.
+    def drivers(self):
+        spread = self.spread
+        total = spread.sum()
+        rows = []
+        for i, factor in enumerate(self.factors):
+            columns = self.factor_columns[i]
+            if factor in self.numeric:
+                effect = self.coefficients[columns[0]]
+                detail = f"{'higher' if effect >= 0 else 'lower'} {factor} raises satisfaction"
+            else:
+                effects = self.coefficients[columns]
+                levels = self.levels[factor]
+                effect = effects.max() - effects.min()
+                detail = f"highest for {levels[int(effects.argmax())]}, lowest for {levels[int(effects.argmin())]}"
+            rows.append({
+                'factor': factor, 'importance': spread[i] / total if total > 0 else 0.0,
+                'effect': effect, 'detail': detail,
+            })
+        return pd.DataFrame(rows).sort_values('importance', ascending=False, ignore_index=True)
+
+    # Function to describe the rows of data at the given positions: size, actual and predicted
+    # satisfaction rates, and how much each factor moves the group's log-odds relative to
+    # the whole workforce
+    def score(self, data, positions):
+        positions = np.asarray(positions)
+        if len(positions) == 0:
+            return {'rows': 0, 'actual': np.nan, 'predicted': np.nan, 'shifts': pd.Series(0.0, index=self.factors)}
+        group = data[self.factors + [TARGET]].iloc[positions]
+        contributions = self.contributions(group)
+        probabilities = sigmoid(self.coefficients[0] + contributions.sum(axis=1))
+        shifts = contributions.mean(axis=0) - self.baseline
+        return {
+            'rows': len(positions),
+            'actual': group[TARGET].to_numpy(dtype=np.float64).mean(),
+            'predicted': probabilities.mean(),
+            'shifts': pd.Series(shifts, index=self.factors).sort_values(key=np.abs, ascending=False),
+        }
+
+
+# Function to write the insight bullet points for a filtered group from the model and the data
+def insights(model, data, positions, top=3):
+    group = model.score(data, positions)
+    if group['rows'] == 0:
+        return ["No employees match the selected filters."]
+
+    lines = [
+        f"{group['rows']:,} employees match the filters; {group['actual']:.0%} are satisfied "
+        f"compared with {model.overall_rate:.0%} across all {model.rows:,} employees."
+    ]
+    if group['rows'] >= MIN_GROUP_ROWS:
+        gap = group['actual'] - group['predicted']
+        lines.append(
+            f"The model predicts {group['predicted']:.0%} satisfied for this group from its profile; the actual rate is "
+            f"{abs(gap):.0%} {'above' if gap >= 0 else 'below'} that, so factors outside the model explain the rest."
+            if abs(gap) >= 0.05 else
+            f"The model predicts {group['predicted']:.0%} satisfied for this group, close to the actual rate."
+        )
+
+    drivers = model.drivers().head(top)
+    lines.append("Strongest drivers overall: " + "; ".join(
+        f"{row.factor} ({row.importance:.0%}, {row.detail})" for row in drivers.itertuples()
+    ) + ".")
+
+    shifts = group['shifts'][group['shifts'].abs() > 0.05].head(top)
+    if not shifts.empty:
+        lines.append("Compared with the whole workforce, this group's satisfaction is " + ", ".join(
+            f"{'lifted' if shift > 0 else 'lowered'} by {factor}" for factor, shift in shifts.items()
+        ) + ".")
+
+    rows = data[['rating', 'awards']].iloc[positions]
+    if len(rows) >= MIN_GROUP_ROWS and rows['rating'].nunique() > 1 and rows['awards'].nunique() > 1:
+        correlation = rows['rating'].corr(rows['awards'])
+        strength = 'strong' if abs(correlation) >= 0.5 else 'moderate' if abs(correlation) >= 0.3 else 'weak'
+        lines.append(
+            f"Ratings and awards show a {strength} {'positive' if correlation >= 0 else 'negative'} "
+            f"correlation in this group (r = {correlation:.2f})."
+        )
+    return lines
@@ -0,0 +1,387 @@
+import functools
+import hashlib
+import inspect
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+import pandas as pd
+
+from .instrumentation import RECORDER
+
+# Two-tier result cache shared by the dashboards, batch jobs and every worker process.
+#
+# Results are looked up by (namespace, version, arguments). The first tier is an in-process LRU
+# bounded by bytes; the second is an SQLite file that every process on the machine opens, also
+# bounded by bytes and evicted least-recently-used, so a result computed by one Streamlit worker
+# is reused by the others. Entries can carry a time-to-live, and a version (for example the
+# fingerprint of the source file). Versions are numbered per namespace in the order they are
+# first stored, in the SQLite file when there is one so every process sees the same order:
+# storing a version never seen before removes the namespace's entries of older versions, while a
+# result for an older version (from a process still serving the previous file) is kept in that
+# process's memory only. Values are pickled; arguments whose parameter name starts with an
+# underscore are left out of the key, as with st.cache_data. Memory-tier hits return the stored
+# object, so callers must not modify cached results. A failure to pickle or to use the SQLite
+# file is logged and treated as a miss; it never fails the cached call.
+#
+# Settings come from the environment: DASHBOARD_CACHE_DIR (default .data_cache),
+# DASHBOARD_CACHE_MEMORY_MB (256), DASHBOARD_CACHE_DISK_MB (2048) and DASHBOARD_CACHE_TTL
+# (seconds, unset = no expiry). Set DASHBOARD_CACHE_DISK_MB to 0 to keep the cache in memory.
+
+CACHE_DIR = os.environ.get('DASHBOARD_CACHE_DIR', '.data_cache')
+CACHE_FILE_NAME = 'shared_cache.sqlite'
+MEMORY_BYTES = int(float(os.environ.get('DASHBOARD_CACHE_MEMORY_MB', 256)) * 1024 * 1024)
+DISK_BYTES = int(float(os.environ.get('DASHBOARD_CACHE_DISK_MB', 2048)) * 1024 * 1024)
+DEFAULT_TTL = float(os.environ['DASHBOARD_CACHE_TTL']) if os.environ.get('DASHBOARD_CACHE_TTL') else None
+# Seconds a process waits for another process's write to the SQLite file
+DISK_TIMEOUT = 30.0
+# SQLite's default limit on the size of a row; larger values are kept in memory only
+SQLITE_MAX_LENGTH = 1_000_000_000
+# Room left in a row for the columns other than the value
+ROW_OVERHEAD_BYTES = 64 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    namespace TEXT NOT NULL,
+    version TEXT NOT NULL,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    expires REAL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+CREATE INDEX IF NOT EXISTS entries_namespace ON entries (namespace, version);
+CREATE TABLE IF NOT EXISTS versions (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    namespace TEXT NOT NULL,
+    version TEXT NOT NULL,
+    UNIQUE (namespace, version)
+);
+"""
+
+# Outcomes of registering a version: first time seen, seen before and newest, seen before but superseded
+NEW_VERSION, CURRENT_VERSION, OLD_VERSION = 'new', 'current', 'old'
+
+logger = logging.getLogger(__name__)
+
+
+# Function to hash a namespace, version and arguments into a cache key
+def make_key(namespace, version, args=(), kwargs=None):
+    payload = pickle.dumps((namespace, version, args, sorted((kwargs or {}).items())), protocol=pickle.HIGHEST_PROTOCOL)
+    return hashlib.sha256(payload).hexdigest()
+
+
+# In-process tier: least-recently-used entries up to a total size in bytes
+class MemoryTier:
+    def __init__(self, max_bytes=MEMORY_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires = entry[2]
+            if expires is not None and expires <= time.time():
+                self._remove(key)
+                return None
+            self.entries.move_to_end(key)
+            return entry
+
+    def put(self, key, value, size, expires, namespace, version):
+        if size > self.max_bytes:
+            return
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+            self.entries[key] = (value, size, expires, namespace, version)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                self._remove(next(iter(self.entries)))
+                self.evictions += 1
+
+    def _remove(self, key):
+        self.bytes -= self.entries.pop(key)[1]
+
+    # Function to delete the entries of a namespace, except those of one version
+    def invalidate(self, namespace, keep_version=None):
+        with self.lock:
+            stale = [
+                key for key, entry in self.entries.items()
+                if entry[3] == namespace and (keep_version is None or entry[4] != keep_version)
+            ]
+            for key in stale:
+                self._remove(key)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
+
+
+# Shared tier: pickled entries in an SQLite file used by every process, up to a total size in bytes
+class DiskTier:
+    def __init__(self, path, max_bytes=DISK_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = min(max_bytes, SQLITE_MAX_LENGTH - ROW_OVERHEAD_BYTES)
+        self.evictions = 0
+        self._local = threading.local()
+
+    # Function to get this thread's connection, creating the file and schema on first use
+    def connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=DISK_TIMEOUT, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.executescript(SCHEMA)
+            self._local.connection = connection
+        return connection
+
+    def get(self, key):
+        connection = self.connection()
+        row = connection.execute('SELECT value, size, expires, version FROM entries WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        expires = row[2]
+        now = time.time()
+        if expires is not None and expires <= now:
+            connection.execute('DELETE FROM entries WHERE key = ?', (key,))
+            return None
+        connection.execute('UPDATE entries SET accessed = ? WHERE key = ?', (now, key))
+        return row
+
+    # Function to store an entry and register its version in one transaction. A new version
+    # deletes the entries of the namespace's older versions; an entry of an older version is not
+    # stored. Returns the version's outcome (NEW_VERSION, CURRENT_VERSION or OLD_VERSION).
+    def put(self, key, namespace, version, blob, expires):
+        connection = self.connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            status = self._register(connection, namespace, version)
+            if status != OLD_VERSION and len(blob) <= self.max_entry_bytes:
+                connection.execute(
+                    'INSERT OR REPLACE INTO entries (key, namespace, version, value, size, expires, accessed) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (key, namespace, version, blob, len(blob), expires, time.time()),
+                )
+                self._evict(connection)
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        return status
+
+    # Function to number a namespace's version on first sight and delete the entries of the
+    # versions numbered before it
+    def _register(self, connection, namespace, version):
+        inserted = connection.execute(
+            'INSERT OR IGNORE INTO versions (namespace, version) VALUES (?, ?)', (namespace, version)
+        ).rowcount
+        seq, newest = connection.execute(
+            'SELECT (SELECT seq FROM versions WHERE namespace = ? AND version = ?), '
+            '(SELECT MAX(seq) FROM versions WHERE namespace = ?)',
+            (namespace, version, namespace),
+        ).fetchone()
+        if seq < newest:
+            return OLD_VERSION
+        if not inserted:
+            return CURRENT_VERSION
+        connection.execute(
+            'DELETE FROM entries WHERE namespace = ? AND version IN '
+            '(SELECT version FROM versions WHERE namespace = ? AND seq < ?)',
+            (namespace, namespace, seq),
+        )
+        return NEW_VERSION
+
+    # Function to drop expired entries, then the least recently used ones until under the byte limit
+    def _evict(self, connection):
+        connection.execute('DELETE FROM entries WHERE expires IS NOT NULL AND expires <= ?', (time.time(),))
+        total = connection.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        removed = []
+        for key, size in connection.execute('SELECT key, size FROM entries ORDER BY accessed'):
+            if total <= self.max_bytes:
+                break
+            removed.append((key,))
+            total -= size
+        connection.executemany('DELETE FROM entries WHERE key = ?', removed)
+        self.evictions += len(removed)
+
+    # Function to delete the entries of a namespace, except those of one version
+    def invalidate(self, namespace, keep_version=None):
+        if keep_version is None:
+            self.connection().execute('DELETE FROM entries WHERE namespace = ?', (namespace,))
+        else:
+            self.connection().execute(
+                'DELETE FROM entries WHERE namespace = ? AND version != ?', (namespace, keep_version)
+            )
+
+    def usage(self):
+        return self.connection().execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries').fetchone()
+
+    def clear(self):
+        self.connection().executescript('DELETE FROM entries; DELETE FROM versions;')
+
+
+class SharedCache:
+    def __init__(self, cache_dir=CACHE_DIR, memory_bytes=MEMORY_BYTES, disk_bytes=DISK_BYTES, ttl=DEFAULT_TTL):
+        self.memory = MemoryTier(memory_bytes)
+        self.disk = DiskTier(os.path.join(cache_dir, CACHE_FILE_NAME), disk_bytes) if disk_bytes > 0 else None
+        self.ttl = ttl
+        self.counts = defaultdict(lambda: {'memory_hits': 0, 'disk_hits': 0, 'misses': 0})
+        # Order in which versions were first stored per namespace, used when there is no disk tier
+        self.versions = defaultdict(dict)
+        self.lock = threading.Lock()
+
+    def _count(self, namespace, outcome):
+        with self.lock:
+            self.counts[namespace][outcome] += 1
+
+    # Function to look up a key: returns (found, value), checking memory first, then disk
+    def get(self, namespace, key):
+        entry = self.memory.get(key)
+        if entry is not None:
+            self._count(namespace, 'memory_hits')
+            return True, entry[0]
+        if self.disk is not None:
+            try:
+                entry = self.disk.get(key)
+                if entry is not None:
+                    blob, size, expires, version = entry
+                    value = pickle.loads(blob)
+                    self.memory.put(key, value, size, expires, namespace, version)
+                    self._count(namespace, 'disk_hits')
+                    return True, value
+            except (sqlite3.Error, OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError) as error:
+                logger.warning("Shared cache read of %s failed: %s", namespace, error)
+        self._count(namespace, 'misses')
+        return False, None
+
+    # Function to store a value in both tiers. Storing a version of a namespace for the first time
+    # removes the namespace's entries of older versions; a value of an older version only goes to
+    # the memory tier. Failures are logged, not raised.
+    def put(self, namespace, key, value, version='', ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        expires = time.time() + ttl if ttl else None
+        try:
+            blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError, RecursionError) as error:
+            logger.warning("Shared cache could not pickle a result of %s: %s", namespace, error)
+            return
+
+        if self.disk is None:
+            status = self._register(namespace, version)
+        else:
+            try:
+                status = self.disk.put(key, namespace, version, blob, expires)
+            except (sqlite3.Error, OSError) as error:
+                logger.warning("Shared cache write of %s failed: %s", namespace, error)
+                status = CURRENT_VERSION
+        if status == NEW_VERSION:
+            self.memory.invalidate(namespace, keep_version=version)
+        self.memory.put(key, value, len(blob), expires, namespace, version)
+
+    # Function to number a namespace's version on first sight in this process, for caches without
+    # a disk tier; same outcomes as DiskTier.put
+    def _register(self, namespace, version):
+        with self.lock:
+            versions = self.versions[namespace]
+            if version not in versions:
+                versions[version] = len(versions)
+                return NEW_VERSION
+            return CURRENT_VERSION if versions[version] == len(versions) - 1 else OLD_VERSION
+
+    # Function to drop a namespace's entries (all of them, or all but one version)
+    def invalidate(self, namespace, keep_version=None):
+        self.memory.invalidate(namespace, keep_version)
+        if self.disk is not None:
+            try:
+                self.disk.invalidate(namespace, keep_version)
+            except (sqlite3.Error, OSError) as error:
+                logger.warning("Shared cache invalidation of %s failed: %s", namespace, error)
+
+    # Function to decorate a function so its results are cached by namespace, version and arguments.
+    # version is a fixed value or a function of the call's arguments (such as a data fingerprint).
+    # A call whose key cannot be built (an argument that cannot be pickled, a version function that
+    # raises) is logged and computed without the cache.
+    def memoize(self, namespace=None, version='', ttl=None):
+        def decorate(func):
+            name = namespace or func.__qualname__
+            signature = inspect.signature(func)
+
+            @functools.wraps(func)
+            def call(*args, **kwargs):
+                start = time.perf_counter()
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                key_arguments = {key: value for key, value in bound.arguments.items() if not key.startswith('_')}
+                try:
+                    call_version = str(version(*args, **kwargs) if callable(version) else version)
+                    key = make_key(name, call_version, kwargs=key_arguments)
+                except Exception as error:
+                    logger.warning("Shared cache could not build a key for %s: %s", name, error)
+                    return func(*args, **kwargs)
+
+                found, value = self.get(name, key)
+                if not found:
+                    value = func(*args, **kwargs)
+                    self.put(name, key, value, call_version, ttl)
+                RECORDER.cache_event(f'shared: {name}', found, time.perf_counter() - start)
+                return value
+
+            call.clear = lambda: self.invalidate(name)
+            return call
+        return decorate
+
+    # Function to report memory hits, disk hits, misses and the hit rate per namespace
+    def stats(self):
+        with self.lock:
+            counts = {namespace: dict(values) for namespace, values in self.counts.items()}
+        frame = pd.DataFrame.from_dict(counts, orient='index', columns=['memory_hits', 'disk_hits', 'misses'])
+        lookups = frame.sum(axis=1)
+        frame['hit_rate'] = ((frame['memory_hits'] + frame['disk_hits']) / lookups).fillna(0.0)
+        return frame
+
+    def usage(self):
+        usage = {
+            'memory_entries': len(self.memory.entries), 'memory_bytes': self.memory.bytes,
+            'memory_limit_bytes': self.memory.max_bytes, 'memory_evictions': self.memory.evictions,
+        }
+        if self.disk is not None:
+            try:
+                entries, size = self.disk.usage()
+            except (sqlite3.Error, OSError) as error:
+                logger.warning("Shared cache could not read the disk usage: %s", error)
+                return usage
+            usage.update({
+                'disk_entries': entries, 'disk_bytes': size, 'disk_limit_bytes': self.disk.max_bytes,
+                'disk_evictions': self.disk.evictions, 'disk_path': self.disk.path,
+            })
+        return usage
+
+    def clear(self):
+        self.memory.clear()
+        with self.lock:
+            self.versions.clear()
+        if self.disk is not None:
+            try:
+                self.disk.clear()
+            except (sqlite3.Error, OSError) as error:
+                logger.warning("Shared cache could not clear the disk tier: %s", error)
+
+
+# Process-wide cache shared by the dashboards; the SQLite file is opened on first use
+SHARED = SharedCache()
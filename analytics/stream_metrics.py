@@ -0,0 +1,146 @@
+import heapq
+
+import numpy as np
+import pandas as pd
+
+# Streaming engagement metrics for the influencer tracker.
+#
+# As rows arrive, every influencer and hashtag keeps a bounded min-heap of its best posts for
+# each ranking metric, plus running engagement totals, so "top posts" and the engagement mix
+# are answered from at most MAX_TOP_K entries instead of re-sorting the entity's history.
+# Rolling-window sums and growth rates are read from the daily buckets of a TimeRollup.
+#
+# The loader downcasts counts to the smallest integer type that fits (often int16), so every
+# sum and derived value here is computed in int64/float64.
+
+ENTITY_COLUMNS = ['Influencer', 'Hashtag']
+METRIC_COLUMNS = ['Likes', 'Comments', 'Shares']
+RANKING_METRICS = {
+    'Likes': 'Likes',
+    'Comments': 'Comments',
+    'Shares': 'Shares',
+    'Engagement Rate': 'engagement_rate',
+}
+MAX_TOP_K = 50
+
+
+# Function to compute the per-post ranking values: the raw counts plus the engagement rate
+# (likes + comments + shares per follower; posts without followers get no rate)
+def ranking_values(rows):
+    counts = {column: rows[column].to_numpy(dtype=np.int64) for column in METRIC_COLUMNS}
+    followers = rows['Followers'].to_numpy(dtype=np.float64)
+    engagement = (counts['Likes'] + counts['Comments'] + counts['Shares']).astype(np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rate = np.where(followers > 0, engagement / followers, np.nan)
+    return {**counts, 'engagement_rate': rate}
+
+
+# Function to pick, per entity code, its best max_k posts by one value. Returns the codes, values
+# and positions of the kept posts, grouped by entity and best first within each entity.
+def top_candidates(codes, values, positions, max_k):
+    keep = ~np.isnan(values) if values.dtype.kind == 'f' else np.ones(len(values), dtype=bool)
+    codes, values, positions = codes[keep], values[keep], positions[keep]
+    # Highest value first; ties keep the earlier post, as DataFrame.nlargest does
+    order = np.lexsort((positions, -values, codes))
+    codes, values, positions = codes[order], values[order], positions[order]
+    group_start = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    rank = np.arange(len(codes)) - np.repeat(group_start, np.diff(np.r_[group_start, len(codes)]))
+    kept = rank < max_k
+    return codes[kept], values[kept], positions[kept]
+
+
+class StreamingMetrics:
+    def __init__(self, data=None, max_k=MAX_TOP_K):
+        self.max_k = max_k
+        self.update(data if data is not None else pd.DataFrame(), reset=True)
+
+    # Function to fold new rows into the heaps and totals; usable as an IncrementalCSV subscriber
+    def update(self, new_rows, reset=False):
+        if reset:
+            self.size = 0
+            self.heaps = {column: {metric: {} for metric in RANKING_METRICS.values()} for column in ENTITY_COLUMNS}
+            # {column: {entity: [likes, comments, shares, posts]}}
+            self.totals = {column: {} for column in ENTITY_COLUMNS}
+        if new_rows.empty:
+            return
+
+        values = ranking_values(new_rows)
+        positions = np.arange(self.size, self.size + len(new_rows))
+        for column in ENTITY_COLUMNS:
+            codes, entities = pd.factorize(new_rows[column])
+            entities = entities.tolist()
+            # Rows without an influencer/hashtag (code -1) are left out
+            present = codes >= 0
+            codes = codes[present]
+            for metric, metric_values in values.items():
+                candidates = top_candidates(codes, metric_values[present], positions[present], self.max_k)
+                self._push(self.heaps[column][metric], entities, *candidates)
+
+            # Sums of the new rows per entity, added to the running totals of the entities they mention
+            sums = np.zeros((len(entities), len(METRIC_COLUMNS) + 1), dtype=np.int64)
+            for i, name in enumerate(METRIC_COLUMNS):
+                sums[:, i] = np.bincount(codes, weights=values[name][present], minlength=len(entities))
+            sums[:, -1] = np.bincount(codes, minlength=len(entities))
+            totals = self.totals[column]
+            for entity, row in zip(entities, sums):
+                previous = totals.get(entity)
+                totals[entity] = row if previous is None else previous + row
+        self.size += len(new_rows)
+
+    # Function to merge candidate posts into the per-entity min-heaps, each bounded to max_k entries.
+    # Entries are (value, -position), so the heap root is the weakest kept post and ties favour earlier posts.
+    def _push(self, heaps, entities, codes, values, positions):
+        bounds = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1], True])
+        entries = list(zip(values.tolist(), (-positions).tolist()))
+        for start, stop in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+            entity = entities[codes[start]]
+            group = entries[start:stop]
+            heap = heaps.get(entity)
+            if heap is None:
+                # Candidates arrive best first, so reversed they already form a valid min-heap
+                heaps[entity] = group[::-1]
+                continue
+            for entry in group:
+                if len(heap) < self.max_k:
+                    heapq.heappush(heap, entry)
+                elif entry > heap[0]:
+                    heapq.heapreplace(heap, entry)
+                else:
+                    break
+
+    # Function to get the row positions of an entity's top k posts by a ranking metric, best first
+    def top_positions(self, entity_column, entity, metric='Likes', k=5):
+        heap = self.heaps[entity_column][RANKING_METRICS[metric]].get(entity, [])
+        best = heapq.nlargest(min(k, self.max_k), heap)
+        return np.array([-position for _, position in best], dtype=np.intp)
+
+    # Function to get an entity's top k posts as rows of the loaded frame
+    def top_posts(self, data, entity_column, entity, metric='Likes', k=5):
+        return data.iloc[self.top_positions(entity_column, entity, metric, k)]
+
+    # Function to get an entity's running engagement totals (likes, comments, shares and posts)
+    def entity_totals(self, entity_column, entity):
+        totals = self.totals[entity_column].get(entity)
+        if totals is None:
+            totals = np.zeros(len(METRIC_COLUMNS) + 1, dtype=np.int64)
+        return pd.Series(totals, index=METRIC_COLUMNS + ['Posts'], name=entity)
+
+
+# Function to sum an entity's engagement over the last `window` (a Timedelta) ending at `end`,
+# compared with the window before it. Growth is the relative change, NaN when the earlier
+# window is empty. Reads the daily buckets of a TimeRollup by binary search.
+def rolling_engagement(rollup, entity_column, entity, window, end=None):
+    columns = METRIC_COLUMNS + ['Posts']
+    days = rollup.buckets(entity_column, entity, 'day')
+    if days is None:
+        days = pd.DataFrame(columns=columns, index=pd.DatetimeIndex([]))
+
+    end = pd.Timestamp(end) if end is not None else (days.index[-1] if len(days) else pd.Timestamp.now())
+    end = end.floor('D') + pd.Timedelta(days=1)
+    bounds = days.index.searchsorted([end - 2 * window, end - window, end])
+    values = days[columns].to_numpy(dtype=np.int64)
+    current = values[bounds[1]:bounds[2]].sum(axis=0)
+    previous = values[bounds[0]:bounds[1]].sum(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        growth = np.where(previous > 0, (current - previous) / previous, np.nan)
+    return pd.DataFrame({'Current Window': current, 'Previous Window': previous, 'Growth': growth}, index=columns)
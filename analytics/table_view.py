@@ -0,0 +1,105 @@
+import io
+
+import numpy as np
+import pandas as pd
+
+# Server-side table queries for the dashboards' data tables.
+#
+# A TableView wraps one loaded frame. Callers pass the row positions of the current slice (for
+# example a filter combination from FilterIndex.rows); filtering, search and sorting then work
+# on those positions and only the requested page is turned into a DataFrame for the browser.
+# Sorting uses a rank array per column, computed once over the whole frame on first use, so
+# sorting any slice is an integer argsort regardless of the column's type. CSV exports are
+# produced in fixed-size chunks.
+
+PAGE_SIZES = [25, 50, 100, 250]
+EXPORT_CHUNK_ROWS = 50_000
+# Columns with at most this many distinct values are filtered by value instead of by range
+MAX_FILTER_VALUES = 50
+
+
+class TableView:
+    def __init__(self, data):
+        self.data = data
+        self.ranks = {}
+
+    @property
+    def columns(self):
+        return list(self.data.columns)
+
+    # Function to get the rank of every row by one column (missing values rank last)
+    def rank(self, column):
+        if column not in self.ranks:
+            values = self.data[column]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                # Rank categories by their labels, then rows by their category code
+                labels = np.argsort(np.argsort(values.cat.categories.to_numpy(dtype=str), kind='stable'))
+                codes = values.cat.codes.to_numpy()
+                keys = np.where(codes >= 0, labels[codes], len(labels))
+            else:
+                keys = values.to_numpy()
+            order = pd.Series(keys).sort_values(kind='stable', na_position='last').index.to_numpy()
+            ranks = np.empty(len(order), dtype=np.int64)
+            ranks[order] = np.arange(len(order))
+            self.ranks[column] = ranks
+        return self.ranks[column]
+
+    # Function to describe how a column can be filtered: ('values', options), ('range', (low, high)),
+    # or ('text', None) for free text that is better served by the search box
+    def filter_kind(self, column, positions=None):
+        values = self.data[column] if positions is None else self.data[column].iloc[positions]
+        if isinstance(values.dtype, pd.CategoricalDtype) or not pd.api.types.is_numeric_dtype(values):
+            options = pd.unique(values.dropna())
+            return ('values', sorted(options, key=str)) if len(options) <= MAX_FILTER_VALUES else ('text', None)
+        if values.nunique() <= MAX_FILTER_VALUES:
+            return 'values', sorted(pd.unique(values.dropna()))
+        return 'range', (values.min(), values.max())
+
+    # Function to narrow row positions by column filters, a text search and a sort order.
+    # filters maps a column to a list of allowed values or a (low, high) range; search matches
+    # case-insensitively anywhere in the text columns.
+    def query(self, positions=None, filters=None, search='', sort_by=None, descending=False):
+        positions = np.arange(len(self.data)) if positions is None else np.asarray(positions)
+
+        for column, condition in (filters or {}).items():
+            values = self.data[column].iloc[positions]
+            if isinstance(condition, tuple):
+                keep = values.between(*condition).to_numpy()
+            else:
+                keep = values.isin(condition).to_numpy()
+            positions = positions[keep]
+
+        if search:
+            positions = positions[self._search(positions, search.lower())]
+
+        if sort_by is not None:
+            ranks = self.rank(sort_by)[positions]
+            order = np.argsort(-ranks if descending else ranks, kind='stable')
+            positions = positions[order]
+        return positions
+
+    # Function to find rows whose text columns contain a search term. Categorical columns are
+    # searched once per category and mapped back through their codes.
+    def _search(self, positions, term):
+        found = np.zeros(len(positions), dtype=bool)
+        for column in self.data.columns:
+            values = self.data[column]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                matches = values.cat.categories.astype(str).str.lower().str.contains(term, regex=False)
+                codes = values.cat.codes.to_numpy()[positions]
+                found |= (codes >= 0) & np.append(matches, False)[codes]
+            elif pd.api.types.is_object_dtype(values) or pd.api.types.is_string_dtype(values):
+                found |= values.iloc[positions].astype(str).str.lower().str.contains(term, regex=False).to_numpy()
+        return found
+
+    # Function to get one page of rows (pages numbered from 1)
+    def page(self, positions, number, page_size):
+        start = (number - 1) * page_size
+        return self.data.iloc[positions[start:start + page_size]]
+
+    # Function to yield the rows at the given positions as CSV text, chunk_rows rows at a time
+    def iter_csv(self, positions, chunk_rows=EXPORT_CHUNK_ROWS):
+        for start in range(0, max(len(positions), 1), chunk_rows):
+            buffer = io.StringIO()
+            self.data.iloc[positions[start:start + chunk_rows]].to_csv(buffer, index=False, header=start == 0)
+            yield buffer.getvalue()
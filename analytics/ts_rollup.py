@@ -0,0 +1,189 @@
+import numpy as np
+import pandas as pd
+
+from .columnar_cache import GrowingArray
+
+# Time-series rollups for the influencer tracker.
+#
+# Timestamps are parsed once as rows arrive. For every influencer and hashtag the rollup keeps
+# hourly, daily and weekly buckets with summed likes/comments/shares, the post count and the
+# follower count at the end of the bucket. A chart asks for a view of one entity over a visible
+# range: the bucket size is picked so the range fits in max_points buckets, and any series that
+# is still longer than max_points (raw posts, or weeks over a very long history) is reduced
+# with Largest-Triangle-Three-Buckets downsampling, so chart payloads stay bounded.
+#
+# Appended rows are aggregated on their own into a new bucket table. Each resolution keeps a
+# short list of tables, and a new table is merged into the previous one only while that one is
+# less than twice its size, so every bucket is merged O(log n) times in total and the list
+# stays O(log n) long. Reading an entity merges its buckets from each table.
+
+ENTITY_COLUMNS = ['Influencer', 'Hashtag']
+METRIC_COLUMNS = ['Likes', 'Comments', 'Shares']
+RESOLUTIONS = {
+    'hour': pd.Timedelta(hours=1),
+    'day': pd.Timedelta(days=1),
+    'week': pd.Timedelta(weeks=1),
+}
+MAX_POINTS = 500
+
+
+# Function to get the start of the bucket each timestamp falls in
+def bucket_starts(times, resolution):
+    if resolution == 'week':
+        return times.dt.to_period('W-SUN').dt.start_time
+    return times.dt.floor('h' if resolution == 'hour' else 'D')
+
+
+# Function to aggregate rows into (entity, bucket) cells; rows must carry a parsed '_time' column
+def aggregate_buckets(rows, entity_column, resolution):
+    rows = rows.sort_values('_time', kind='stable').assign(bucket=bucket_starts(rows['_time'], resolution))
+    grouped = rows.groupby([entity_column, 'bucket'], observed=True, sort=True)
+    table = grouped[METRIC_COLUMNS].sum()
+    table['Posts'] = grouped.size()
+    table['Followers'] = grouped['Followers'].last()
+    table['last_time'] = grouped['_time'].max()
+    return table
+
+
+# Function to merge newly aggregated cells into an existing table, indexed by (entity, bucket)
+# or by bucket alone: counts add up and the follower count comes from whichever side has the
+# later post
+def merge_buckets(table, new):
+    overlap = new.index.intersection(table.index)
+    if len(overlap):
+        both = pd.concat([table.loc[overlap], new.loc[overlap]]).sort_values('last_time', kind='stable')
+        grouped = both.groupby(level=list(range(table.index.nlevels)), sort=False)
+        combined = grouped[METRIC_COLUMNS + ['Posts']].sum()
+        combined['Followers'] = grouped['Followers'].last()
+        combined['last_time'] = grouped['last_time'].last()
+        new = pd.concat([new.drop(overlap), combined])
+        table = table.drop(overlap)
+    return pd.concat([table, new]).sort_index()
+
+
+# Function to pick the finest resolution that fits the visible range in max_points buckets
+def choose_resolution(start, end, max_points=MAX_POINTS):
+    span = pd.Timestamp(end) - pd.Timestamp(start)
+    for name, width in RESOLUTIONS.items():
+        if span / width <= max_points:
+            return name
+    return 'week'
+
+
+# Function to select max_points indices of a series with Largest-Triangle-Three-Buckets.
+# The first and last points are always kept; each bucket in between keeps the point forming the
+# largest triangle with the previously kept point and the mean of the next bucket.
+def lttb_indices(x, y, max_points):
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if max_points >= n or max_points < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, max_points - 1).astype(int)
+    selected = np.empty(max_points, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(max_points - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        next_start, next_stop = stop, edges[bucket + 2] if bucket + 2 < len(edges) else n
+        mean_x = x[next_start:next_stop].mean() if next_stop > next_start else x[-1]
+        mean_y = y[next_start:next_stop].mean() if next_stop > next_start else y[-1]
+        area = np.abs(
+            (x[previous] - mean_x) * (y[start:stop] - y[previous]) - (x[previous] - x[start:stop]) * (mean_y - y[previous])
+        )
+        previous = start + int(np.argmax(area))
+        selected[bucket + 1] = previous
+    return selected
+
+
+# Function to downsample a frame to at most max_points rows with LTTB on one column
+def downsample(frame, x_column, y_column, max_points=MAX_POINTS):
+    if len(frame) <= max_points:
+        return frame
+    x = frame[x_column].to_numpy()
+    if np.issubdtype(x.dtype, np.datetime64):
+        x = x.astype('datetime64[ns]').astype(np.int64)
+    return frame.iloc[lttb_indices(x, frame[y_column].to_numpy(), max_points)]
+
+
+class TimeRollup:
+    def __init__(self, data=None):
+        self.update(data if data is not None else pd.DataFrame(), reset=True)
+
+    # Parsed timestamps of every row, by loader position
+    @property
+    def times(self):
+        return self._times.view()
+
+    # Function to parse new rows and add their buckets to the rollups; usable as an IncrementalCSV subscriber
+    def update(self, new_rows, reset=False):
+        if reset:
+            self._times = GrowingArray(np.empty(0, dtype='datetime64[ns]'))
+            self.tables = {
+                column: {name: [] for name in RESOLUTIONS} for column in ENTITY_COLUMNS
+            }
+        if new_rows.empty:
+            return
+
+        times = pd.to_datetime(new_rows['Timestamp'])
+        self._times.extend(times.to_numpy(dtype='datetime64[ns]'))
+        rows = new_rows.assign(_time=times.to_numpy())
+        for column in ENTITY_COLUMNS:
+            for name in RESOLUTIONS:
+                tables = self.tables[column][name]
+                tables.append(aggregate_buckets(rows, column, name))
+                while len(tables) > 1 and len(tables[-2]) < 2 * len(tables[-1]):
+                    new = tables.pop()
+                    tables[-1] = merge_buckets(tables[-1], new)
+
+    # Function to get the buckets of one entity at one resolution, indexed by bucket start
+    def buckets(self, entity_column, entity, resolution):
+        merged = None
+        for table in self.tables[entity_column][resolution]:
+            try:
+                part = table.loc[entity]
+            except KeyError:
+                continue
+            merged = part if merged is None else merge_buckets(merged, part)
+        return merged
+
+    # Function to get the bucketed series of one entity at one resolution, optionally clipped to a range
+    def series(self, entity_column, entity, resolution, start=None, end=None):
+        frame = self.buckets(entity_column, entity, resolution)
+        if frame is None:
+            return pd.DataFrame(columns=['Timestamp', *METRIC_COLUMNS, 'Posts', 'Followers'])
+        if start is not None:
+            frame = frame[frame.index >= bucket_starts(pd.Series([pd.Timestamp(start)]), resolution)[0]]
+        if end is not None:
+            frame = frame[frame.index <= pd.Timestamp(end)]
+        frame = frame.drop(columns='last_time').rename_axis('Timestamp').reset_index()
+        return frame
+
+    # Function to build the chart data for one entity over a visible range. resolution is 'auto',
+    # 'raw' or a bucket name; rows are the entity's raw rows, labelled by their loader position.
+    # Returns the frame to plot and the resolution used.
+    def view(self, entity_column, entity, rows, start=None, end=None, resolution='auto', max_points=MAX_POINTS):
+        times = pd.Series(self.times[rows.index.to_numpy()], index=rows.index)
+        in_range = np.ones(len(rows), dtype=bool)
+        if start is not None:
+            in_range &= (times >= pd.Timestamp(start)).to_numpy()
+        if end is not None:
+            in_range &= (times <= pd.Timestamp(end)).to_numpy()
+
+        if resolution == 'auto':
+            if in_range.sum() <= max_points:
+                resolution = 'raw'
+            else:
+                resolution = choose_resolution(times[in_range].min(), times[in_range].max(), max_points)
+
+        if resolution == 'raw':
+            frame = rows[in_range].assign(Timestamp=times[in_range]).sort_values('Timestamp', kind='stable')
+        else:
+            frame = self.series(entity_column, entity, resolution, start, end)
+
+        if len(frame) > max_points:
+            engagement = frame[METRIC_COLUMNS].sum(axis=1).rename('_engagement')
+            frame = downsample(frame.join(engagement), 'Timestamp', '_engagement', max_points).drop(columns='_engagement')
+            resolution = f'{resolution}, downsampled'
+        return frame, resolution
@@ -0,0 +1,254 @@
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# Cash-flow engine and zero-curve bootstrapping for pricing bond portfolios off a yield curve.
+#
+# Cash flows are generated backwards from maturity every 1/frequency years, so annual,
+# semiannual, quarterly and monthly coupons and fractional remaining periods are all handled;
+# the part of the current coupon period that has already elapsed is returned as accrued
+# interest. A portfolio's cash flows are kept as flat arrays (bond, time, amount) so bonds of
+# any length are priced together and summed per bond with one reduction.
+#
+# A ZeroCurve holds continuously compounded zero rates at knot times and interpolates r(t) * t
+# linearly (flat forward rates between knots, the last zero rate beyond the last knot).
+# bootstrap_curve() builds one from par or market quotes, one knot per quote, and is cached by
+# the quote values, so every repricing against the same quotes reuses the same curve.
+
+FREQUENCIES = {'Annual': 1, 'Semiannual': 2, 'Quarterly': 4, 'Monthly': 12}
+CURVE_CACHE_SIZE = 64
+# Flow values computed per block when repricing under many curve shifts at once
+SHIFT_BLOCK_VALUES = 4_000_000
+BOOTSTRAP_TOLERANCE = 1e-12
+BOOTSTRAP_ITERATIONS = 50
+# Tolerance when counting remaining periods, so 10 years at 2 per year is exactly 20 periods
+PERIOD_EPSILON = 1e-9
+
+
+# Function to broadcast the portfolio inputs to flat float arrays of a common length
+def _portfolio_arrays(principal, coupon_rate, years_to_maturity, frequency):
+    arrays = np.broadcast_arrays(
+        np.asarray(principal, dtype=float),
+        np.asarray(coupon_rate, dtype=float),
+        np.asarray(years_to_maturity, dtype=float),
+        np.asarray(frequency, dtype=float),
+    )
+    return [array.ravel() for array in arrays]
+
+
+# Cash flows of a portfolio as flat arrays, grouped by bond in input order
+class CashFlows:
+    def __init__(self, principal, coupon_rate, years_to_maturity, frequency=1):
+        principal, coupon_rate, years_to_maturity, frequency = _portfolio_arrays(
+            principal, coupon_rate, years_to_maturity, frequency
+        )
+        self.bonds = len(principal)
+        self.years_to_maturity = years_to_maturity
+
+        # Coupons still to be paid, and the elapsed fraction of the current coupon period
+        periods = np.where(
+            years_to_maturity > 0, np.ceil(years_to_maturity * frequency - PERIOD_EPSILON), 0
+        ).astype(np.int64)
+        elapsed = np.where(periods > 0, periods - years_to_maturity * frequency, 0.0)
+        coupon_payment = principal * coupon_rate / frequency
+        self.accrued = coupon_payment * np.clip(elapsed, 0.0, None)
+
+        self.bond = np.repeat(np.arange(self.bonds), periods)
+        self.starts = np.concatenate([[0], np.cumsum(periods)[:-1]]) if self.bonds else np.zeros(0, dtype=np.int64)
+        self.periods = periods
+        # Periods before maturity: 0 for the final payment, counting back to the next coupon
+        back = np.arange(len(self.bond)) - np.repeat(self.starts, periods)
+        self.times = years_to_maturity[self.bond] - back / frequency[self.bond]
+        self.amounts = coupon_payment[self.bond] + np.where(back == 0, principal[self.bond], 0.0)
+
+    # Function to add flow values up per bond; values has the flows on its last axis
+    def per_bond(self, values):
+        totals = np.zeros(values.shape[:-1] + (self.bonds,))
+        paying = self.periods > 0
+        if np.any(paying):
+            totals[..., paying] = np.add.reduceat(values, self.starts[paying], axis=-1)
+        return totals
+
+
+class ZeroCurve:
+    def __init__(self, times, zero_rates):
+        self.times = np.asarray(times, dtype=float)
+        self.zero_rates = np.asarray(zero_rates, dtype=float)
+        if len(self.times) == 0 or np.any(np.diff(self.times) <= 0) or self.times[0] <= 0:
+            raise ValueError("Curve times must be positive and strictly increasing")
+        # Knots of r(t) * t = -ln P(t), starting from P(0) = 1
+        self.knot_times = np.concatenate([[0.0], self.times])
+        self.knot_values = np.concatenate([[0.0], self.times * self.zero_rates])
+
+    # Function to get -ln of the discount factor at times t
+    def log_discount(self, t):
+        t = np.asarray(t, dtype=float)
+        inside = np.interp(t, self.knot_times, self.knot_values)
+        return np.where(t > self.times[-1], self.zero_rates[-1] * t, inside)
+
+    def discount(self, t):
+        return np.exp(-self.log_discount(t))
+
+    def zero_rate(self, t):
+        t = np.asarray(t, dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(t > 0, self.log_discount(t) / t, self.zero_rates[0])
+
+    # Function to get the curve moved by a parallel shift of the zero rates
+    def shifted(self, shift):
+        return ZeroCurve(self.times, self.zero_rates + shift)
+
+    # Function to tabulate the curve: zero rate, discount factor and forward rate at each knot
+    def frame(self):
+        forwards = np.diff(self.knot_values) / np.diff(self.knot_times)
+        return pd.DataFrame({
+            'time': self.times,
+            'zero_rate': self.zero_rates,
+            'discount_factor': np.exp(-self.times * self.zero_rates),
+            'forward_rate': forwards,
+        })
+
+
+# Function to make a flat curve from a rate compounded `frequency` times a year
+def flat_curve(rate, frequency=1):
+    return ZeroCurve([1.0], [frequency * np.log1p(rate / frequency)])
+
+
+# Function to build quotes for par bonds: a price of 100 with the coupon equal to the par yield
+def par_quotes(maturities, par_yields, frequency=2):
+    maturities = np.asarray(maturities, dtype=float)
+    return pd.DataFrame({
+        'maturity': maturities,
+        'coupon_rate': np.asarray(par_yields, dtype=float),
+        'price': np.full(len(maturities), 100.0),
+        'frequency': np.broadcast_to(np.asarray(frequency, dtype=float), maturities.shape),
+    })
+
+
+# Function to bootstrap zero rates from clean prices per 100 face, one knot per quote in
+# maturity order. Flows up to the previous knot use the curve built so far; flows after it
+# depend on the new knot through the interpolation, so the knot is solved by Newton's method
+# (the price is decreasing and convex in it).
+def _bootstrap(maturities, coupon_rates, prices, frequencies):
+    order = np.argsort(maturities, kind='stable')
+    maturities, coupon_rates, prices, frequencies = (a[order] for a in (maturities, coupon_rates, prices, frequencies))
+    if np.any(np.diff(maturities) <= 0) or maturities[0] <= 0:
+        raise ValueError("Quote maturities must be positive and distinct")
+
+    knot_times, knot_values = [0.0], [0.0]
+    for maturity, coupon_rate, price, frequency in zip(maturities, coupon_rates, prices, frequencies):
+        flows = CashFlows(100.0, coupon_rate, maturity, frequency)
+        dirty = price + flows.accrued[0]
+        last_time, last_value = knot_times[-1], knot_values[-1]
+
+        known = flows.times <= last_time
+        known_value = np.sum(flows.amounts[known] * np.exp(-np.interp(flows.times[known], knot_times, knot_values)))
+        weights = (flows.times[~known] - last_time) / (maturity - last_time)
+        amounts = flows.amounts[~known]
+
+        # Start from the previous knot's zero rate
+        value = (last_value / last_time if last_time > 0 else coupon_rate) * maturity
+        for _ in range(BOOTSTRAP_ITERATIONS):
+            discounted = amounts * np.exp(-(last_value + weights * (value - last_value)))
+            error = known_value + discounted.sum() - dirty
+            slope = -np.sum(weights * discounted)
+            if slope == 0:
+                break
+            step = error / slope
+            value -= step
+            if abs(step) < BOOTSTRAP_TOLERANCE:
+                break
+        knot_times.append(maturity)
+        knot_values.append(value)
+
+    times = np.array(knot_times[1:])
+    return ZeroCurve(times, np.array(knot_values[1:]) / times)
+
+
+@lru_cache(maxsize=CURVE_CACHE_SIZE)
+def _cached_curve(maturities_bytes, coupons_bytes, prices_bytes, frequencies_bytes):
+    return _bootstrap(*(np.frombuffer(key, dtype=float) for key in (
+        maturities_bytes, coupons_bytes, prices_bytes, frequencies_bytes
+    )))
+
+
+# Function to get the bootstrapped zero curve for a set of quotes (maturity in years, coupon
+# rate as a decimal, clean price per 100 face, coupon frequency), served from the curve cache
+def bootstrap_curve(maturities, coupon_rates, prices, frequency=2):
+    maturities, coupon_rates, prices, frequency = _portfolio_arrays(maturities, coupon_rates, prices, frequency)
+    return _cached_curve(maturities.tobytes(), coupon_rates.tobytes(), prices.tobytes(), frequency.tobytes())
+
+
+# Function to bootstrap a curve from a quotes DataFrame with maturity, coupon_rate, price and
+# (optionally) frequency columns
+def curve_from_quotes(quotes, frequency=2):
+    return bootstrap_curve(
+        quotes['maturity'].to_numpy(dtype=float), quotes['coupon_rate'].to_numpy(dtype=float),
+        quotes['price'].to_numpy(dtype=float),
+        quotes['frequency'].to_numpy(dtype=float) if 'frequency' in quotes.columns else frequency,
+    )
+
+
+# Function to report hit/miss counters of the bootstrapped curve cache
+def curve_cache_stats():
+    info = _cached_curve.cache_info()
+    lookups = info.hits + info.misses
+    return {'zero_curve': {
+        'hits': info.hits,
+        'misses': info.misses,
+        'hit_rate': info.hits / lookups if lookups else 0.0,
+        'size': info.currsize,
+        'max_size': info.maxsize,
+    }}
+
+
+def clear_curve_cache():
+    _cached_curve.cache_clear()
+
+
+# Portfolio priced off one curve. The cash flows and their log discount factors are computed
+# once, so repricing under parallel shifts only rescales the stored discount factors.
+class CurvePricer:
+    def __init__(self, curve, principal, coupon_rate, years_to_maturity, frequency=1):
+        self.curve = curve
+        self.cash_flows = CashFlows(principal, coupon_rate, years_to_maturity, frequency)
+        self.log_discount = curve.log_discount(self.cash_flows.times)
+        self.present_values = self.cash_flows.amounts * np.exp(-self.log_discount)
+
+    # Function to get the dirty price of every bond, for one shift (returns one price per bond)
+    # or an array of shifts (returns one row of prices per shift)
+    def price(self, shift=0.0):
+        flows = self.cash_flows
+        if np.ndim(shift) == 0:
+            values = self.present_values if shift == 0 else self.present_values * np.exp(-shift * flows.times)
+            return flows.per_bond(values)
+
+        shifts = np.asarray(shift, dtype=float)
+        block = max(1, SHIFT_BLOCK_VALUES // max(len(flows.times), 1))
+        prices = np.empty((len(shifts), flows.bonds))
+        for start in range(0, len(shifts), block):
+            part = shifts[start:start + block, None]
+            prices[start:start + block] = flows.per_bond(self.present_values * np.exp(-part * flows.times))
+        return prices
+
+    # Function to calculate dirty and clean prices, accrued interest, effective duration and
+    # convexity of every bond with respect to a parallel shift of the zero curve
+    def analytics(self):
+        flows = self.cash_flows
+        dirty = flows.per_bond(self.present_values)
+        first = flows.per_bond(flows.times * self.present_values)
+        second = flows.per_bond(flows.times ** 2 * self.present_values)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            duration = first / dirty
+            convexity = second / dirty
+        return {
+            'dirty_price': dirty,
+            'clean_price': dirty - flows.accrued,
+            'accrued_interest': flows.accrued,
+            'duration': duration,
+            'convexity': convexity,
+        }
+
+    def frame(self):
+        return pd.DataFrame(self.analytics())
@@ -0,0 +1,404 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from analytics.bond_engine import bond_analytics, current_yield, solve_ytm
+from analytics.cvss31 import score_vector
+from analytics.datasets import open_hr_dataset, open_influencer_dataset
+from analytics.instrumentation import LATENCY_PERCENTILES, Recorder
+from analytics.rate_scenarios import pnl_histogram, risk_summary, simulate_pnl
+from analytics.risk_models import (
+    calculate_combined_risk,
+    calculate_custom_risk_score,
+    calculate_cvss_score,
+    calculate_mttc,
+    calculate_mtti,
+)
+from analytics.risk_simulation import beta_from_mean, exceedance_curve, fixed, simulate_risk, summarize, triangular
+from analytics.satisfaction_model import SatisfactionModel, insights
+from analytics.shared_cache import SharedCache, make_key
+from analytics.stream_metrics import RANKING_METRICS, rolling_engagement
+from analytics.table_view import TableView
+from analytics.yield_curve import FREQUENCIES, CurvePricer, curve_from_quotes, par_quotes
+
+from benchmarks.synthetic import employee_satisfaction, influencer_posts
+
+# Replays recorded dashboard traffic against headless stand-ins of the four pages.
+#
+# Usage:
+#   python -m benchmarks.replay traffic.jsonl --sessions 32
+#   python -m benchmarks.replay --synthesize 5000 --write traffic.jsonl --sessions 64 --rows 100000
+#
+# Each line of a traffic file is one rerun of a page with its widget values:
+#   {"page": "hrmini1", "session": "a1", "params": {"Dept": "HR", "education": "PG", "job_level": 3}}
+#   {"page": "textmini1", "session": "b7", "params": {"entity": "#Travel", "window_days": 30}, "delay": 2.5}
+# `delay` is the user's think time before the rerun in seconds, honoured when --speed is above 0
+# (1 = real time). Lines without a "page" are skipped, so unrelated JSON-lines files are harmless.
+#
+# A stand-in runs the same analytics calls as its page for one set of widget values, with the
+# datasets loaded once per process as st.cache_resource does and the results the page keeps in
+# the shared cache memoized per parameter set, in memory only unless --cache-dir names a shared
+# cache directory (--no-cache replays every rerun cold). Chart
+# rendering and the browser round trip are not included. Sessions run concurrently on asyncio,
+# each rerun in a worker thread as Streamlit runs scripts, and each session's reruns in order.
+
+PAGES = ['hrmini1', 'textmini1', 'bond', 'risk_app']
+DEFAULT_HR_DATA = 'Employee Satisfaction Index.csv'
+DEFAULT_INFLUENCER_DATA = 'influencer_data.csv'
+DEFAULT_OUTPUT = 'replay_results.json'
+TABLE_PAGE_SIZE = 25
+# Par curve the bond stand-in prices off, as in bond.py's default quotes
+CURVE_MATURITIES = [0.5, 1, 2, 3, 5, 7, 10, 20, 30]
+CURVE_PAR_YIELDS = [0.040, 0.041, 0.042, 0.043, 0.045, 0.046, 0.047, 0.049, 0.050]
+
+
+# Function to read traffic records from JSON-lines files, skipping lines that are not page reruns
+def load_records(paths):
+    records = []
+    for path in paths:
+        with open(path) as handle:
+            for line in handle:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if isinstance(record, dict) and record.get('page') in PAGES:
+                    records.append(record)
+    return records
+
+
+# Function to write traffic records as JSON lines
+def write_records(records, path):
+    with open(path, 'w') as handle:
+        for record in records:
+            handle.write(json.dumps(record) + '\n')
+
+
+# Headless versions of the dashboard pages, sharing their loaded data across sessions
+class PageStandIns:
+    def __init__(self, hr_path, influencer_path, cache=True, recorder=None, cache_dir=None):
+        self.recorder = recorder or Recorder()
+        self.cache = cache
+        self.results = SharedCache(cache_dir) if cache_dir else SharedCache(disk_bytes=0)
+
+        self.hr_loader, self.filter_index, _ = open_hr_dataset(hr_path, snapshot=False)
+        self.model = SatisfactionModel(self.filter_index.data)
+        self.hr_table = TableView(self.filter_index.data)
+
+        self.influencer_loader, self.rollup, self.entity_index, self.metrics = open_influencer_dataset(
+            influencer_path, snapshot=False
+        )
+        self.posts_table = TableView(self.influencer_loader.data)
+        self.curve = curve_from_quotes(par_quotes(CURVE_MATURITIES, CURVE_PAR_YIELDS))
+
+    # Function to run one rerun of a page for a session
+    def run(self, page, session, params):
+        self.recorder.start_rerun(page, session)
+        return getattr(self, page)(params)
+
+    # Function to memoize a result per parameter set, as the pages do with the shared cache
+    def cached(self, name, key, compute):
+        if not self.cache:
+            return compute()
+        start = time.perf_counter()
+        cache_key = make_key(name, '', (key,))
+        found, value = self.results.get(name, cache_key)
+        if not found:
+            value = compute()
+            self.results.put(name, cache_key, value)
+        self.recorder.cache_event(name, found, time.perf_counter() - start)
+        return value
+
+    def hrmini1(self, params):
+        filter_index = self.filter_index
+        selection = tuple(
+            params.get(column, filter_index.options(column)[0]) for column in ('Dept', 'education', 'job_level')
+        )
+        with self.recorder.stage('filter'):
+            rows = filter_index.rows(*selection)
+        with self.recorder.stage('charts'):
+            for name in filter_index.cube:
+                if name != 'age_histogram':
+                    filter_index.aggregate(name, *selection)
+            filter_index.age_histogram(*selection)
+        with self.recorder.stage('insights'):
+            insights(self.model, filter_index.data, rows)
+        with self.recorder.stage('table'):
+            view = self.hr_table.query(rows, search=params.get('search', ''), sort_by=params.get('sort_by'))
+            self.hr_table.page(view, params.get('page', 1), TABLE_PAGE_SIZE)
+        return len(rows)
+
+    def textmini1(self, params):
+        entity_index, data = self.entity_index, self.influencer_loader.data
+        entity = params.get('entity') or entity_index.names('Influencer')[0]
+        column = entity_index.kind(entity)
+        with self.recorder.stage('slice'):
+            rows = entity_index.rows(data, entity, column)
+        if rows.empty:
+            return 0
+        with self.recorder.stage('time series'):
+            self.rollup.view(column, entity, rows, resolution=params.get('resolution', 'auto'))
+        with self.recorder.stage('metrics'):
+            self.metrics.entity_totals(column, entity)
+            rolling_engagement(self.rollup, column, entity, pd.Timedelta(days=params.get('window_days', 7)))
+            self.metrics.top_posts(data, column, entity, params.get('metric', 'Likes'), params.get('top_k', 5))
+            entity_index.co_occurrence(entity, column, limit=10)
+        with self.recorder.stage('table'):
+            view = self.posts_table.query(rows.index.to_numpy(), sort_by='Timestamp', descending=True)
+            self.posts_table.page(view, params.get('page', 1), TABLE_PAGE_SIZE)
+        return len(rows)
+
+    def bond(self, params):
+        principal = params.get('principal', 1000)
+        coupon_rate = params.get('coupon_rate', 5.0) / 100
+        years = params.get('years_to_maturity', 10)
+        discount_rate = params.get('discount_rate', 4.0) / 100
+        bond_price = params.get('bond_price', 1000)
+        frequency = FREQUENCIES.get(params.get('frequency', 'Annual'), 1)
+
+        with self.recorder.stage('pricing'):
+            bond_analytics(principal, coupon_rate, years, discount_rate, frequency)
+            solve_ytm(principal, coupon_rate, years, bond_price, frequency)
+            current_yield(principal, coupon_rate, bond_price)
+            bond_analytics(principal, coupon_rate, years, np.linspace(0, 10, 101) / 100, frequency)
+        if years > 0 and principal > 0:
+            n_scenarios = params.get('n_scenarios', 100_000)
+            shift_volatility = params.get('shift_volatility', 100) / 10000
+            key = (principal, coupon_rate, years, discount_rate, frequency, n_scenarios, shift_volatility)
+
+            def scenarios():
+                pnl = simulate_pnl(principal, coupon_rate, years, discount_rate, frequency,
+                                   n_scenarios=n_scenarios, seed=42, shift_volatility=shift_volatility)
+                return risk_summary(pnl), pnl_histogram(pnl)
+
+            with self.recorder.stage('scenarios'):
+                self.cached('run_rate_scenarios', key, scenarios)
+        with self.recorder.stage('curve pricing'):
+            CurvePricer(self.curve, principal, coupon_rate, years, frequency).analytics()
+        return 1
+
+    def risk_app(self, params):
+        with self.recorder.stage('scores'):
+            if params.get('cvss_vector'):
+                score_vector(params['cvss_vector'])
+            calculate_cvss_score(params.get('impact', 5.0), params.get('exploitability', 5.0), params.get('complexity', 5.0))
+            calculate_custom_risk_score(params.get('likelihood', 0.5), params.get('impact', 5.0))
+            calculate_mtti(params.get('recovery_time', 12), params.get('detection_probability', 0.7))
+            calculate_mttc(params.get('recovery_time', 12), params.get('containment_probability', 0.8))
+            calculate_combined_risk(
+                params.get('likelihood', 0.5), params.get('impact', 5.0), params.get('threat', 0.3), params.get('vulnerability', 0.4)
+            )
+
+        uncertainty = params.get('uncertainty', 0.1)
+        family = params.get('distribution', 'Beta')
+
+        def distribution(value, low, high):
+            if family == 'Beta':
+                return beta_from_mean(value, 1 / uncertainty ** 2, low, high)
+            spread = uncertainty * (high - low)
+            return triangular(max(low, value - spread), value, min(high, value + spread))
+
+        inputs = (
+            ('likelihood', distribution(params.get('likelihood', 0.5), 0.0, 1.0)),
+            ('impact', distribution(params.get('impact', 5.0), 0.0, 10.0)),
+            ('threat', distribution(params.get('threat', 0.3), 0.0, 1.0)),
+            ('vulnerability', distribution(params.get('vulnerability', 0.4), 0.0, 1.0)),
+            ('recovery_time', fixed(params.get('recovery_time', 12))),
+            ('detection_probability', distribution(params.get('detection_probability', 0.7), 0.0, 1.0)),
+            ('containment_probability', distribution(params.get('containment_probability', 0.8), 0.0, 1.0)),
+        )
+        n_samples = params.get('n_samples', 1_000_000)
+
+        def simulation():
+            results = simulate_risk(dict(inputs), n_samples=n_samples, seed=42)
+            return summarize(results), {name: exceedance_curve(values) for name, values in results.items()}
+
+        with self.recorder.stage('simulation'):
+            self.cached('run_risk_simulation', (json.dumps(inputs, sort_keys=True), n_samples), simulation)
+        return 1
+
+
+# Function to generate synthetic traffic: sessions picking a page and widget values at random,
+# with exponentially distributed think times between reruns
+def synthesize_records(stand_ins, count, sessions=32, seed=0, mean_delay=2.0, pages=PAGES):
+    rng = np.random.default_rng(seed)
+    filter_index, entity_index = stand_ins.filter_index, stand_ins.entity_index
+    entities = entity_index.names('Influencer') + entity_index.names('Hashtag')
+    records = []
+    for _ in range(count):
+        page = pages[rng.integers(len(pages))]
+        if page == 'hrmini1':
+            params = {column: filter_index.options(column)[rng.integers(len(filter_index.options(column)))]
+                      for column in ('Dept', 'education', 'job_level')}
+        elif page == 'textmini1':
+            params = {
+                'entity': entities[rng.integers(len(entities))],
+                'resolution': ['auto', 'raw', 'day', 'week'][rng.integers(4)],
+                'window_days': [7, 30, 90][rng.integers(3)],
+                'metric': list(RANKING_METRICS)[rng.integers(len(RANKING_METRICS))],
+                'top_k': int(rng.integers(1, 20)),
+            }
+        elif page == 'bond':
+            params = {
+                'principal': 1000, 'coupon_rate': round(float(rng.uniform(0, 10)), 1),
+                'years_to_maturity': int(rng.integers(1, 31)), 'discount_rate': round(float(rng.uniform(0.5, 10)), 1),
+                'bond_price': int(rng.integers(800, 1200)), 'frequency': list(FREQUENCIES)[rng.integers(len(FREQUENCIES))],
+                'n_scenarios': [1_000, 10_000, 100_000][rng.integers(3)],
+                'shift_volatility': int(rng.integers(10, 200)),
+            }
+        else:
+            params = {
+                name: round(float(rng.uniform(0.05, 0.95)), 2)
+                for name in ('likelihood', 'threat', 'vulnerability', 'detection_probability', 'containment_probability')
+            }
+            params.update({
+                'impact': round(float(rng.uniform(0, 10)), 1), 'recovery_time': int(rng.integers(1, 25)),
+                'uncertainty': 0.1, 'n_samples': [10_000, 100_000][rng.integers(2)],
+            })
+        # Convert numpy scalars so the records serialise as JSON
+        params = {name: value.item() if isinstance(value, np.generic) else value for name, value in params.items()}
+        records.append({
+            'page': page, 'session': f's{rng.integers(sessions)}', 'params': params,
+            'delay': round(float(rng.exponential(mean_delay)), 3),
+        })
+    return records
+
+
+# Function to replay records with one asyncio task per session; at most `sessions` sessions are
+# active at once and reruns execute on a pool of `threads` worker threads
+async def replay(records, stand_ins, sessions=16, threads=None, speed=0.0):
+    by_session = defaultdict(list)
+    for number, record in enumerate(records):
+        by_session[record.get('session', f'anonymous{number % sessions}')].append(record)
+
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=threads or sessions)
+    limit = asyncio.Semaphore(sessions)
+    results = []
+
+    async def run_session(session, session_records):
+        async with limit:
+            for record in session_records:
+                if speed > 0 and record.get('delay'):
+                    await asyncio.sleep(record['delay'] / speed)
+                error = None
+                start = time.perf_counter()
+                try:
+                    await loop.run_in_executor(executor, stand_ins.run, record['page'], session, record.get('params', {}))
+                except Exception as exception:
+                    error = f'{type(exception).__name__}: {exception}'
+                results.append({
+                    'page': record['page'], 'session': session, 'seconds': time.perf_counter() - start, 'error': error,
+                })
+
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(run_session(session, session_records) for session, session_records in by_session.items()))
+    finally:
+        executor.shutdown(wait=True)
+    return results, time.perf_counter() - start
+
+
+# Function to summarise replay results per page: reruns, errors, throughput and latency percentiles
+def latency_report(results, wall_seconds):
+    frame = pd.DataFrame(results, columns=['page', 'session', 'seconds', 'error'])
+    rows = []
+    for page, group in list(frame.groupby('page', sort=False)) + [('all', frame)]:
+        milliseconds = group['seconds'].to_numpy() * 1000
+        row = {
+            'page': page, 'reruns': len(group), 'errors': int(group['error'].notna().sum()),
+            'throughput_per_s': len(group) / wall_seconds if wall_seconds > 0 else np.nan,
+            'mean_ms': milliseconds.mean() if len(group) else np.nan,
+        }
+        for percentile in LATENCY_PERCENTILES:
+            row[f'p{percentile}_ms'] = np.percentile(milliseconds, percentile) if len(group) else np.nan
+        row['max_ms'] = milliseconds.max() if len(group) else np.nan
+        rows.append(row)
+    return pd.DataFrame(rows).set_index('page')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay dashboard traffic against headless page stand-ins.")
+    parser.add_argument('traffic', nargs='*', help="JSON-lines traffic files")
+    parser.add_argument('--synthesize', type=int, default=0, help="Generate this many synthetic reruns instead of reading files")
+    parser.add_argument('--write', default=None, help="Save the synthetic traffic to this file")
+    parser.add_argument('--pages', type=lambda text: text.split(','), default=PAGES,
+                        help=f"Comma-separated pages to replay (default: {','.join(PAGES)})")
+    parser.add_argument('--sessions', type=int, default=16, help="Concurrent sessions (default: 16)")
+    parser.add_argument('--threads', type=int, default=None, help="Worker threads (default: one per session)")
+    parser.add_argument('--speed', type=float, default=0.0,
+                        help="Think-time speed-up; 1 replays delays in real time, 0 ignores them (default: 0)")
+    parser.add_argument('--no-cache', action='store_true', help="Do not memoize the results the pages cache per parameter set")
+    parser.add_argument('--cache-dir', default=None,
+                        help="Use the shared cache's disk tier in this directory (default: memory only)")
+    parser.add_argument('--rows', type=int, default=None,
+                        help="Use synthetic HR and influencer datasets of this many rows instead of the CSV files")
+    parser.add_argument('--hr-data', default=DEFAULT_HR_DATA, help=f"HR dataset (default: {DEFAULT_HR_DATA})")
+    parser.add_argument('--influencer-data', default=DEFAULT_INFLUENCER_DATA,
+                        help=f"Influencer dataset (default: {DEFAULT_INFLUENCER_DATA})")
+    parser.add_argument('--seed', type=int, default=0, help="Seed for synthetic traffic and data (default: 0)")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help=f"Result file (default: {DEFAULT_OUTPUT})")
+    parser.add_argument('--stages', action='store_true', help="Also print the per-stage latency breakdown")
+    args = parser.parse_args(argv)
+
+    unknown = [page for page in args.pages if page not in PAGES]
+    if unknown:
+        parser.error(f"Unknown pages: {', '.join(unknown)}")
+    if not args.traffic and not args.synthesize:
+        parser.error("Give traffic files or --synthesize N")
+
+    with tempfile.TemporaryDirectory() as scratch:
+        hr_path, influencer_path = args.hr_data, args.influencer_data
+        if args.rows:
+            hr_path = os.path.join(scratch, 'employees.csv')
+            influencer_path = os.path.join(scratch, 'influencers.csv')
+            employee_satisfaction(args.rows, args.seed).to_csv(hr_path)
+            influencer_posts(args.rows, args.seed).to_csv(influencer_path, index=False)
+        start = time.perf_counter()
+        stand_ins = PageStandIns(hr_path, influencer_path, cache=not args.no_cache, cache_dir=args.cache_dir)
+        print(f"Loaded datasets in {time.perf_counter() - start:.2f}s")
+
+    if args.synthesize:
+        records = synthesize_records(stand_ins, args.synthesize, args.sessions, args.seed, pages=args.pages)
+        if args.write:
+            write_records(records, args.write)
+            print(f"Wrote {len(records)} synthetic reruns to {args.write}")
+    else:
+        records = [record for record in load_records(args.traffic) if record['page'] in args.pages]
+    if not records:
+        print("No page reruns to replay (records need a 'page' field naming one of: " + ', '.join(PAGES) + ")")
+        return 1
+
+    results, wall_seconds = asyncio.run(replay(records, stand_ins, args.sessions, args.threads, args.speed))
+    report = latency_report(results, wall_seconds)
+    print(f"\nReplayed {len(results)} reruns from {len({result['session'] for result in results})} sessions "
+          f"in {wall_seconds:.2f}s with {args.sessions} concurrent sessions")
+    print(report.to_string(float_format=lambda value: f'{value:.2f}'))
+    if args.stages:
+        print("\nStage latency (ms)")
+        print(stand_ins.recorder.stage_summary().round(2).to_string())
+
+    errors = [result for result in results if result['error']]
+    for result in errors[:5]:
+        print(f"error on {result['page']} ({result['session']}): {result['error']}")
+
+    with open(args.output, 'w') as handle:
+        json.dump({
+            'sessions': args.sessions, 'threads': args.threads or args.sessions, 'speed': args.speed,
+            'cache': not args.no_cache, 'wall_seconds': wall_seconds, 'reruns': len(results),
+            'pages': json.loads(report.to_json(orient='index')),
+        }, handle, indent=2)
+    print(f"\nWrote the report to {args.output}")
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
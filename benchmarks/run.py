@@ -0,0 +1,327 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+from analytics.bond_engine import bond_analytics, bond_valuation, clear_caches, solve_ytm
+from analytics.cvss31 import score_vectors
+from analytics.datasets import open_hr_dataset, open_influencer_dataset
+from analytics.hr_index import FilterIndex
+from analytics.incremental_loader import IncrementalCSV
+from analytics.risk_batch import score_findings
+from analytics.risk_simulation import beta_from_mean, fixed, simulate_risk
+from analytics.satisfaction_model import SatisfactionModel, insights
+from analytics.yield_curve import CurvePricer, clear_curve_cache, curve_from_quotes, par_quotes
+
+from benchmarks.synthetic import bond_quotes, employee_satisfaction, findings, influencer_posts
+from figure_cache import render_mode, use_webgl
+
+# Benchmark suite for the hot paths of the four dashboards.
+#
+# Usage:
+#   python -m benchmarks.run --scales 1e3,1e4,1e5
+#   python -m benchmarks.run --scales 1e3,1e4,1e5,1e6,1e7 --only hr,influencer
+#   python -m benchmarks.run --save-baseline
+#   python -m benchmarks.run --only bond --save-baseline
+#
+# Synthetic datasets are generated at each scale (same seed, same data), written to CSV where
+# the case reads files, and every case is timed repeat times within a per-case time budget.
+# Results are written to JSON and compared with the stored baseline by median time; a case is
+# reported as a regression when it is slower than the threshold allows and by at least
+# min_delta, so timer noise on sub-millisecond cases is not flagged. Saving a baseline replaces
+# the cases that were run and keeps the others.
+
+GROUPS = ['hr', 'influencer', 'bond', 'risk']
+DEFAULT_SCALES = [1_000, 10_000, 100_000]
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+DEFAULT_OUTPUT = 'benchmark_results.json'
+# Maturities for the single-bond pricing and YTM cases, which do not depend on the scale
+MATURITIES = [5, 30, 100]
+# Differences in median time below this many seconds never count as a regression
+MIN_DELTA = 0.001
+
+
+# Function to time a callable: best and median wall time over up to `repeat` runs, stopping
+# early once the runs have used up the time budget (always at least one run)
+def time_call(func, repeat=5, budget=2.0):
+    times = []
+    while len(times) < repeat and (not times or sum(times) < budget):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return {'best': min(times), 'median': statistics.median(times), 'runs': len(times)}
+
+
+# Function to build the HR dashboard's charts for one filter combination from the cube, as the
+# page does on a figure cache miss (plotly figure, WebGL switch and JSON conversion)
+def hr_figures(filter_index, selection):
+    figures = [
+        px.bar(filter_index.aggregate('satisfaction', *selection), x='satisfied', y='count', color='satisfied'),
+        px.scatter(filter_index.aggregate('rating_awards', *selection), x='rating', y='awards', color='satisfied', size='count'),
+        px.bar(filter_index.age_histogram(*selection), x='age', y='count'),
+    ]
+    salary_box = filter_index.aggregate('salary_box', *selection)
+    figures.append(go.Figure(go.Box(
+        x=salary_box['satisfied'], q1=salary_box['q1'], median=salary_box['median'], q3=salary_box['q3'],
+        mean=salary_box['mean'], lowerfence=salary_box['lowerfence'], upperfence=salary_box['upperfence'],
+    )))
+    for column in ('education', 'location'):
+        counts = filter_index.aggregate(column, *selection)
+        figures.append(px.bar(x=counts[column], y=counts['count']))
+    return [use_webgl(fig).to_plotly_json() for fig in figures]
+
+
+# Function to build the influencer tracker's time-series charts for one entity
+def influencer_figures(series):
+    figures = [
+        px.line(series, x='Timestamp', y='Followers', render_mode=render_mode(len(series))),
+        px.bar(series, x='Timestamp', y=['Likes', 'Comments', 'Shares']),
+    ]
+    return [use_webgl(fig).to_plotly_json() for fig in figures]
+
+
+# Function to list the HR dashboard cases: CSV load, index build, filtering, cube reads, chart
+# building and the satisfaction model (fit once per data version, scored on every filter change)
+def hr_cases(rows, workdir, seed):
+    path = os.path.join(workdir, f'employees_{rows}.csv')
+    employee_satisfaction(rows, seed).to_csv(path)
+    loader, filter_index, _ = open_hr_dataset(path, snapshot=False)
+    data = loader.data
+    selection = ('Technology', 'PG', 3)
+
+    yield 'hr.load_csv', lambda: IncrementalCSV(path, snapshot=False), {}
+    yield 'hr.open_dataset', lambda: open_hr_dataset(path, snapshot=False), {}
+    yield 'hr.build_index', lambda: FilterIndex(data), {}
+    yield 'hr.filter_scan', lambda: data[
+        (data['Dept'] == selection[0]) & (data['education'] == selection[1]) & (data['job_level'] == selection[2])
+    ], {}
+    yield 'hr.filter_index', lambda: filter_index.select(*selection), {}
+    yield 'hr.aggregate', lambda: [filter_index.aggregate(name, *selection) for name in filter_index.cube], {}
+    yield 'hr.figures', lambda: hr_figures(filter_index, selection), {}
+    yield 'hr.fit_model', lambda: SatisfactionModel(data), {}
+    model = SatisfactionModel(data)
+    positions = filter_index.rows(*selection)
+    yield 'hr.model_insights', lambda: insights(model, data, positions), {}
+
+
+# Function to list the influencer tracker cases: load, entity slicing, time series, charts and top posts
+def influencer_cases(rows, workdir, seed):
+    path = os.path.join(workdir, f'influencers_{rows}.csv')
+    influencer_posts(rows, seed).to_csv(path, index=False)
+    loader, rollup, entity_index, metrics = open_influencer_dataset(path, snapshot=False)
+    data = loader.data
+    entity = 'Influencer1'
+    entity_rows = entity_index.rows(data, entity)
+
+    yield 'influencer.load_csv', lambda: IncrementalCSV(path, snapshot=False), {}
+    yield 'influencer.open_dataset', lambda: open_influencer_dataset(path, snapshot=False), {}
+    yield 'influencer.slice_scan', lambda: data[data['Influencer'] == entity], {}
+    yield 'influencer.slice_index', lambda: entity_index.rows(data, entity), {}
+    yield 'influencer.hashtag_slice_index', lambda: entity_index.rows(data, '#Travel'), {}
+    yield 'influencer.timeseries', lambda: rollup.view('Influencer', entity, entity_rows), {}
+    series, _ = rollup.view('Influencer', entity, entity_rows)
+    yield 'influencer.figures', lambda: influencer_figures(series), {'points': len(series)}
+    yield 'influencer.top_posts', lambda: metrics.top_posts(data, 'Influencer', entity, 'Likes', 5), {}
+
+
+# Par quotes the curve cases bootstrap from
+CURVE_MATURITIES = [0.5, 1, 2, 3, 5, 7, 10, 20, 30]
+CURVE_PAR_YIELDS = [0.040, 0.041, 0.042, 0.043, 0.045, 0.046, 0.047, 0.049, 0.050]
+# Parallel shifts (-200bp to +200bp) applied in the curve repricing case
+CURVE_SHIFTS = np.linspace(-0.02, 0.02, 41)
+
+
+# Function to list the bond pricing cases: vectorized analytics and YTM over a quote book, and
+# pricing the book off a bootstrapped zero curve under parallel shifts
+def bond_cases(rows, workdir, seed):
+    quotes = bond_quotes(rows, seed)
+    columns = [quotes[column].to_numpy() for column in ('principal', 'coupon_rate', 'years_to_maturity')]
+    frequency = quotes['frequency'].to_numpy()
+    ytm = solve_ytm(*columns, quotes['bond_price'].to_numpy(), frequency)
+
+    yield 'bond.analytics', lambda: bond_analytics(*columns, quotes['discount_rate'].to_numpy(), frequency), {}
+    yield 'bond.solve_ytm', lambda: solve_ytm(*columns, quotes['bond_price'].to_numpy(), frequency), {
+        'mean_iterations': float(np.mean(ytm['iterations'])),
+        'max_iterations': int(np.max(ytm['iterations'])),
+        'converged': float(np.mean(ytm['converged'])),
+    }
+
+    curve = curve_from_quotes(par_quotes(CURVE_MATURITIES, CURVE_PAR_YIELDS))
+    yield 'bond.curve_pricer', lambda: CurvePricer(curve, *columns, frequency), {}
+    pricer = CurvePricer(curve, *columns, frequency)
+    yield 'bond.curve_shifts', lambda: pricer.price(CURVE_SHIFTS), {'shifts': len(CURVE_SHIFTS)}
+
+
+# Function to list the single-bond cases, which are timed once per run rather than per scale
+def bond_scalar_cases():
+    for years in MATURITIES:
+        price = bond_valuation(1000, 0.05, years, 0.04)
+        ytm = solve_ytm(1000, 0.05, years, price * 1.01)
+        # Caches are cleared inside the call so every run pays the full pricing cost
+        yield f'bond.valuation_{years}y', lambda years=years: (clear_caches(), bond_valuation(1000, 0.05, years, 0.04)), {}
+        yield f'bond.calculate_ytm_{years}y', lambda years=years, price=price: solve_ytm(1000, 0.05, years, price * 1.01), {
+            'iterations': int(ytm['iterations']),
+        }
+
+    curve_quotes = par_quotes(CURVE_MATURITIES, CURVE_PAR_YIELDS)
+    yield 'bond.bootstrap_curve', lambda: (clear_curve_cache(), curve_from_quotes(curve_quotes)), {}
+
+
+# Function to list the risk scoring cases: batch scoring, CVSS vectors and Monte Carlo
+def risk_cases(rows, workdir, seed):
+    batch = findings(rows, seed)
+    inputs = {
+        'likelihood': beta_from_mean(0.5, 20),
+        'impact': beta_from_mean(0.5, 20),
+        'threat': beta_from_mean(0.3, 20),
+        'vulnerability': beta_from_mean(0.6, 20),
+        'recovery_time': fixed(12),
+        'detection_probability': beta_from_mean(0.7, 20),
+        'containment_probability': beta_from_mean(0.6, 20),
+    }
+
+    yield 'risk.score_findings', lambda: score_findings(batch), {}
+    yield 'risk.score_vectors', lambda: score_vectors(batch['cvss_vector']), {}
+    yield 'risk.simulate', lambda: simulate_risk(inputs, n_samples=rows, seed=seed), {}
+
+
+CASES = {
+    'hr': hr_cases,
+    'influencer': influencer_cases,
+    'bond': bond_cases,
+    'risk': risk_cases,
+}
+
+
+# Function to run the selected groups at every scale and collect the timings by case key
+def run(scales, groups=GROUPS, repeat=5, budget=2.0, seed=0, workdir=None, log=print):
+    results = {}
+
+    def record(key, func, extra, rows):
+        timing = time_call(func, repeat, budget)
+        results[key] = {'rows': rows, **timing, **extra}
+        log(f"{key:<45} {timing['best'] * 1000:>12.3f} ms  (median {timing['median'] * 1000:.3f} ms, {timing['runs']} runs)")
+
+    with tempfile.TemporaryDirectory() as scratch:
+        workdir = workdir or scratch
+        if 'bond' in groups:
+            for name, func, extra in bond_scalar_cases():
+                record(name, func, extra, 1)
+        for rows in scales:
+            for group in groups:
+                for name, func, extra in CASES[group](rows, workdir, seed):
+                    record(f'{name}@{rows}', func, extra, rows)
+    return results
+
+
+# Function to compare results with a baseline: ratio of median times and a status per case.
+# Changes smaller than min_delta seconds are reported as ok whatever their ratio.
+def compare(results, baseline, threshold=0.25, min_delta=MIN_DELTA):
+    rows = []
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if previous is None:
+            rows.append({'case': key, 'baseline_ms': np.nan, 'current_ms': current['median'] * 1000, 'ratio': np.nan, 'status': 'new'})
+            continue
+        ratio = current['median'] / previous['median'] if previous['median'] > 0 else np.inf
+        if abs(current['median'] - previous['median']) < min_delta:
+            status = 'ok'
+        elif ratio > 1 + threshold:
+            status = 'regression'
+        elif ratio < 1 / (1 + threshold):
+            status = 'faster'
+        else:
+            status = 'ok'
+        rows.append({
+            'case': key, 'baseline_ms': previous['median'] * 1000, 'current_ms': current['median'] * 1000,
+            'ratio': ratio, 'status': status,
+        })
+    return pd.DataFrame(rows, columns=['case', 'baseline_ms', 'current_ms', 'ratio', 'status'])
+
+
+# Function to describe the machine and library versions a run was made with
+def environment():
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+    }
+
+
+# Function to parse a comma-separated list of scales such as "1e3,1e4,100000"
+def parse_scales(text):
+    return [int(float(value)) for value in text.split(',') if value.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard hot paths on synthetic data.")
+    parser.add_argument('--scales', type=parse_scales, default=DEFAULT_SCALES,
+                        help="Comma-separated row counts (default: 1e3,1e4,1e5; up to 1e7)")
+    parser.add_argument('--only', type=lambda text: text.split(','), default=GROUPS,
+                        help=f"Comma-separated groups to run (default: {','.join(GROUPS)})")
+    parser.add_argument('--repeat', type=int, default=5, help="Maximum runs per case (default: 5)")
+    parser.add_argument('--budget', type=float, default=2.0, help="Seconds per case before stopping repeats (default: 2)")
+    parser.add_argument('--seed', type=int, default=0, help="Seed for the synthetic data (default: 0)")
+    parser.add_argument('--data-dir', default=None, help="Keep the generated CSV files here instead of a temporary directory")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help=f"Result file (default: {DEFAULT_OUTPUT})")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="Baseline result file to compare with")
+    parser.add_argument('--threshold', type=float, default=0.25, help="Slowdown counted as a regression (default: 0.25 = 25%%)")
+    parser.add_argument('--min-delta-ms', type=float, default=MIN_DELTA * 1000,
+                        help=f"Smallest slowdown in milliseconds counted as a regression (default: {MIN_DELTA * 1000:g})")
+    parser.add_argument('--save-baseline', action='store_true', help="Store this run as the new baseline")
+    parser.add_argument('--fail-on-regression', action='store_true', help="Exit with status 1 when a regression is found")
+    args = parser.parse_args(argv)
+
+    unknown = [group for group in args.only if group not in CASES]
+    if unknown:
+        parser.error(f"Unknown benchmark groups: {', '.join(unknown)}")
+    if args.data_dir:
+        os.makedirs(args.data_dir, exist_ok=True)
+
+    results = run(args.scales, args.only, args.repeat, args.budget, args.seed, args.data_dir)
+    report = {'environment': environment(), 'scales': args.scales, 'seed': args.seed, 'results': results}
+    with open(args.output, 'w') as handle:
+        json.dump(report, handle, indent=2)
+    print(f"\nWrote {len(results)} results to {args.output}")
+
+    regressions = 0
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as handle:
+            baseline = json.load(handle)
+        comparison = compare(results, baseline['results'], args.threshold, args.min_delta_ms / 1000)
+        regressions = int((comparison['status'] == 'regression').sum())
+        print(f"\nCompared with {args.baseline} ({baseline['environment']['timestamp']}, {baseline['environment']['platform']}):")
+        print(comparison.to_string(index=False, float_format=lambda value: f'{value:.3f}'))
+        print(f"\n{regressions} regression(s) over {args.threshold:.0%} and {args.min_delta_ms:g} ms")
+    else:
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to store one")
+
+    if args.save_baseline:
+        # Cases that were not run keep their stored timings
+        if baseline is not None:
+            report = {**report, 'scales': sorted(set(baseline['scales']) | set(args.scales)),
+                      'results': {**baseline['results'], **results}}
+        with open(args.baseline, 'w') as handle:
+            json.dump(report, handle, indent=2)
+        print(f"Saved baseline to {args.baseline}")
+
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
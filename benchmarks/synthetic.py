@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+
+from analytics.cvss31 import BASE_METRICS
+
+# Synthetic datasets for the benchmarks, shaped like the files the dashboards read.
+#
+# Every generator takes a row count and a seed, so the same scale always produces the same data.
+# Value ranges and category sets follow Employee Satisfaction Index.csv and influencer_data.csv.
+
+DEPARTMENTS = ['HR', 'Technology', 'Marketing', 'Sales', 'Purchasing']
+DEPARTMENT_PREFIXES = ['HR', 'TECH', 'MKT', 'SAL', 'PUR']
+LOCATIONS = ['City', 'Suburb']
+EDUCATION = ['PG', 'UG']
+RECRUITMENT_TYPES = ['On-Campus', 'Referral', 'Walk-in', 'Recruitment Agency']
+HASHTAGS = ['#Travel', '#Fitness', '#Food', '#Fashion', '#Tech']
+
+# Roughly one influencer handle per this many posts, so slicing gets harder as the file grows
+POSTS_PER_INFLUENCER = 20
+# Extra hashtags beyond the five in influencer_data.csv, for the same reason
+EXTRA_HASHTAGS = 45
+
+
+# Function to generate employee records like Employee Satisfaction Index.csv
+def employee_satisfaction(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    dept = rng.integers(0, len(DEPARTMENTS), rows)
+    ids = rng.integers(1000, 10000, rows)
+    return pd.DataFrame({
+        'emp_id': np.char.add(np.array(DEPARTMENT_PREFIXES)[dept], ids.astype(str)),
+        'age': rng.integers(23, 55, rows),
+        'Dept': np.array(DEPARTMENTS)[dept],
+        'location': rng.choice(LOCATIONS, rows),
+        'education': rng.choice(EDUCATION, rows),
+        'recruitment_type': rng.choice(RECRUITMENT_TYPES, rows),
+        'job_level': rng.integers(1, 6, rows),
+        'rating': rng.integers(1, 6, rows),
+        'onsite': rng.integers(0, 2, rows),
+        'awards': rng.integers(0, 10, rows),
+        'certifications': rng.integers(0, 2, rows),
+        'salary': rng.integers(24000, 87000, rows),
+        'satisfied': rng.integers(0, 2, rows),
+    })
+
+
+# Function to generate influencer posts like influencer_data.csv, in time order
+def influencer_posts(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    handles = max(rows // POSTS_PER_INFLUENCER, 10)
+    hashtags = np.array(HASHTAGS + [f'#Topic{number}' for number in range(EXTRA_HASHTAGS)])
+    start = np.datetime64('2023-01-01T00:00:00')
+    seconds = np.sort(rng.integers(0, 365 * 86400, rows))
+
+    influencer = rng.integers(0, handles, rows)
+    # Followers grow over the year from a per-influencer starting point
+    base_followers = rng.integers(10_000, 40_000, handles)
+    followers = base_followers[influencer] + (seconds // 86400) * rng.integers(0, 50, rows)
+    likes = rng.integers(500, 2100, rows)
+    return pd.DataFrame({
+        'Influencer': np.char.add('Influencer', (influencer + 1).astype(str)),
+        'Hashtag': hashtags[rng.integers(0, len(hashtags), rows)],
+        'Followers': followers,
+        'Timestamp': np.char.replace(np.datetime_as_string(start + seconds.astype('timedelta64[s]'), unit='s'), 'T', ' '),
+        'Likes': likes,
+        'Comments': likes // 5 + rng.integers(-20, 20, rows),
+        'Shares': likes // 10 + rng.integers(-10, 10, rows),
+    })
+
+
+# Function to generate bond quotes with the columns bond_cli.py reads
+def bond_quotes(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    years = rng.integers(1, 31, rows).astype(float)
+    coupon_rate = rng.uniform(0.0, 0.10, rows)
+    discount_rate = rng.uniform(0.005, 0.12, rows)
+    frequency = rng.choice([1, 2, 4], rows)
+    principal = np.full(rows, 1000.0)
+    # Quote prices near the fair value at the discount rate
+    periods = years * frequency
+    growth = (1 + discount_rate / frequency) ** -periods
+    fair = principal * (coupon_rate / discount_rate * (1 - growth) + growth)
+    return pd.DataFrame({
+        'principal': principal,
+        'coupon_rate': coupon_rate,
+        'years_to_maturity': years,
+        'discount_rate': discount_rate,
+        'frequency': frequency,
+        'bond_price': fair * rng.uniform(0.97, 1.03, rows),
+    })
+
+
+# Function to generate scanner findings with the risk_batch.py input columns and CVSS vectors
+def findings(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    vector_parts = [
+        np.char.add(f'{metric}:', rng.choice(list(values), rows)) for metric, values in BASE_METRICS.items()
+    ]
+    vectors = vector_parts[0]
+    for part in vector_parts[1:]:
+        vectors = np.char.add(np.char.add(vectors, '/'), part)
+    return pd.DataFrame({
+        'impact': rng.uniform(0, 10, rows),
+        'exploitability': rng.uniform(0, 10, rows),
+        'complexity': rng.uniform(0, 10, rows),
+        'likelihood': rng.uniform(0, 1, rows),
+        'threat': rng.uniform(0, 1, rows),
+        'vulnerability': rng.uniform(0, 1, rows),
+        'recovery_time': rng.uniform(1, 72, rows),
+        'detection_probability': rng.uniform(0, 0.99, rows),
+        'containment_probability': rng.uniform(0, 0.99, rows),
+        'cvss_vector': np.char.add('CVSS:3.1/', vectors).astype(object),
+    })
@@ -3,54 +3,10 @@ import numpy as np
 import pandas as pd
 import plotly.express as px
 
-# Function to calculate bond valuation
-def bond_valuation(principal, coupon_rate, years_to_maturity, discount_rate):
-    coupon_payment = principal * coupon_rate
-    bond_value = 0
-
-    for t in range(1, years_to_maturity + 1):
-        bond_value += coupon_payment / ((1 + discount_rate) ** t)
-
-    bond_value += principal / ((1 + discount_rate) ** years_to_maturity)
-    return bond_value
-
-# Function to calculate yield to maturity (YTM) using numerical methods (Newton's method)
-def calculate_ytm(principal, coupon_rate, years_to_maturity, bond_price):
-    guess = 0.05  # Initial guess for YTM
-    max_iterations = 10000
-    tolerance = 0.001
-
-    for _ in range(max_iterations):
-        bond_value = bond_valuation(principal, coupon_rate, years_to_maturity, guess)
-        error = bond_value - bond_price
-
-        if abs(error) < tolerance:
-            return guess
-
-        guess = guess - error / 1000  # Adjust the guess
-
-    return None
-
-# Function to calculate current yield
-def current_yield(principal, coupon_rate, bond_price):
-    coupon_payment = principal * coupon_rate
-    return (coupon_payment / bond_price) * 100
-
-# Function to calculate modified duration
-def modified_duration(principal, coupon_rate, years_to_maturity, discount_rate):
-    bond_value = bond_valuation(principal, coupon_rate, years_to_maturity, discount_rate)
-    
-    if bond_value == 0:
-        return None  # Avoid division by zero
-    
-    macaulay_duration = 0
-
-    for t in range(1, years_to_maturity + 1):
-        present_value = (coupon_rate * principal / 100) / ((1 + discount_rate) ** t)
-        macaulay_duration += (t * present_value)
-
-    macaulay_duration += (years_to_maturity * (principal / ((1 + discount_rate) ** years_to_maturity)))
-    return macaulay_duration / bond_value
+from analytics.bond_engine import bond_analytics, bond_valuation, cache_stats, current_yield, modified_duration, solve_ytm
+from analytics.rate_scenarios import pnl_histogram, risk_summary, simulate_pnl
+from analytics.shared_cache import SHARED
+from analytics.yield_curve import FREQUENCIES, CurvePricer, curve_cache_stats, curve_from_quotes, par_quotes
 
 # Streamlit app
 st.title("Bond Valuation and Analytics Calculator")
@@ -59,28 +15,35 @@ st.title("Bond Valuation and Analytics Calculator")
 principal = st.number_input("Principal Amount ($):", min_value=0)
 coupon_rate = st.slider("Coupon Rate (%):", min_value=0.0, max_value=100.0, step=0.1)
 years_to_maturity = st.number_input("Years to Maturity:", min_value=0, step=1)
+frequency_name = st.selectbox("Coupon Frequency:", list(FREQUENCIES))
+frequency = FREQUENCIES[frequency_name]
 discount_rate = st.slider("Discount Rate (%):", min_value=0.0, max_value=100.0, step=0.1)
 bond_price = st.number_input("Current Bond Price ($):", min_value=0)
 
 # Calculate bond value
-bond_value = bond_valuation(principal, coupon_rate / 100, years_to_maturity, discount_rate / 100)
+bond_value = bond_valuation(principal, coupon_rate / 100, years_to_maturity, discount_rate / 100, frequency)
 
 # Calculate Yield to Maturity (YTM)
-ytm = calculate_ytm(principal, coupon_rate / 100, years_to_maturity, bond_price)
+ytm_result = solve_ytm(principal, coupon_rate / 100, years_to_maturity, bond_price, frequency)
+ytm = float(ytm_result['ytm']) if ytm_result['converged'] else None
 
 # Calculate Current Yield
 current_yield_value = current_yield(principal, coupon_rate / 100, bond_price)
 
 # Calculate Modified Duration
-modified_duration_value = modified_duration(principal, coupon_rate / 100, years_to_maturity, discount_rate / 100)
+modified_duration_value = modified_duration(principal, coupon_rate / 100, years_to_maturity, discount_rate / 100, frequency)
 
 # Display bond value, YTM, current yield, and modified duration
 st.write(f"**Bond Value**: ${bond_value:.2f}")
 if ytm is not None:
     st.write(f"**Yield to Maturity (YTM)**: {ytm * 100:.2f}%")
+    st.caption(f"Solved in {int(ytm_result['iterations'])} Newton/bisection iterations")
 else:
     st.warning("YTM calculation did not converge. Please check inputs.")
-st.write(f"**Current Yield**: {current_yield_value:.2f}%")
+if current_yield_value is not None:
+    st.write(f"**Current Yield**: {current_yield_value:.2f}%")
+else:
+    st.warning("Current yield needs a non-zero bond price.")
 if modified_duration_value is not None:
     st.write(f"**Modified Duration**: {modified_duration_value:.2f} years")
 else:
@@ -91,13 +54,127 @@ st.subheader("Bond Price Sensitivity to Interest Rate")
 
 # Generate a range of interest rates
 interest_rates = np.linspace(0, 10, 101)  # Interest rates from 0% to 10%
-bond_values = [bond_valuation(principal, coupon_rate / 100, years_to_maturity, r) for r in interest_rates]
+bond_values = bond_analytics(principal, coupon_rate / 100, years_to_maturity, interest_rates / 100, frequency)['price']
 
 # Create a Plotly line plot
 df = pd.DataFrame({'Interest Rate (%)': interest_rates, 'Bond Value ($)': bond_values})
 fig = px.line(df, x='Interest Rate (%)', y='Bond Value ($)', title='Bond Price Sensitivity to Interest Rate')
 st.plotly_chart(fig)
 
+# Interest Rate Scenario Analysis
+st.subheader("Interest Rate Scenario Analysis")
+
+# Cache simulations by their inputs in the shared cache, so reruns for unrelated widgets and
+# other server processes do not resimulate
+@SHARED.memoize('rate_scenarios')
+def run_rate_scenarios(principal, coupon_rate, years_to_maturity, discount_rate, frequency, model, n_scenarios, seed, params):
+    pnl = simulate_pnl(principal, coupon_rate, years_to_maturity, discount_rate, frequency, model=model,
+                       n_scenarios=n_scenarios, seed=seed, **dict(params))
+    return risk_summary(pnl), pnl_histogram(pnl)
+
+scenario_model = st.selectbox("Rate Model:", ["Parallel Shift", "Vasicek Short Rate"])
+n_scenarios = st.select_slider("Number of Scenarios:", options=[1_000, 10_000, 100_000, 1_000_000], value=100_000)
+scenario_seed = st.number_input("Random Seed:", min_value=0, value=42, step=1)
+if scenario_model == "Parallel Shift":
+    shift_volatility = st.slider("Shift Volatility (bp):", min_value=1, max_value=500, value=100)
+    scenario_params = (('shift_volatility', shift_volatility / 10000),)
+    model_key = 'parallel'
+else:
+    mean_reversion = st.slider("Mean Reversion Speed:", min_value=0.01, max_value=2.0, value=0.3, step=0.01)
+    long_term_rate = st.slider("Long-Term Rate (%):", min_value=0.0, max_value=20.0, value=4.0, step=0.1)
+    rate_volatility = st.slider("Short Rate Volatility (bp):", min_value=1, max_value=500, value=100)
+    horizon = st.slider("Horizon (years):", min_value=0.1, max_value=5.0, value=1.0, step=0.1)
+    scenario_params = (('mean_reversion', mean_reversion), ('long_term_rate', long_term_rate / 100),
+                       ('volatility', rate_volatility / 10000), ('horizon', horizon))
+    model_key = 'vasicek'
+
+if years_to_maturity > 0 and principal > 0:
+    with st.spinner("Simulating rate scenarios..."):
+        scenario_risk, scenario_histogram = run_rate_scenarios(
+            principal, coupon_rate / 100, years_to_maturity, discount_rate / 100, frequency, model_key, n_scenarios, scenario_seed, scenario_params
+        )
+    st.dataframe(scenario_risk.style.format({'VaR ($)': '${:.2f}', 'Expected Shortfall ($)': '${:.2f}'}))
+    fig = px.bar(scenario_histogram, x='P&L ($)', y='Scenarios', title='Scenario P&L Distribution')
+    fig.update_layout(bargap=0)
+    st.plotly_chart(fig)
+else:
+    st.info("Enter a principal and maturity to run rate scenarios.")
+
+# Yield Curve Pricing
+st.subheader("Yield Curve Pricing")
+st.write("Edit the market quotes (clean price per 100 face); a zero curve is bootstrapped from them and reused for every repricing.")
+
+default_quotes = par_quotes(
+    [0.5, 1, 2, 3, 5, 7, 10, 20, 30], [0.040, 0.041, 0.042, 0.043, 0.045, 0.046, 0.047, 0.049, 0.050], frequency=2
+)
+quotes = st.data_editor(
+    default_quotes.assign(coupon_rate=default_quotes['coupon_rate'] * 100).rename(columns={
+        'maturity': 'Maturity (years)', 'coupon_rate': 'Coupon (%)', 'price': 'Price', 'frequency': 'Frequency',
+    }),
+    num_rows='dynamic',
+).dropna()
+quotes = pd.DataFrame({
+    'maturity': quotes['Maturity (years)'], 'coupon_rate': quotes['Coupon (%)'] / 100,
+    'price': quotes['Price'], 'frequency': quotes['Frequency'],
+})
+
+# Portfolio cash flows and discount factors, kept per (quotes, portfolio file) so moving the shift
+# range or other widgets does not rebuild them
+@st.cache_resource(max_entries=4)
+def portfolio_pricer(quotes_key, portfolio_bytes, _curve, _portfolio):
+    return CurvePricer(
+        _curve, _portfolio['principal'].to_numpy(dtype=float), _portfolio['coupon_rate'].to_numpy(dtype=float),
+        _portfolio['years_to_maturity'].to_numpy(dtype=float),
+        _portfolio['frequency'].to_numpy(dtype=float) if 'frequency' in _portfolio.columns else 1.0,
+    )
+
+try:
+    curve = curve_from_quotes(quotes)
+except (ValueError, IndexError):
+    curve = None
+    st.warning("Enter at least one quote, with positive and distinct maturities, to build the curve.")
+
+if curve is not None:
+    curve_table = curve.frame()
+    fig = px.line(
+        curve_table.assign(zero_rate=curve_table['zero_rate'] * 100, forward_rate=curve_table['forward_rate'] * 100),
+        x='time', y=['zero_rate', 'forward_rate'], markers=True,
+        labels={'time': 'Maturity (years)', 'value': 'Rate (%)', 'variable': 'Curve'}, title='Bootstrapped Zero Curve',
+    )
+    st.plotly_chart(fig)
+
+    # Price the bond above off the curve, allowing a fractional remaining maturity
+    remaining_years = st.number_input(
+        "Remaining Maturity for Curve Pricing (years):", min_value=0.0, value=float(years_to_maturity), step=0.25
+    )
+    curve_analytics = CurvePricer(curve, principal, coupon_rate / 100, remaining_years, frequency).analytics()
+    st.write(
+        f"**Curve Price**: ${float(curve_analytics['clean_price'][0]):.2f} clean, "
+        f"${float(curve_analytics['dirty_price'][0]):.2f} dirty "
+        f"(accrued interest ${float(curve_analytics['accrued_interest'][0]):.2f})"
+    )
+
+    # Reprice a whole portfolio under parallel curve shifts in one pass
+    portfolio_file = st.file_uploader(
+        "Portfolio CSV (principal, coupon_rate, years_to_maturity and optionally frequency; rates as decimals)",
+        type=["csv"],
+    )
+    if portfolio_file is not None:
+        portfolio = pd.read_csv(portfolio_file)
+        pricer = portfolio_pricer(quotes.to_json(), portfolio_file.getvalue(), curve, portfolio)
+        shifts_bp = np.arange(-200, 201, 10)
+        values = pricer.price(shifts_bp / 10000).sum(axis=1)
+        st.write(f"**Portfolio Value**: ${values[len(shifts_bp) // 2]:,.2f} across {pricer.cash_flows.bonds:,} bonds")
+        fig = px.line(
+            pd.DataFrame({'Curve Shift (bp)': shifts_bp, 'Portfolio Value ($)': values}),
+            x='Curve Shift (bp)', y='Portfolio Value ($)', title='Portfolio Value under Parallel Curve Shifts',
+        )
+        st.plotly_chart(fig)
+
+# Discount-factor and curve cache statistics (shared by all sessions in this server process)
+with st.expander("Calculation Cache Statistics"):
+    st.dataframe(pd.DataFrame({**cache_stats(), **curve_cache_stats()}).T)
+
 # Explanation using LaTeX
 st.subheader("Formulas:")
 st.latex(r"\text{Bond Valuation Formula:}")
@@ -108,13 +185,13 @@ st.latex(r"\text{Modified Duration:}")
 
 st.write("Where:")
 st.latex(r"PV = \text{Present Value of the Bond}")
-st.latex(r"C = \text{Annual Coupon Payment}")
+st.latex(r"C = \text{Coupon Payment per Period (annual coupon divided by the coupon frequency)}")
 st.latex(r"r = \text{Discount Rate per Period}")
-st.latex(r"n = \text{Number of Years to Maturity}")
+st.latex(r"n = \text{Number of Coupon Periods to Maturity}")
 st.latex(r"F = \text{Face Value of the Bond}")
-st.latex(r"\text{Yield to Maturity (YTM)} = ?")  # Provide explanation for YTM formula
+st.latex(r"\text{Yield to Maturity (YTM)}: \text{the } r \text{ solving } PV(r) = \text{Current Bond Price}")
 st.latex(r"\text{Current Yield} = \frac{C}{\text{Current Bond Price}} \times 100\%")
-st.latex(r"\text{Modified Duration} = \frac{\sum_{t=1}^{n} t \left(\frac{C \cdot P}{(1+r)^t}\right) + n \left(\frac{F}{(1+r)^n}\right)}{PV}")
+st.latex(r"\text{Modified Duration} = \frac{1}{1+r} \cdot \frac{\sum_{t=1}^{n} t \left(\frac{C}{(1+r)^t}\right) + n \left(\frac{F}{(1+r)^n}\right)}{PV}")
 
 # Additional Information
 st.subheader("Additional Information:")
@@ -0,0 +1,138 @@
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from analytics.bond_engine import bond_analytics, current_yield, solve_ytm
+
+# Headless bulk bond analytics for nightly jobs.
+#
+# Usage:
+#   python bond_cli.py quotes.csv results.csv --chunk-size 200000 --workers 8
+#
+# Input columns (rates as decimals, e.g. 0.05 for 5%):
+#   principal, coupon_rate, years_to_maturity, bond_price   required
+#   discount_rate, frequency                                 optional
+# When discount_rate is missing, price and modified duration are evaluated at the solved YTM.
+
+REQUIRED_COLUMNS = ['principal', 'coupon_rate', 'years_to_maturity', 'bond_price']
+
+
+# Function to calculate price, YTM, current yield and modified duration for one chunk of quotes
+def analyze_chunk(chunk):
+    missing = [column for column in REQUIRED_COLUMNS if column not in chunk.columns]
+    if missing:
+        raise ValueError(f"Quote file is missing required columns: {', '.join(missing)}")
+
+    principal = chunk['principal'].to_numpy(dtype=float)
+    coupon_rate = chunk['coupon_rate'].to_numpy(dtype=float)
+    years_to_maturity = chunk['years_to_maturity'].to_numpy(dtype=float)
+    bond_price = chunk['bond_price'].to_numpy(dtype=float)
+    frequency = chunk['frequency'].to_numpy(dtype=float) if 'frequency' in chunk.columns else 1.0
+
+    ytm_result = solve_ytm(principal, coupon_rate, years_to_maturity, bond_price, frequency)
+    if 'discount_rate' in chunk.columns:
+        discount_rate = chunk['discount_rate'].to_numpy(dtype=float)
+    else:
+        discount_rate = ytm_result['ytm']
+    analytics = bond_analytics(principal, coupon_rate, years_to_maturity, discount_rate, frequency)
+
+    result = chunk.copy()
+    result['price'] = analytics['price']
+    result['ytm'] = ytm_result['ytm']
+    result['ytm_iterations'] = ytm_result['iterations']
+    result['current_yield'] = current_yield(principal, coupon_rate, bond_price)
+    result['modified_duration'] = analytics['modified_duration']
+    return result
+
+
+# Function to read a CSV or Parquet quote file as a stream of bounded-size DataFrames
+def read_chunks(path, chunk_size):
+    if path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size)
+
+
+# Writer that appends result chunks to a CSV or Parquet file as they are produced
+class ChunkWriter:
+    def __init__(self, path):
+        self.path = path
+        self.parquet_writer = None
+        self.header_written = False
+
+    def write(self, frame):
+        if self.path.endswith('.parquet'):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self.parquet_writer is None:
+                self.parquet_writer = pq.ParquetWriter(self.path, table.schema)
+            self.parquet_writer.write_table(table)
+        else:
+            frame.to_csv(self.path, mode='a' if self.header_written else 'w', header=not self.header_written, index=False)
+            self.header_written = True
+
+    def close(self):
+        if self.parquet_writer is not None:
+            self.parquet_writer.close()
+
+
+# Function to stream a quote file through a process pool, writing results in input order.
+# At most 2 * workers chunks are in flight, so memory stays bounded by the chunk size.
+def run(input_path, output_path, chunk_size=100_000, workers=None):
+    workers = workers or os.cpu_count() or 1
+    writer = ChunkWriter(output_path)
+    rows = 0
+    start = time.perf_counter()
+
+    try:
+        if workers == 1:
+            for chunk in read_chunks(input_path, chunk_size):
+                result = analyze_chunk(chunk)
+                writer.write(result)
+                rows += len(result)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                pending = deque()
+                for chunk in read_chunks(input_path, chunk_size):
+                    pending.append(pool.submit(analyze_chunk, chunk))
+                    if len(pending) >= 2 * workers:
+                        result = pending.popleft().result()
+                        writer.write(result)
+                        rows += len(result)
+                while pending:
+                    result = pending.popleft().result()
+                    writer.write(result)
+                    rows += len(result)
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - start
+    return rows, elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk bond analytics: price, YTM, current yield and modified duration.")
+    parser.add_argument('input', help="Quote file (.csv or .parquet)")
+    parser.add_argument('output', help="Result file (.csv or .parquet)")
+    parser.add_argument('--chunk-size', type=int, default=100_000, help="Rows per chunk (default: 100000)")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    rows, elapsed = run(args.input, args.output, args.chunk_size, args.workers)
+    rate = rows / elapsed if elapsed > 0 else float('inf')
+    print(f"Processed {rows} rows in {elapsed:.2f}s ({rate:,.0f} rows/sec)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,85 @@
+import threading
+import time
+from collections import OrderedDict
+
+import plotly.graph_objects as go
+
+from analytics.instrumentation import RECORDER
+
+# Server-side figure memoization for the dashboards.
+#
+# A chart is built through FIGURES.figure(name, key, build): `key` holds everything the figure
+# depends on (filter state and the loader's data version), and on a hit the stored figure JSON
+# is returned without re-running the aggregation or the plotly express call. Scatter traces with
+# more than WEBGL_POINT_THRESHOLD points are switched to WebGL (scattergl) before storing.
+# Hits and misses are recorded in the instrumentation panel under "figure: <name>".
+
+WEBGL_POINT_THRESHOLD = 5_000
+MAX_FIGURES = 256
+
+
+# Function to pick the plotly express render mode for a chart with the given number of points
+def render_mode(points, threshold=WEBGL_POINT_THRESHOLD):
+    return 'webgl' if points > threshold else 'svg'
+
+
+# Function to replace large SVG scatter traces of a figure with WebGL ones
+def use_webgl(fig, threshold=WEBGL_POINT_THRESHOLD):
+    traces = []
+    changed = False
+    for trace in fig.data:
+        if trace.type == 'scatter' and trace.x is not None and len(trace.x) > threshold:
+            properties = trace.to_plotly_json()
+            properties.pop('type')
+            traces.append(go.Scattergl(properties, skip_invalid=True))
+            changed = True
+        else:
+            traces.append(trace)
+    if changed:
+        fig = go.Figure(data=traces, layout=fig.layout)
+    return fig
+
+
+# Least-recently-used store of figure JSON shared by all sessions of the process
+class FigureMemo:
+    def __init__(self, max_figures=MAX_FIGURES, webgl_threshold=WEBGL_POINT_THRESHOLD):
+        self.max_figures = max_figures
+        self.webgl_threshold = webgl_threshold
+        self.figures = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    # Function to return the figure for (name, key), building and storing it on a miss
+    def figure(self, name, key, build):
+        start = time.perf_counter()
+        with self.lock:
+            stored = self.figures.get((name, key))
+            hit = stored is not None
+            if hit:
+                self.figures.move_to_end((name, key))
+                self.hits += 1
+        if not hit:
+            stored = use_webgl(build(), self.webgl_threshold).to_plotly_json()
+            with self.lock:
+                self.figures[(name, key)] = stored
+                self.misses += 1
+                while len(self.figures) > self.max_figures:
+                    self.figures.popitem(last=False)
+        RECORDER.cache_event(f'figure: {name}', hit, time.perf_counter() - start)
+        return stored
+
+    def stats(self):
+        with self.lock:
+            calls = self.hits + self.misses
+            return {
+                'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hits / calls if calls else 0.0,
+                'size': len(self.figures), 'max_size': self.max_figures,
+            }
+
+    def clear(self):
+        with self.lock:
+            self.figures.clear()
+
+
+FIGURES = FigureMemo()
@@ -1,44 +1,124 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 
-# Load the dataset
-@st.cache_data
-def load_data():
-    data = pd.read_csv("Employee Satisfaction Index.csv")  # Replace with your dataset file path
-    return data
+from analytics.columnar_cache import source_fingerprint
+from analytics.comment_cloud import TokenCounter, render_word_cloud_png
+from analytics.datasets import open_hr_dataset
+from analytics.instrumentation import RECORDER
+from analytics.satisfaction_model import SatisfactionModel, insights
+from analytics.shared_cache import SHARED
+from analytics.table_view import TableView
+from figure_cache import FIGURES
+from perf_panel import begin_rerun, show_panel
+from table_panel import paged_table
+
+begin_rerun('hrmini1')
 
-data = load_data()
+# Load the dataset once per server process; later reruns parse only rows appended to the CSV
+@RECORDER.counted_cache(st.cache_resource)
+def load_dataset():
+    return open_hr_dataset("Employee Satisfaction Index.csv")  # Replace with your dataset file path
+
+def load_data():
+    loader, filter_index, comment_counter = load_dataset()
+    loader.refresh()
+    return filter_index, comment_counter, loader.version
+
+# Server-side table over the loaded rows; rebuilt (and its sort ranks recomputed) per data version
+@RECORDER.counted_cache(st.cache_resource(max_entries=1))
+def data_table(data_version):
+    return TableView(load_dataset()[1].data)
+
+# Satisfaction model fitted on all rows. The fit goes through the shared cache keyed by the CSV's
+# fingerprint and row count, so other server processes reuse it and a changed file refits it.
+@SHARED.memoize('satisfaction_model', version=lambda source_version, rows, _data: source_version)
+def fit_satisfaction_model(source_version, rows, _data):
+    return SatisfactionModel(_data)
+
+@RECORDER.counted_cache(st.cache_resource(max_entries=1, show_spinner="Fitting satisfaction model..."))
+def satisfaction_model(data_version):
+    loader, filter_index, _ = load_dataset()
+    return fit_satisfaction_model(source_fingerprint(loader.path), len(filter_index.data), filter_index.data)
+
+with RECORDER.stage('load'):
+    filter_index, comment_counter, data_version = load_data()
+
+# Chart builders; figures are memoized server-side per (filter selection, data version), so a
+# rerun with unchanged filters and data reuses the stored figure JSON
+def satisfaction_figure(filter_index, selection):
+    satisfaction_counts = filter_index.aggregate('satisfaction', *selection)
+    return px.bar(satisfaction_counts, x='satisfied', y='count', color='satisfied', title='Satisfaction Distribution')
+
+def salary_box_figure(filter_index, selection):
+    salary_box = filter_index.aggregate('salary_box', *selection)
+    fig = go.Figure(go.Box(
+        x=salary_box['satisfied'], q1=salary_box['q1'], median=salary_box['median'], q3=salary_box['q3'],
+        mean=salary_box['mean'], lowerfence=salary_box['lowerfence'], upperfence=salary_box['upperfence'],
+    ))
+    fig.update_layout(title='Salary Distribution by Satisfaction', xaxis_title='satisfied', yaxis_title='salary')
+    return fig
+
+def rating_awards_figure(filter_index, selection):
+    rating_awards = filter_index.aggregate('rating_awards', *selection)
+    return px.scatter(rating_awards, x='rating', y='awards', color='satisfied', size='count', title='Employee Ratings vs. Awards')
+
+def age_figure(filter_index, selection):
+    age_histogram = filter_index.age_histogram(*selection)
+    fig = px.bar(age_histogram, x='age', y='count', title='Age Distribution')
+    fig.update_layout(bargap=0)
+    return fig
+
+def count_figure(filter_index, selection, column, title):
+    counts = filter_index.aggregate(column, *selection)
+    return px.bar(x=counts[column], y=counts['count'], title=title)
+
+def drivers_figure(model):
+    drivers = model.drivers()
+    fig = px.bar(
+        drivers, x='importance', y='factor', orientation='h', hover_data=['detail'],
+        title='Drivers of Satisfaction (share of model)',
+    )
+    fig.update_layout(yaxis={'categoryorder': 'total ascending'}, xaxis_tickformat='.0%')
+    return fig
 
 st.title("Understanding Employee Job Satisfaction in the Telecom Sector")
 st.markdown("Exploring Factors, Trends, and Strategies for Enhancing Satisfaction")
 
 # Sidebar filters
 st.sidebar.header("Filter Data")
-selected_dept = st.sidebar.selectbox("Select Department", data['Dept'].unique())
-selected_education = st.sidebar.selectbox("Select Education", data['education'].unique())
-selected_job_level = st.sidebar.selectbox("Select Job Level", data['job_level'].unique())
+selected_dept = st.sidebar.selectbox("Select Department", filter_index.options('Dept'))
+selected_education = st.sidebar.selectbox("Select Education", filter_index.options('education'))
+selected_job_level = st.sidebar.selectbox("Select Job Level", filter_index.options('job_level'))
 
-filtered_data = data[(data['Dept'] == selected_dept) & (data['education'] == selected_education) & (data['job_level'] == selected_job_level)]
+selection = (selected_dept, selected_education, selected_job_level)
+figure_key = (selection, data_version)
+with RECORDER.stage('filter'):
+    filtered_rows = filter_index.rows(*selection)
+with RECORDER.stage('model'):
+    model = satisfaction_model(data_version)
 
 # Section 1: Employee Satisfaction Overview
 st.header("Section 1: Employee Satisfaction Overview")
 st.write("Distribution of Job Satisfaction Ratings")
 
-fig = px.histogram(filtered_data, x='satisfied', color='satisfied', title='Satisfaction Distribution')
-st.plotly_chart(fig)
+with RECORDER.stage('chart: satisfaction'):
+    st.plotly_chart(FIGURES.figure('satisfaction', figure_key, lambda: satisfaction_figure(filter_index, selection)))
 
 st.write("Average Salary by Job Satisfaction")
-fig = px.box(filtered_data, x='satisfied', y='salary', title='Salary Distribution by Satisfaction')
-st.plotly_chart(fig)
+with RECORDER.stage('chart: salary box'):
+    st.plotly_chart(FIGURES.figure('salary box', figure_key, lambda: salary_box_figure(filter_index, selection)))
 
 st.write("Employee Ratings vs. Awards")
-fig = px.scatter(filtered_data, x='rating', y='awards', color='satisfied', title='Employee Ratings vs. Awards')
-st.plotly_chart(fig)
+with RECORDER.stage('chart: ratings vs awards'):
+    st.plotly_chart(FIGURES.figure('ratings vs awards', figure_key, lambda: rating_awards_figure(filter_index, selection)))
 
 # Section 2: Factors Influencing Satisfaction
 st.header("Section 2: Factors Influencing Satisfaction")
+st.write("Which employee attributes the satisfaction model relies on most, fitted on all employees")
+with RECORDER.stage('chart: drivers'):
+    st.plotly_chart(FIGURES.figure('drivers', data_version, lambda: drivers_figure(model)))
+
 st.write("Word Cloud of Factors Mentioned in Comments")
 
 # You can add code to generate a word cloud here if you have comments data
@@ -51,51 +131,57 @@ sample_comments = [
     "I feel valued and supported by my colleagues.",
 ]
 
-# Display sample comments as a word cloud
+# Display comments as a word cloud, rendered once per distinct comment text and served from cache
 # You may need to install the 'wordcloud' library: pip install wordcloud
-from wordcloud import WordCloud
-import matplotlib.pyplot as plt
-
-comment_text = ' '.join(sample_comments)
-wordcloud = WordCloud(width=800, height=400, background_color='white').generate(comment_text)
-
-plt.figure(figsize=(10, 5))
-plt.imshow(wordcloud, interpolation='bilinear')
-plt.axis("off")
-plt.title("Word Cloud of Employee Comments")
-st.pyplot(plt)
+@RECORDER.counted_cache(st.cache_resource)
+def sample_comment_counter():
+    counter = TokenCounter()
+    counter.add_texts(sample_comments)
+    return counter
+
+@RECORDER.counted_cache(st.cache_data(show_spinner="Rendering word cloud..."))
+def word_cloud_png(comments_digest, _frequencies):
+    return render_word_cloud_png(_frequencies)
+
+with RECORDER.stage('word cloud'):
+    cloud_counter = comment_counter if comment_counter.documents else sample_comment_counter()
+    if cloud_counter.counts:
+        st.image(word_cloud_png(cloud_counter.digest, cloud_counter.most_common()), caption="Word Cloud of Employee Comments")
+    else:
+        st.info("No comment text available for the word cloud.")
 
 # Section 3: Detailed Data Analysis
 st.header("Section 3: Detailed Data Analysis")
 
 # Interactive Data Table
 st.subheader("Filtered Data")
-st.dataframe(filtered_data)
+with RECORDER.stage('table'):
+    paged_table(data_table(data_version), filtered_rows, key='hr', file_name='filtered_employees.csv')
 
-# Detailed Insights and Observations
+# Detailed Insights and Observations, generated from the model and the filtered rows
 st.subheader("Insights and Observations")
-st.markdown("""
-- Employees with higher ratings tend to receive more awards, indicating a positive correlation between performance and recognition.
-- The majority of employees are satisfied with their jobs, but there's a small percentage that isn't. Further analysis is needed to understand the factors influencing job satisfaction for dissatisfied employees.
-""")
+with RECORDER.stage('insights'):
+    st.markdown("\n".join(f"- {line}" for line in insights(model, filter_index.data, filtered_rows)))
 
 # Section 4: Employee Demographics
 st.header("Section 4: Employee Demographics")
 
 # Interactive Charts for Demographics
 st.write("Age Distribution")
-fig = px.histogram(filtered_data, x='age', title='Age Distribution')
-st.plotly_chart(fig)
+with RECORDER.stage('chart: age'):
+    st.plotly_chart(FIGURES.figure('age', figure_key, lambda: age_figure(filter_index, selection)))
 
 st.write("Education Levels")
-edu_counts = filtered_data['education'].value_counts()
-fig = px.bar(x=edu_counts.index, y=edu_counts.values, title='Education Levels')
-st.plotly_chart(fig)
+with RECORDER.stage('chart: education'):
+    st.plotly_chart(FIGURES.figure(
+        'education', figure_key, lambda: count_figure(filter_index, selection, 'education', 'Education Levels')
+    ))
 
 st.write("Location Distribution")
-loc_counts = filtered_data['location'].value_counts()
-fig = px.bar(x=loc_counts.index, y=loc_counts.values, title='Location Distribution')
-st.plotly_chart(fig)
+with RECORDER.stage('chart: location'):
+    st.plotly_chart(FIGURES.figure(
+        'location', figure_key, lambda: count_figure(filter_index, selection, 'location', 'Location Distribution')
+    ))
 
 # Section 5: Employee Retention Strategies
 st.header("Section 5: Employee Retention Strategies")
@@ -198,3 +284,6 @@ user_feedback = st.text_area("Your Feedback")
 
 # You can add code to handle user feedback and comments here
 
+# Optional timing panel for this rerun
+show_panel('hrmini1')
+
@@ -0,0 +1,56 @@
+import os
+import uuid
+
+import streamlit as st
+import plotly.express as px
+
+from analytics.instrumentation import RECORDER
+from analytics.shared_cache import SHARED
+
+# Optional sidebar panel with the per-rerun timings recorded by analytics.instrumentation.
+#
+# Call begin_rerun(page) at the top of a dashboard and show_panel(page) at the bottom. When the
+# DASHBOARD_METRICS_LOG environment variable names a file, every rerun's records are appended
+# to it as JSON lines so runs from many sessions can be aggregated afterwards.
+
+METRICS_LOG = os.environ.get('DASHBOARD_METRICS_LOG')
+
+# Function to start timing a rerun of one page for the current browser session
+def begin_rerun(page):
+    session = st.session_state.setdefault('instrumentation_session', uuid.uuid4().hex)
+    RECORDER.start_rerun(page, session)
+
+# Function to export the rerun and, when enabled in the sidebar, show the timing panel
+def show_panel(page):
+    if METRICS_LOG:
+        RECORDER.export_rerun(METRICS_LOG)
+
+    if not st.sidebar.checkbox("Show performance panel", value=False):
+        return
+    panel = st.sidebar.expander("Performance", expanded=True)
+
+    last_rerun = [record for record in RECORDER.current_rerun() if record['kind'] == 'stage']
+    panel.caption(f"This rerun: {sum(record['seconds'] for record in last_rerun) * 1000:.1f} ms over {len(last_rerun)} stages")
+
+    panel.write("Stage latency (ms)")
+    summary = RECORDER.stage_summary(page)
+    panel.dataframe(summary.round(2))
+
+    if not summary.empty:
+        stage = panel.selectbox("Latency histogram for stage", list(summary.index))
+        histogram = RECORDER.latency_histogram(stage, page)
+        fig = px.bar(histogram, x='ms', y='count', log_x=True, title=f"{stage} latency")
+        fig.update_layout(bargap=0, height=250, margin=dict(l=10, r=10, t=40, b=10))
+        panel.plotly_chart(fig, use_container_width=True)
+
+    panel.write("Cache hits and misses")
+    panel.dataframe(RECORDER.cache_summary(page).round(3))
+
+    panel.write("Shared cache (this process)")
+    panel.dataframe(SHARED.stats().round(3))
+    panel.json(SHARED.usage(), expanded=False)
+
+    panel.download_button(
+        "Download timings (JSON lines)", RECORDER.to_jsonl(), file_name=f"{page}_timings.jsonl",
+        mime='application/x-ndjson',
+    )
@@ -3,6 +3,18 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 
+from analytics.risk_models import (
+    calculate_combined_risk,
+    calculate_custom_risk_score,
+    calculate_cvss_score,
+    calculate_mttc,
+    calculate_mtti,
+)
+from analytics.cvss31 import score_vector
+from analytics.risk_batch import SCORE_COLUMNS, load_findings, page, rank_findings, score_findings, score_histogram
+from analytics.risk_simulation import beta_from_mean, exceedance_curve, fixed, simulate_risk, summarize, triangular
+from analytics.shared_cache import SHARED
+
 # Initialize variables
 cvss_score = 0.0
 custom_risk_score = 0.0
@@ -10,33 +22,6 @@ mtti_result = 0.0
 mttc_result = 0.0
 combined_risk_score = 0.0
 
-# Function to calculate CVSS score
-def calculate_cvss_score(impact, exploitability, complexity):
-    # Formula for CVSS Base Score
-    base_score = round(impact * exploitability * complexity, 2)
-    return base_score
-
-# Function to calculate a basic risk assessment score using a custom formula
-def calculate_custom_risk_score(likelihood, impact):
-    # Custom formula for risk score
-    risk_score = likelihood * impact
-    return risk_score
-
-# Function to calculate Mean Time to Identify (MTTI) based on input parameters
-def calculate_mtti(recovery_time, detection_probability):
-    mtti = recovery_time / (1 - detection_probability)
-    return mtti
-
-# Function to calculate Mean Time to Contain (MTTC) based on input parameters
-def calculate_mttc(recovery_time, containment_probability):
-    mttc = recovery_time / (1 - containment_probability)
-    return mttc
-
-# Function to calculate risk using the formula Risk = Likelihood * Impact + Threat * Vulnerability
-def calculate_combined_risk(likelihood, impact, threat, vulnerability):
-    risk_score = likelihood * impact + threat * vulnerability
-    return risk_score
-
 # Streamlit UI
 st.title("Information Security Risk Assessment")
 
@@ -62,6 +47,14 @@ st.markdown(
 )
 st.latex("CVSS Base Score = \\text{Impact} \\times \\text{Exploitability} \\times \\text{Complexity}")
 
+st.markdown(
+    """
+    Alternatively, enter a CVSS v3.1 vector string such as `CVSS:3.1/AV:N/AC:L/PR:N/UI:N/S:U/C:H/I:H/A:H`
+    in the sidebar to score it exactly as the CVSS v3.1 specification defines, including the optional
+    temporal (`E`, `RL`, `RC`) and environmental (`CR`, `IR`, `AR`, `MAV` ... `MA`) metrics.
+    """
+)
+
 st.markdown(
     """
     ## Custom Risk Assessment
@@ -112,6 +105,7 @@ st.sidebar.header("CVSS Parameters")
 impact_cvss = st.sidebar.slider("CVSS Impact (0.0 - 10.0)", 0.0, 10.0, 5.0, key="cvss_impact")
 exploitability_cvss = st.sidebar.slider("Exploitability (0.0 - 10.0)", 0.0, 10.0, 5.0, key="cvss_exploit")
 complexity_cvss = st.sidebar.slider("Complexity (0.0 - 10.0)", 0.0, 10.0, 5.0, key="cvss_complexity")
+cvss_vector = st.sidebar.text_input("CVSS v3.1 Vector (optional)", key="cvss_vector")
 
 st.sidebar.header("Custom Risk Assessment Parameters")
 likelihood_custom = st.sidebar.slider("Likelihood (0.0 - 1.0)", 0.0, 1.0, 0.5, key="custom_likelihood")
@@ -131,8 +125,21 @@ threat_combined = st.sidebar.slider("Threat (0.0 - 1.0)", 0.0, 1.0, 0.3, key="co
 vulnerability_combined = st.sidebar.slider("Vulnerability (0.0 - 1.0)", 0.0, 1.0, 0.4, key="combined_vulnerability")
 
 if st.sidebar.button("Assess CVSS Risk"):
-    # Perform risk assessment using CVSS formula
-    cvss_score = calculate_cvss_score(impact_cvss, exploitability_cvss, complexity_cvss)
+    if cvss_vector.strip():
+        # Perform risk assessment using the CVSS v3.1 specification
+        try:
+            cvss_result = score_vector(cvss_vector)
+        except ValueError as error:
+            st.sidebar.error(str(error))
+        else:
+            cvss_score = cvss_result['base_score']
+            st.sidebar.write(
+                f"Base {cvss_result['base_score']:.1f} | Temporal {cvss_result['temporal_score']:.1f} | "
+                f"Environmental {cvss_result['environmental_score']:.1f} ({cvss_result['severity']})"
+            )
+    else:
+        # Perform risk assessment using CVSS formula
+        cvss_score = calculate_cvss_score(impact_cvss, exploitability_cvss, complexity_cvss)
 
 if st.sidebar.button("Assess Custom Risk"):
     # Perform custom risk assessment
@@ -168,3 +175,91 @@ st.dataframe(df.style.applymap(lambda x: f'background-color: {"green" if x <= 10
 
 st.subheader("Risk Assessment Visualizations")
 st.plotly_chart(fig1, use_container_width=True)
+
+# Batch scoring of a findings file
+st.subheader("Batch Findings Scoring")
+st.markdown(
+    """
+    Upload a scanner findings file (CSV or JSON lines) with one row per vulnerability and the columns
+    `impact`, `exploitability`, `complexity`, `likelihood`, `threat`, `vulnerability`, `recovery_time`,
+    `detection_probability` and `containment_probability`. All five scores are computed for every finding.
+    An optional `cvss_vector` column of CVSS v3.1 vector strings is scored with the specification instead.
+    """
+)
+
+# Score each uploaded file once; reruns for paging or sorting, and other server processes, reuse the result
+@SHARED.memoize('scored_findings')
+def score_uploaded_findings(content, name):
+    return score_findings(load_findings(content, name))
+
+findings_file = st.file_uploader("Findings File", type=["csv", "jsonl", "ndjson", "json"])
+if findings_file is not None:
+    try:
+        with st.spinner("Scoring findings..."):
+            scored_findings = score_uploaded_findings(findings_file.getvalue(), findings_file.name)
+    except ValueError as error:
+        st.error(str(error))
+    else:
+        rank_by = st.selectbox("Rank By", list(SCORE_COLUMNS), format_func=SCORE_COLUMNS.get, index=4)
+        ranked_findings = rank_findings(scored_findings, rank_by)
+
+        page_size = st.selectbox("Findings per Page", [10, 25, 50, 100], index=1)
+        page_count = max(1, -(-len(ranked_findings) // page_size))
+        page_number = st.number_input(f"Page (1 - {page_count})", min_value=1, max_value=page_count, value=1, step=1)
+        st.write(f"Showing findings ranked by {SCORE_COLUMNS[rank_by]} score ({len(ranked_findings)} total)")
+        st.dataframe(page(ranked_findings, page_number, page_size))
+
+        st.write("Score Distributions")
+        for column, label in SCORE_COLUMNS.items():
+            histogram = score_histogram(scored_findings, column)
+            fig = px.bar(histogram, x='score', y='findings', title=f'{label} Score Distribution')
+            fig.update_layout(bargap=0)
+            st.plotly_chart(fig, use_container_width=True)
+
+# Monte Carlo risk simulation
+st.subheader("Monte Carlo Risk Simulation")
+st.markdown(
+    """
+    Point estimates hide uncertainty. This simulation treats each Combined Risk, MTTI and MTTC input as a
+    distribution centred on the sidebar value and reports percentiles and exceedance curves of the results.
+    Detection and containment probabilities are capped just below 1.0 so MTTI and MTTC stay finite.
+    """
+)
+
+# Simulate once per parameter set; reruns for other widgets and other server processes reuse the summary
+@SHARED.memoize('risk_simulation')
+def run_risk_simulation(inputs, n_samples, seed):
+    results = simulate_risk(dict(inputs), n_samples=n_samples, seed=seed)
+    curves = {name: exceedance_curve(values) for name, values in results.items()}
+    return summarize(results), curves
+
+distribution_family = st.selectbox("Input Distribution", ["Beta", "Triangular"])
+uncertainty = st.slider("Input Uncertainty", 0.01, 0.5, 0.1, help="Relative spread of each input around its sidebar value")
+# Capped at one million samples so a rerun with changed inputs simulates in well under a second
+n_simulations = st.select_slider("Number of Samples", options=[10_000, 100_000, 1_000_000], value=1_000_000)
+simulation_seed = st.number_input("Random Seed", min_value=0, value=42, step=1)
+
+# Function to describe one input as a distribution around its point estimate on [low, high]
+def input_distribution(value, low, high):
+    if distribution_family == "Beta":
+        return beta_from_mean(value, 1 / uncertainty ** 2, low, high)
+    spread = uncertainty * (high - low)
+    return triangular(max(low, value - spread), value, min(high, value + spread))
+
+simulation_inputs = (
+    ('likelihood', input_distribution(likelihood_combined, 0.0, 1.0)),
+    ('impact', input_distribution(impact_combined, 0.0, 10.0)),
+    ('threat', input_distribution(threat_combined, 0.0, 1.0)),
+    ('vulnerability', input_distribution(vulnerability_combined, 0.0, 1.0)),
+    ('recovery_time', fixed(recovery_time)),
+    ('detection_probability', input_distribution(detection_probability, 0.0, 1.0)),
+    ('containment_probability', input_distribution(containment_probability, 0.0, 1.0)),
+)
+with st.spinner("Simulating..."):
+    simulation_summary, exceedance_curves = run_risk_simulation(simulation_inputs, n_simulations, simulation_seed)
+st.dataframe(simulation_summary.rename(index={'combined_risk': 'Combined', 'mtti': 'MTTI', 'mttc': 'MTTC'}))
+
+for name, label in [('combined_risk', 'Combined Risk'), ('mtti', 'MTTI (hours)'), ('mttc', 'MTTC (hours)')]:
+    fig = px.line(exceedance_curves[name], x='value', y='exceedance_probability',
+                  labels={'value': label, 'exceedance_probability': 'P(exceeds)'}, title=f'{label} Exceedance Curve')
+    st.plotly_chart(fig, use_container_width=True)
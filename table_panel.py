@@ -0,0 +1,61 @@
+import streamlit as st
+
+from analytics.table_view import PAGE_SIZES
+
+# Paginated data table for the dashboards.
+#
+# The rows stay on the server in an analytics.table_view.TableView; search, column filters and
+# sorting run there on row positions, and only the visible page is sent to the browser. The CSV
+# export of the current view is built on request from fixed-size chunks. st.download_button holds
+# the whole file in server memory until the session ends, so exports are capped at
+# EXPORT_MAX_ROWS rows (a few hundred MB of CSV at most for the dashboards' tables).
+
+EXPORT_MAX_ROWS = 1_000_000
+
+# Function to show a paginated, sortable and searchable table of the given row positions.
+# key keeps the widget state of several tables on one page apart.
+def paged_table(view, positions, key, default_sort=None, file_name='data.csv'):
+    columns = view.columns
+    controls = st.columns([3, 2, 1])
+    search = controls[0].text_input("Search", key=f'{key}_search')
+    sort_options = [None] + columns
+    sort_by = controls[1].selectbox(
+        "Sort by", sort_options, index=sort_options.index(default_sort) if default_sort in columns else 0,
+        format_func=lambda column: "(file order)" if column is None else column, key=f'{key}_sort',
+    )
+    descending = controls[2].checkbox("Descending", value=default_sort is not None, key=f'{key}_descending')
+
+    filters = {}
+    with st.expander("Column filters"):
+        for column in st.multiselect("Filter columns", columns, key=f'{key}_filter_columns'):
+            kind, domain = view.filter_kind(column, positions)
+            if kind == 'values':
+                filters[column] = st.multiselect(column, domain, default=domain, key=f'{key}_filter_{column}')
+            elif kind == 'range' and domain[0] < domain[1]:
+                low, high = float(domain[0]), float(domain[1])
+                filters[column] = st.slider(column, low, high, (low, high), key=f'{key}_filter_{column}')
+            else:
+                st.caption(f"{column}: use the search box to filter this column")
+
+    rows = view.query(positions, filters, search, sort_by, descending)
+
+    paging = st.columns([1, 1, 3])
+    page_size = paging[0].selectbox("Rows per page", PAGE_SIZES, key=f'{key}_page_size')
+    pages = max(1, -(-len(rows) // page_size))
+    number = paging[1].number_input("Page", min_value=1, max_value=pages, value=1, step=1, key=f'{key}_page')
+    first = (number - 1) * page_size
+    paging[2].caption(f"Rows {min(first + 1, len(rows))}–{min(first + page_size, len(rows))} of {len(rows):,}")
+    st.dataframe(view.page(rows, number, page_size), use_container_width=True)
+
+    if st.button("Prepare CSV export", key=f'{key}_export'):
+        exported = rows[:EXPORT_MAX_ROWS]
+        if len(rows) > EXPORT_MAX_ROWS:
+            st.warning(
+                f"The export is limited to the first {EXPORT_MAX_ROWS:,} of {len(rows):,} rows in the current order. "
+                "Narrow the filters or search to export the rest."
+            )
+        export = b''.join(chunk.encode() for chunk in view.iter_csv(exported))
+        st.download_button(
+            f"Download {len(exported):,} rows as CSV", export, file_name=file_name, mime='text/csv', key=f'{key}_download'
+        )
+    return rows
@@ -0,0 +1,44 @@
+from analytics.incremental_loader import IncrementalCSV
+
+# Tests for the append-aware CSV loader with snapshots on, as the dashboards use it
+
+
+# Function to write a CSV whose last row has no trailing newline, like influencer_data.csv
+def write_unterminated(path):
+    path.write_text('x,y\n1,2\n3,4')
+
+
+def test_refresh_reloads_continued_last_row(tmp_path):
+    path = tmp_path / 'data.csv'
+    write_unterminated(path)
+    loader = IncrementalCSV(str(path), cache_dir=str(tmp_path / 'cache'))
+    assert loader.data['y'].tolist() == [2, 4]
+
+    with open(path, 'a') as handle:
+        handle.write('5\n6,7\n')
+    loader.refresh()
+    assert loader.data['x'].tolist() == [1, 3, 6]
+    assert loader.data['y'].tolist() == [2, 45, 7]
+
+
+def test_cold_start_skips_snapshot_with_continued_last_row(tmp_path):
+    path = tmp_path / 'data.csv'
+    write_unterminated(path)
+    IncrementalCSV(str(path), cache_dir=str(tmp_path / 'cache'))
+
+    with open(path, 'a') as handle:
+        handle.write('5\n')
+    loader = IncrementalCSV(str(path), cache_dir=str(tmp_path / 'cache'))
+    assert loader.data['y'].tolist() == [2, 45]
+
+
+def test_refresh_takes_held_back_row_once_file_stops_growing(tmp_path):
+    path = tmp_path / 'data.csv'
+    path.write_text('x,y\n1,2\n')
+    loader = IncrementalCSV(str(path), cache_dir=str(tmp_path / 'cache'))
+
+    with open(path, 'a') as handle:
+        handle.write('3,4\n5,6')
+    assert len(loader.refresh()) == 1
+    assert len(loader.refresh()) == 1
+    assert loader.data['y'].tolist() == [2, 4, 6]
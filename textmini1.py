@@ -1,66 +1,142 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 
-# Load the influencer data from influencer_data.csv
-@st.cache_data
+from analytics.datasets import open_influencer_dataset
+from analytics.entity_index import SEARCH_LIMIT
+from analytics.instrumentation import RECORDER
+from analytics.stream_metrics import MAX_TOP_K, RANKING_METRICS, rolling_engagement
+from analytics.table_view import TableView
+from analytics.ts_rollup import RESOLUTIONS, choose_resolution
+from figure_cache import FIGURES, render_mode
+from perf_panel import begin_rerun, show_panel
+from table_panel import paged_table
+
+begin_rerun('textmini1')
+
+# Load the influencer data from influencer_data.csv once per server process;
+# later reruns parse only the rows appended to the file since the previous rerun.
+# The time-series rollup, the influencer/hashtag index and the streaming engagement metrics
+# are kept up to date with the loader.
+@RECORDER.counted_cache(st.cache_resource)
+def influencer_loader():
+    return open_influencer_dataset("influencer_data.csv")  # Replace with your dataset file path
+
 def load_influencer_data():
-    data = pd.read_csv("influencer_data.csv")  # Replace with your dataset file path
-    return data
+    loader, rollup, entity_index, metrics = influencer_loader()
+    loader.refresh()
+    return loader, rollup, entity_index, metrics
+
+with RECORDER.stage('load'):
+    loader, rollup, entity_index, metrics = load_influencer_data()
+influencer_data = loader.data
 
-influencer_data = load_influencer_data()
+# Influencers and hashtags whose name contains the search text, busiest first. Only the top
+# matches are sent to the browser; recomputed per search text and data version.
+@RECORDER.counted_cache(st.cache_data)
+def entity_matches(query, data_version):
+    return influencer_loader()[2].search(query, SEARCH_LIMIT)
 
-# Create a list of available influencer names and hashtags
-available_influencers = sorted(influencer_data['Influencer'].unique())
-available_hashtags = sorted(influencer_data['Hashtag'].unique())
+# Server-side table over all posts; rebuilt (and its sort ranks recomputed) per data version
+@RECORDER.counted_cache(st.cache_resource(max_entries=1))
+def posts_table(data_version):
+    return TableView(influencer_loader()[0].data)
 
 # Sidebar title and user input
 st.sidebar.title("Social Media Influence Tracker")
-user_input = st.sidebar.selectbox("Choose an Influencer or Hashtag", available_influencers + available_hashtags)
+search_text = st.sidebar.text_input("Search influencers and hashtags")
+user_input = st.sidebar.selectbox(
+    "Choose an Influencer or Hashtag", entity_matches(search_text, loader.version),
+    help=f"Lists the {SEARCH_LIMIT} matches with the most posts; refine the search to find others.",
+)
+resolution = st.sidebar.selectbox("Time resolution", ['auto', 'raw'] + list(RESOLUTIONS))
 
 # Determine whether the user input is an influencer or hashtag
-is_influencer = user_input in available_influencers
-if is_influencer:
-    filtered_data = influencer_data[influencer_data['Influencer'] == user_input]
-else:
-    filtered_data = influencer_data[influencer_data['Hashtag'] == user_input]
+entity_column = entity_index.kind(user_input)
+is_influencer = entity_column == 'Influencer'
+with RECORDER.stage('slice'):
+    filtered_data = entity_index.rows(influencer_data, user_input, entity_column)
 
 # Main content
 st.title("Social Media Influence Tracker")
 st.header("Influencer Performance Over Time")
 
 if not filtered_data.empty:
+    # Visible time range and bucket size; 'auto' picks the bucket from the range so charts stay small
+    times = rollup.times[filtered_data.index.to_numpy()]
+    first_time, last_time = pd.Timestamp(times.min()).to_pydatetime(), pd.Timestamp(times.max()).to_pydatetime()
+    if first_time < last_time:
+        start_time, end_time = st.sidebar.slider(
+            "Time range", min_value=first_time, max_value=last_time, value=(first_time, last_time)
+        )
+    else:
+        start_time, end_time = first_time, last_time
+    with RECORDER.stage('time series'):
+        series, resolution_used = rollup.view(entity_column, user_input, filtered_data, start_time, end_time, resolution)
+    st.caption(f"Time resolution: {resolution_used} ({len(series)} points)")
+
+    # Figures are memoized server-side per (entity, visible range, resolution, data version)
+    figure_key = (user_input, start_time, end_time, resolution, loader.version)
+
     # Create a line chart for follower count over time
     st.subheader("Follower Count Over Time")
-    fig_followers = px.line(
-        filtered_data, x='Timestamp', y='Followers',
-        title=f"Follower Count for {user_input}"
-    )
-    st.plotly_chart(fig_followers)
+    with RECORDER.stage('chart: followers'):
+        fig_followers = FIGURES.figure('followers', figure_key, lambda: px.line(
+            series, x='Timestamp', y='Followers', render_mode=render_mode(len(series)),
+            title=f"Follower Count for {user_input}"
+        ))
+        st.plotly_chart(fig_followers)
 
     # Display engagement metrics in a bar chart
     st.subheader("Engagement Metrics")
-    fig_engagement = px.bar(
-        filtered_data, x='Timestamp', y=['Likes', 'Comments', 'Shares'],
-        labels={'value': 'Count', 'variable': 'Metric'},
-        title=f"Engagement Metrics for {user_input}"
-    )
-    st.plotly_chart(fig_engagement)
+    with RECORDER.stage('chart: engagement'):
+        fig_engagement = FIGURES.figure('engagement', figure_key, lambda: px.bar(
+            series, x='Timestamp', y=['Likes', 'Comments', 'Shares'],
+            labels={'value': 'Count', 'variable': 'Metric'},
+            title=f"Engagement Metrics for {user_input}"
+        ))
+        st.plotly_chart(fig_engagement)
 
     # Create a pie chart to show the distribution of engagement metrics
     st.subheader("Distribution of Engagement Metrics")
-    engagement_distribution = filtered_data[['Likes', 'Comments', 'Shares']].sum()
-    fig_pie = go.Figure(
-        data=[go.Pie(labels=engagement_distribution.index, values=engagement_distribution.values)]
-    )
-    fig_pie.update_traces(textinfo='percent+label')
-    st.plotly_chart(fig_pie)
+    with RECORDER.stage('chart: engagement mix'):
+        def engagement_mix_figure():
+            engagement_distribution = metrics.entity_totals(entity_column, user_input)[['Likes', 'Comments', 'Shares']]
+            fig_pie = go.Figure(
+                data=[go.Pie(labels=engagement_distribution.index, values=engagement_distribution.values)]
+            )
+            fig_pie.update_traces(textinfo='percent+label')
+            return fig_pie
+        st.plotly_chart(FIGURES.figure('engagement mix', (user_input, loader.version), engagement_mix_figure))
+
+    # Engagement over the most recent window compared with the window before it
+    st.subheader("Recent Engagement")
+    window_days = st.selectbox("Rolling window (days)", [7, 30, 90])
+    with RECORDER.stage('rolling engagement'):
+        st.write(rolling_engagement(rollup, entity_column, user_input, pd.Timedelta(days=window_days)))
 
     # Display the top-performing posts
     st.subheader("Top-Performing Posts")
-    top_posts = filtered_data.nlargest(5, 'Likes')  # Adjust the number of top posts as needed
-    st.write(top_posts[['Timestamp', 'Likes', 'Comments', 'Shares']])
+    ranking_metric = st.selectbox("Rank posts by", list(RANKING_METRICS))
+    top_k = st.slider("Number of posts", min_value=1, max_value=MAX_TOP_K, value=5)
+    with RECORDER.stage('top posts'):
+        top_posts = metrics.top_posts(influencer_data, entity_column, user_input, ranking_metric, top_k)
+        st.write(top_posts[['Timestamp', 'Followers', 'Likes', 'Comments', 'Shares']])
+
+    # Browse, sort and export every post of the influencer or hashtag, one page at a time
+    st.subheader("All Posts")
+    with RECORDER.stage('table'):
+        paged_table(
+            posts_table(loader.version), filtered_data.index.to_numpy(), key='posts', default_sort='Timestamp',
+            file_name=f"{user_input}_posts.csv",
+        )
+
+    # Show which hashtags the influencer posts under, or which influencers use the hashtag
+    st.subheader("Top Hashtags" if is_influencer else "Top Influencers")
+    with RECORDER.stage('co-occurrence'):
+        st.write(entity_index.co_occurrence(user_input, entity_column, limit=10))
 
     # Provide additional insights based on the data
     st.subheader("Insights and Observations")
@@ -74,6 +150,36 @@ if not filtered_data.empty:
 else:
     st.info("No data available for the selected influencer or hashtag. Please try another.")
 
+# Compare several influencers and hashtags on one chart, bucketed at a common resolution
+st.header("Compare Influencers and Hashtags")
+compare_search = st.text_input("Search influencers and hashtags to compare")
+if 'compared' not in st.session_state:
+    st.session_state['compared'] = [user_input] if user_input is not None else []
+# The entities already chosen stay in the options while the search text changes
+compare_options = list(dict.fromkeys(st.session_state['compared'] + entity_matches(compare_search, loader.version)))
+compared = st.multiselect("Choose influencers or hashtags to compare", compare_options, key='compared')
+compare_metric = st.selectbox("Metric to compare", ['Followers', 'Likes', 'Comments', 'Shares', 'Posts'])
+
+if compared:
+    # Overlay each entity's series at one resolution; only rebuilt when the selection or data changes
+    def comparison_figure():
+        slices = {entity: entity_index.rows(influencer_data, entity) for entity in compared}
+        compared_times = rollup.times[np.concatenate([rows.index.to_numpy() for rows in slices.values()])]
+        compare_resolution = resolution if resolution in RESOLUTIONS else choose_resolution(compared_times.min(), compared_times.max())
+        compared_series = []
+        for entity, rows in slices.items():
+            series, _ = rollup.view(entity_index.kind(entity), entity, rows, resolution=compare_resolution)
+            compared_series.append(series.assign(Entity=entity))
+        comparison = pd.concat(compared_series, ignore_index=True)
+        return px.line(
+            comparison, x='Timestamp', y=compare_metric, color='Entity', render_mode=render_mode(len(comparison)),
+            title=f"{compare_metric} per {compare_resolution}"
+        )
+
+    with RECORDER.stage('chart: comparison'):
+        comparison_key = (tuple(compared), compare_metric, resolution, loader.version)
+        st.plotly_chart(FIGURES.figure('comparison', comparison_key, comparison_figure))
+
 # Additional description and call to action
 st.header("About Social Media Influence Tracker")
 st.markdown("""
@@ -86,3 +192,6 @@ The **Social Media Influence Tracker** helps you monitor and analyze the perform
 
 Feel free to analyze multiple influencers or hashtags to compare their performance. Use this tool to optimize your social media strategies and stay ahead in the digital world!
 """)
+
+# Optional timing panel for this rerun
+show_panel('textmini1')